@@ -1,8 +1,14 @@
-from flask import Flask
+from flask import Flask, Response
 from flask_cors import CORS
 import logging
+import os
+import sys
+
+# Both search services share one metrics module, the FAISS service's (Backendd/embedding/metrics.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Backendd', 'embedding'))
 
 from embeddings.candidate_embeddings import candidates_bp
+from metrics import CONTENT_TYPE, REGISTRY
 # from feature import feature_bp
 
 app = Flask(__name__)
@@ -14,6 +20,11 @@ logger = logging.getLogger(__name__)
 app.register_blueprint(candidates_bp, url_prefix='/candidates')
 # app.register_blueprint(feature_bp, url_prefix='/feature')
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Search latency histograms and counters in Prometheus text format"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
    
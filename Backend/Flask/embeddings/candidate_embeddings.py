@@ -7,10 +7,12 @@ from typing import List, Dict, Optional
 import logging
 import os
 import re
-from flask import Blueprint, Flask, request, jsonify
+from flask import Blueprint, Flask, g, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from metrics import StageTimer
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -314,14 +316,17 @@ class EnhancedPostgresVectorSearch:
             logger.error(f"Error generating embeddings: {e}")
             raise
 
-    def search_with_hybrid_scoring(self, query: str, k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+    def search_with_hybrid_scoring(self, query: str, k: int = 5, filters: Optional[Dict] = None,
+                                   timer: Optional[StageTimer] = None) -> List[Dict]:
         """Enhanced search with hybrid scoring (semantic + keyword)"""
+        timer = timer or StageTimer()
         try:
-            # Clean and enhance the query
-            enhanced_query = self._clean_and_standardize_text(query)
-            
-            # Generate query embedding
-            query_embedding = self.model.encode([enhanced_query], normalize_embeddings=True)[0]
+            with timer.stage('encode'):
+                # Clean and enhance the query
+                enhanced_query = self._clean_and_standardize_text(query)
+                
+                # Generate query embedding
+                query_embedding = self.model.encode([enhanced_query], normalize_embeddings=True)[0]
             
             # Build hybrid search query
             sql = """
@@ -405,22 +410,27 @@ class EnhancedPostgresVectorSearch:
             params.append(k)
             
             # Execute query
-            conn = psycopg2.connect(**self.db_config)
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute(sql, params)
-            results = cur.fetchall()
-            cur.close()
+            with timer.stage('db_connect'):
+                conn = psycopg2.connect(**self.db_config)
+            # Vector search and hybrid scoring both run inside this one query
+            with timer.stage('db_query'):
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(sql, params)
+                results = cur.fetchall()
+                cur.close()
             conn.close()
+            timer.scanned += len(results)
             
             # Process results
-            candidates = []
-            for row in results:
-                candidate = dict(row)
-                if candidate.get('id'):
-                    candidate['id'] = str(candidate['id'])
-                if candidate.get('available_from'):
-                    candidate['available_from'] = candidate['available_from'].isoformat()
-                candidates.append(candidate)
+            with timer.stage('format'):
+                candidates = []
+                for row in results:
+                    candidate = dict(row)
+                    if candidate.get('id'):
+                        candidate['id'] = str(candidate['id'])
+                    if candidate.get('available_from'):
+                        candidate['available_from'] = candidate['available_from'].isoformat()
+                    candidates.append(candidate)
             
             return candidates
             
@@ -428,9 +438,10 @@ class EnhancedPostgresVectorSearch:
             logger.error(f"Hybrid search failed: {e}")
             raise
 
-    def search(self, query: str, k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+    def search(self, query: str, k: int = 5, filters: Optional[Dict] = None,
+               timer: Optional[StageTimer] = None) -> List[Dict]:
         """Main search method using hybrid scoring"""
-        return self.search_with_hybrid_scoring(query, k, filters)
+        return self.search_with_hybrid_scoring(query, k, filters, timer)
 
     def get_embedding_quality_stats(self) -> Dict:
         """Get statistics about embedding quality"""
@@ -495,7 +506,9 @@ postgres_search = EnhancedPostgresVectorSearch(DB_CONFIG)
 # Routes remain mostly the same but use enhanced search
 @candidates_bp.route('/search', methods=['POST'])
 def search_candidates():
-    data = request.get_json()
+    # Recorded by record_search_metrics, so rejected requests are counted too
+    timer = g.search_timer = StageTimer()
+    data = request.get_json(silent=True)
     if not data or not data.get('query'):
         return jsonify({'error': 'Missing query'}), 400
     
@@ -519,21 +532,36 @@ def search_candidates():
         results = postgres_search.search(
             query=data['query'],
             k=data.get('top_k', 5),
-            filters=filters if filters else None
+            filters=filters if filters else None,
+            timer=timer
         )
         
-        return jsonify({
+        response = {
             'status': 'success',
             'query': data['query'],
             'filters': filters,
             'candidates': results,
             'count': len(results)
-        })
+        }
+        # "timings": true adds per-stage latencies (ms, up to serialisation) to the response
+        if data.get('timings'):
+            response['timings'] = timer.timings()
+        with timer.stage('serialize'):
+            body = jsonify(response)
+        return body
         
     except Exception as e:
         logger.error(f"Search failed: {e}")
         return jsonify({'error': str(e)}), 500
 
+@candidates_bp.after_request
+def record_search_metrics(response):
+    """Record a search's stages and status, whichever path returned the response"""
+    timer = g.pop('search_timer', None)
+    if timer is not None:
+        timer.observe('search', response.status_code)
+    return response
+
 @candidates_bp.route('/regenerate-embeddings', methods=['POST'])
 def regenerate_embeddings():
     """Force regenerate all embeddings with enhanced quality"""
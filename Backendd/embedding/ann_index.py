@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from startup import lazy_import
+
+faiss = lazy_import('faiss')
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'hnsw')
+STORAGE_TYPES = ('float32', 'float16', 'int8')
+
+# faiss wants roughly this many training points per IVF centroid / PQ code
+MIN_POINTS_PER_CENTROID = 39
+
+
+@dataclass
+class IndexConfig:
+    """Configuration for the approximate nearest neighbour index"""
+    index_type: str = 'flat'
+    nlist: Optional[int] = None  # IVF cells, defaults to ~4*sqrt(n)
+    pq_m: int = 16  # PQ sub-quantizers, must divide the embedding dimension
+    pq_bits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    nprobe: int = 16  # default IVF cells visited per query
+    ef_search: int = 64  # default HNSW candidate list size per query
+    max_training_points: int = 200000  # IVF/PQ training sample size
+    num_shards: int = 1  # > 1 partitions the index over shard processes (see sharding.py)
+    shard_addresses: Optional[List[str]] = None  # host:port of running shard servers, else spawned locally
+    storage: str = 'float32'  # element type of the stored embeddings (see compression.py)
+    pca_dim: Optional[int] = None  # project embeddings onto this many principal axes
+
+    def __post_init__(self):
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index_type {self.index_type!r}, expected one of {INDEX_TYPES}")
+        if self.num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {self.num_shards}")
+        if self.storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage {self.storage!r}, expected one of {STORAGE_TYPES}")
+
+    @property
+    def compressed(self) -> bool:
+        """Whether embeddings are stored as codes (float16/int8 or PCA-projected) rather than float32"""
+        return self.storage != 'float32' or self.pca_dim is not None
+
+
+def _default_nlist(n: int) -> int:
+    return max(1, int(4 * math.sqrt(n)))
+
+
+def _training_sample(config: IndexConfig, embeddings: np.ndarray) -> np.ndarray:
+    """At most max_training_points rows of embeddings, drawn reproducibly"""
+    n = len(embeddings)
+    if n <= config.max_training_points:
+        return embeddings
+    sample = np.random.default_rng(0).choice(n, config.max_training_points, replace=False)
+    return embeddings[np.sort(sample)]
+
+
+def _scalar_quantizer(storage: str):
+    """faiss scalar quantizer type storing vectors like `storage`, None for plain float32"""
+    return {'float16': faiss.ScalarQuantizer.QT_fp16, 'int8': faiss.ScalarQuantizer.QT_8bit}.get(storage)
+
+
+def build_index(config: IndexConfig, dimension: int, embeddings: Optional[np.ndarray] = None,
+                ids: Optional[np.ndarray] = None) -> faiss.Index:
+    """Create an ID-labelled inner-product index for config, training it on embeddings if needed.
+
+    When embeddings are given they are also added, labelled with ids (default 0..n-1).
+    Pools too small to train the requested IVF/PQ index fall back to a flat index
+    rather than a badly trained one. With float16/int8 storage the flat, IVF-Flat
+    and HNSW indexes keep scalar-quantized codes instead of float32 vectors.
+    """
+    n = 0 if embeddings is None else len(embeddings)
+    index_type = config.index_type
+
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        required = MIN_POINTS_PER_CENTROID * (2 ** config.pq_bits if index_type == 'ivf_pq' else 1)
+        if n < required:
+            if n:
+                logger.warning(f"{n} vectors are too few to train {index_type} (need {required}), using flat index")
+            index_type = 'flat'
+
+    qtype = _scalar_quantizer(config.storage)
+    if index_type == 'flat':
+        if qtype is None:
+            index = faiss.IndexFlatIP(dimension)
+        else:
+            index = faiss.IndexScalarQuantizer(dimension, qtype, faiss.METRIC_INNER_PRODUCT)
+    elif index_type == 'hnsw':
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dimension, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWSQ(dimension, qtype, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config.ef_construction
+        index.hnsw.efSearch = config.ef_search
+    else:
+        nlist = min(config.nlist or _default_nlist(n), max(1, n // MIN_POINTS_PER_CENTROID))
+        quantizer = faiss.IndexFlatIP(dimension)
+        if index_type == 'ivf_flat' and qtype is not None:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, qtype, faiss.METRIC_INNER_PRODUCT)
+        elif index_type == 'ivf_flat':
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        else:
+            if dimension % config.pq_m:
+                raise ValueError(f"pq_m={config.pq_m} does not divide dimension {dimension}")
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, config.pq_m, config.pq_bits,
+                                     faiss.METRIC_INNER_PRODUCT)
+        index.nprobe = min(config.nprobe, nlist)
+        training = _training_sample(config, embeddings)
+        logger.info(f"Training {index_type} index with {nlist} lists on {len(training)} vectors...")
+        index.train(np.ascontiguousarray(training, dtype='float32'))
+    if index_type in ('flat', 'hnsw') and qtype is not None and n:
+        # Scalar quantizers learn each dimension's range
+        index.train(np.ascontiguousarray(_training_sample(config, embeddings), dtype='float32'))
+
+    # Stable int64 labels let candidates be added, replaced and removed in place.
+    # IVF indexes store labels natively (and IndexIDMap cannot remove from them).
+    if faiss.try_extract_index_ivf(index) is None:
+        index = faiss.IndexIDMap2(index)
+    if n:
+        labels = np.arange(n, dtype='int64') if ids is None else np.asarray(ids, dtype='int64')
+        index.add_with_ids(np.ascontiguousarray(embeddings, dtype='float32'), labels)
+    return index
+
+
+def search_parameters(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                      selector: Optional[faiss.IDSelector] = None) -> Optional[faiss.SearchParameters]:
+    """Per-request search parameters for index, or None to use the index defaults.
+
+    selector restricts the search to the labels it accepts; parameters that are
+    not overridden keep the values stored on the index.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        if nprobe or selector is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=int(nprobe or ivf.nprobe))
+        return None
+    base = faiss.downcast_index(index.index) if hasattr(index, 'id_map') else index
+    if isinstance(base, faiss.IndexHNSW):
+        if ef_search or selector is not None:
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=int(ef_search or base.hnsw.efSearch))
+        return None
+    return faiss.SearchParameters(sel=selector) if selector is not None else None
+
+
+def exact_search(queries: np.ndarray, vectors: np.ndarray, ids: np.ndarray, k: int):
+    """Brute-force inner-product search over a small candidate subset.
+
+    Returns (scores, labels) shaped like faiss Index.search output, padded with
+    -inf / -1 when fewer than k vectors are given.
+    """
+    n = len(ids)
+    scores = np.full((len(queries), k), -np.inf, dtype='float32')
+    labels = np.full((len(queries), k), -1, dtype='int64')
+    if not n:
+        return scores, labels
+    similarities = np.asarray(queries, dtype='float32') @ np.asarray(vectors, dtype='float32').T
+    top = min(k, n)
+    best = np.argpartition(-similarities, top - 1, axis=1)[:, :top] if top < n else np.tile(np.arange(n), (len(queries), 1))
+    best_scores = np.take_along_axis(similarities, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    scores[:, :top] = np.take_along_axis(best_scores, order, axis=1)
+    labels[:, :top] = np.asarray(ids, dtype='int64')[np.take_along_axis(best, order, axis=1)]
+    return scores, labels
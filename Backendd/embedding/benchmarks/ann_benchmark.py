@@ -0,0 +1,122 @@
+"""Recall and latency of the ANN index types against the exact flat baseline.
+
+Run from Backendd/embedding:
+
+    python -m benchmarks.ann_benchmark --sizes 10000 100000 1000000 --output results/ann_benchmark.json
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from ann_index import INDEX_TYPES, IndexConfig, build_index, search_parameters
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_embeddings(n: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres, roughly like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype('float32')
+    assignment = rng.integers(0, clusters, size=n)
+    vectors = centres[assignment] + 0.6 * rng.standard_normal((n, dimension)).astype('float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / (k * len(truth))
+
+
+def time_queries(index: faiss.Index, queries: np.ndarray, k: int, params) -> Dict:
+    """Search one query at a time, as the service does, and collect per-query latency"""
+    latencies = []
+    found = np.empty((len(queries), k), dtype='int64')
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, labels = index.search(queries[i:i + 1], k, params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[i] = labels[0]
+    return {
+        'labels': found,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def run(sizes: List[int], dimension: int, num_queries: int, k: int,
+        index_types: List[str], nprobes: List[int], ef_searches: List[int], seed: int) -> List[Dict]:
+    results = []
+    for n in sizes:
+        logger.info(f"Generating {n} synthetic candidates ({dimension} dims)...")
+        data = synthetic_embeddings(n, dimension, clusters=max(10, n // 1000), seed=seed)
+        queries = data[np.random.default_rng(seed + 1).choice(n, num_queries, replace=False)].copy()
+        queries += 0.05 * np.random.default_rng(seed + 2).standard_normal(queries.shape).astype('float32')
+        faiss.normalize_L2(queries)
+
+        flat = build_index(IndexConfig(index_type='flat'), dimension, data)
+        _, truth = flat.search(queries, k)
+
+        for index_type in index_types:
+            start = time.perf_counter()
+            index = build_index(IndexConfig(index_type=index_type), dimension, data)
+            build_seconds = time.perf_counter() - start
+
+            if index_type.startswith('ivf'):
+                sweep = [('nprobe', value) for value in nprobes]
+            elif index_type == 'hnsw':
+                sweep = [('ef_search', value) for value in ef_searches]
+            else:
+                sweep = [(None, None)]
+
+            for param, value in sweep:
+                params = search_parameters(index, **({param: value} if param else {}))
+                timing = time_queries(index, queries, k, params)
+                row = {
+                    'num_candidates': n,
+                    'index_type': index_type,
+                    'param': param,
+                    'value': value,
+                    'build_seconds': round(build_seconds, 3),
+                    f'recall@{k}': round(recall_at_k(timing['labels'], truth), 4),
+                    'p50_ms': timing['p50_ms'],
+                    'p99_ms': timing['p99_ms'],
+                }
+                logger.info(json.dumps(row))
+                results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--index-types', nargs='+', default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[8, 16, 64])
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[32, 64, 128])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.dimension, args.queries, args.k, args.index_types,
+                  args.nprobe, args.ef_search, args.seed)
+    report = {'faiss_version': faiss.__version__, 'k': args.k, 'results': results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Recall and memory of the compressed embedding storage modes against exact float32 search.
+
+Run from Backendd/embedding:
+
+    python -m benchmarks.compression_benchmark --size 200000 --pca-dims 0 256 128 --project-to 5000000 \
+        --output results/compression_benchmark.json
+
+For every index type, storage type and PCA width it trains a codec on --size
+synthetic candidates, builds the index the service would and reports recall@k
+against exact float32 search, single-query latency, and memory. A flat index is
+a MatrixIndex scanning the code matrix itself, so the codes are the only copy.
+HNSW and IVF-Flat keep a second, scalar-quantized (or float32) copy inside faiss,
+next to the code matrix the service keeps for rescoring and snapshots: matrix_mb
+and index_mb (the serialized faiss index) are reported separately, and
+bytes_per_vector and projected_gb (for a pool of --project-to candidates) count
+both. uncompressed_projected_gb is the float32 flat layout, the float32 matrix alone.
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from ann_index import STORAGE_TYPES, IndexConfig, build_index, exact_search, faiss
+from benchmarks.ann_benchmark import recall_at_k, synthetic_embeddings
+from compression import MatrixIndex, VectorCodec
+
+# Index types whose compressed layout differs: flat scans the codes, the others hold their own copy
+INDEX_TYPES = ('flat', 'hnsw', 'ivf_flat')
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run(data: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int, index_types: List[str],
+        storages: List[str], pca_dims: List[int], project_to: int) -> List[Dict]:
+    results = []
+    labels = np.arange(len(data), dtype='int64')
+    for pca_dim in pca_dims:
+        for storage in storages:
+            start = time.perf_counter()
+            codec = VectorCodec.train(storage, data, pca_dim or None)
+            codes = codec.encode(data)
+            codec_seconds = time.perf_counter() - start
+            projected = codec.project(queries)
+            for index_type in index_types:
+                start = time.perf_counter()
+                if index_type == 'flat':
+                    index = MatrixIndex(codec, len(codes))
+                    search = lambda batch: index.search(batch, k, codes, labels)[1]
+                    index_bytes = 0
+                else:
+                    index = build_index(IndexConfig(index_type=index_type, storage=storage), codec.dimension,
+                                        codec.decode(codes), ids=labels)
+                    search = lambda batch: index.search(batch, k)[1]
+                    index_bytes = faiss.serialize_index(index).nbytes
+                build_seconds = codec_seconds + time.perf_counter() - start
+                found = search(projected)
+                latencies = []
+                for i in range(len(projected)):
+                    start = time.perf_counter()
+                    search(projected[i:i + 1])
+                    latencies.append((time.perf_counter() - start) * 1000)
+                total_bytes = codes.nbytes + index_bytes
+                row = {
+                    'index_type': index_type,
+                    'storage': storage,
+                    'pca_dim': pca_dim or None,
+                    'dimension': codec.dimension,
+                    'bytes_per_vector': round(total_bytes / len(codes), 1),
+                    'build_seconds': round(build_seconds, 3),
+                    f'recall@{k}': round(recall_at_k(found, truth), 4),
+                    'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+                    'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+                    'matrix_mb': round(codes.nbytes / 2 ** 20, 1),
+                    'index_mb': round(index_bytes / 2 ** 20, 1),
+                    'total_mb': round(total_bytes / 2 ** 20, 1),
+                    'projected_gb': round(total_bytes / len(codes) * project_to / 2 ** 30, 2),
+                }
+                logger.info(json.dumps(row))
+                results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--index-types', nargs='+', default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument('--storages', nargs='+', default=list(STORAGE_TYPES), choices=STORAGE_TYPES)
+    parser.add_argument('--pca-dims', type=int, nargs='+', default=[0, 256, 128], help='0 for no projection')
+    parser.add_argument('--project-to', type=int, default=5000000, help='pool size for projected_gb')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    logger.info(f"Generating {args.size} synthetic candidates ({args.dimension} dims)...")
+    data = synthetic_embeddings(args.size, args.dimension, clusters=max(10, args.size // 1000), seed=args.seed)
+    queries = data[np.random.default_rng(args.seed + 1).choice(args.size, args.queries, replace=False)].copy()
+    queries += 0.05 * np.random.default_rng(args.seed + 2).standard_normal(queries.shape).astype('float32')
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    _, truth = exact_search(queries, data, np.arange(args.size), args.k)
+
+    results = run(data, queries, truth, args.k, args.index_types, args.storages, args.pca_dims, args.project_to)
+    float32_bytes = args.dimension * 4
+    report = {
+        'num_candidates': args.size,
+        'dimension': args.dimension,
+        'k': args.k,
+        'project_to': args.project_to,
+        # The float32 matrix a flat index scans, as kept without compression
+        'uncompressed_projected_gb': round(float32_bytes * args.project_to / 2 ** 30, 2),
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Parity and latency of the int8 ONNX Runtime backend against the PyTorch models.
+
+Run from Backendd/embedding (needs onnxruntime and onnx installed):
+
+    python -m benchmarks.onnx_benchmark --output results/onnx_benchmark.json
+
+Exits non-zero when embedding cosine similarity or rank agreement falls below
+the thresholds, so it doubles as a parity check over the whole candidate file;
+tests/test_onnx_backend.py checks the same on a few texts in the test suite.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from sentence_transformers import CrossEncoder, SentenceTransformer
+
+from onnx_backend import OnnxCrossEncoder, OnnxSentenceEncoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUERIES = [
+    "Looking for senior AI engineer with 5+ years experience in LangChain",
+    "Need a remote Python expert with RAG experience",
+    "Seeking ML engineer with 3+ years at top AI companies",
+    "healthcare data analyst with sql",
+    "lead react javascript developer open to hybrid work",
+    "junior devops engineer docker kubernetes aws",
+    "computer vision researcher pytorch",
+    "product-minded full stack engineer for an early stage startup",
+]
+
+
+def candidate_texts(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        candidates = json.load(f)
+    return [' '.join(str(part) for part in (c.get('title', ''), ' '.join(c.get('skills') or []),
+                                            c.get('education', ''), c.get('summary', '')) if part)
+            for c in candidates]
+
+
+def rank(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.corrcoef(rank(a), rank(b))[0, 1])
+
+
+def top_k_overlap(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    return len(set(np.argsort(-a)[:k]) & set(np.argsort(-b)[:k])) / k
+
+
+def latency(fn: Callable[[], object], repeats: int) -> Dict:
+    fn()  # warm-up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': round(float(np.percentile(times, 50)), 3), 'p99_ms': round(float(np.percentile(times, 99)), 3)}
+
+
+def run(args) -> Dict:
+    texts = candidate_texts(args.candidates)
+    torch_encoder = SentenceTransformer(args.model)
+    onnx_encoder = OnnxSentenceEncoder(args.model)
+    torch_reranker = CrossEncoder(args.reranker)
+    onnx_reranker = OnnxCrossEncoder(args.reranker)
+
+    # Embedding parity: per-text cosine and agreement of the retrieval rankings
+    torch_docs = torch_encoder.encode(texts, normalize_embeddings=True)
+    onnx_docs = onnx_encoder.encode(texts, normalize_embeddings=True)
+    cosines = np.sum(torch_docs * onnx_docs, axis=1)
+    torch_queries = torch_encoder.encode(QUERIES, normalize_embeddings=True)
+    onnx_queries = onnx_encoder.encode(QUERIES, normalize_embeddings=True)
+    retrieval_overlap = [top_k_overlap(torch_docs @ tq, onnx_docs @ oq, args.k)
+                         for tq, oq in zip(torch_queries, onnx_queries)]
+
+    # Rerank parity on each query's top candidates
+    rerank_spearman, rerank_overlap = [], []
+    for query, tq in zip(QUERIES, torch_queries):
+        pool = np.argsort(-(torch_docs @ tq))[:args.rerank_depth]
+        pairs = [[query, texts[i]] for i in pool]
+        torch_scores = np.asarray(torch_reranker.predict(pairs))
+        onnx_scores = np.asarray(onnx_reranker.predict(pairs))
+        rerank_spearman.append(spearman(torch_scores, onnx_scores))
+        rerank_overlap.append(top_k_overlap(torch_scores, onnx_scores, args.k))
+
+    parity = {
+        'embedding_cosine_mean': round(float(cosines.mean()), 5),
+        'embedding_cosine_min': round(float(cosines.min()), 5),
+        f'retrieval_top{args.k}_overlap': round(float(np.mean(retrieval_overlap)), 4),
+        'rerank_spearman_mean': round(float(np.mean(rerank_spearman)), 4),
+        f'rerank_top{args.k}_overlap': round(float(np.mean(rerank_overlap)), 4),
+    }
+
+    pairs = [[QUERIES[0], text] for text in texts[:args.rerank_depth]]
+    batch = texts[:args.batch_size]
+    timings = {}
+    for backend, encoder, reranker in (('torch', torch_encoder, torch_reranker),
+                                       ('onnx_int8', onnx_encoder, onnx_reranker)):
+        timings[backend] = {
+            'encode_query': latency(lambda: encoder.encode([QUERIES[1]], normalize_embeddings=True), args.repeats),
+            f'encode_batch_{len(batch)}': latency(lambda: encoder.encode(batch, normalize_embeddings=True),
+                                                  max(3, args.repeats // 10)),
+            f'rerank_{len(pairs)}_pairs': latency(lambda: reranker.predict(pairs), max(3, args.repeats // 5)),
+        }
+        logger.info(f"{backend}: {json.dumps(timings[backend])}")
+
+    passed = (parity['embedding_cosine_min'] >= args.min_cosine and
+              parity['rerank_spearman_mean'] >= args.min_rank_agreement)
+    return {'model': args.model, 'reranker': args.reranker, 'num_texts': len(texts),
+            'parity': parity, 'passed': passed, 'latency': timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--reranker', default='cross-encoder/ms-marco-MiniLM-L-12-v2')
+    parser.add_argument('--candidates', default=str(Path('data') / 'candidates.json'))
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--rerank-depth', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--repeats', type=int, default=100)
+    parser.add_argument('--min-cosine', type=float, default=0.98)
+    parser.add_argument('--min-rank-agreement', type=float, default=0.9)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+    sys.exit(0 if report['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""End-to-end search benchmark of CandidateEmbeddings over synthetic candidate pools.
+
+Run from Backendd/embedding:
+
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000 --queries 500 --concurrency 4 \
+        --output results/search_benchmark.json
+
+For each pool size it writes a seeded synthetic pool (benchmarks.synthetic_candidates)
+as JSON Lines, builds it with stream_candidates, and replays a fixed, seeded mix
+of free-text and filtered queries through search_candidates_json. It reports
+index build time, throughput, end-to-end latency percentiles, percentiles of
+each stage recorded by the request's StageTimer (encode, ann_search, scoring,
+rerank, format), candidates scanned and reranked per query, and memory.
+
+Queries are composed from the generator's titles and skills and are all
+distinct by default, so with the query and rerank caches off (unless
+--warm-caches) every query pays for its model calls, and concurrent clients
+never share a search through coalescing. --distinct N replays N distinct queries
+over and over instead, to measure the caches and coalescing on repeated traffic.
+Only the benchmark's own CandidateEmbeddings is built: importing the service
+module does not start its warm-up. Peak RSS is the process high-water mark, so
+sizes run smallest first and each row's peak covers the largest pool so far; run
+one size per invocation for an isolated peak. The report carries the git commit,
+so reports from two commits can be diffed directly.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ann_index import INDEX_TYPES, STORAGE_TYPES, IndexConfig
+from benchmarks.shard_benchmark import rss_mb
+from benchmarks.synthetic_candidates import SECTORS, write_jsonl
+from candidate_embeddings import CandidateEmbeddings
+from filters import SearchFilters
+from metrics import StageTimer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUERY_TEMPLATES = [
+    "Looking for {seniority}{title} with {years}+ years experience in {skill}",
+    "Need a {title} ({work}) who knows {skill} and {other}",
+    "Seeking {seniority}{title} for a {sector} team, {skill} required",
+    "{sector} {title} with {skill}, {other} and {years} years of experience",
+    "{work} {seniority}{title} strong in {skill}",
+]
+SENIORITY_WORDS = ['', 'junior ', 'senior ', 'lead ', 'principal ']
+WORK_WORDS = ['remote', 'hybrid', 'onsite']
+FILTERED_SHARE = 0.2
+
+
+def distinct_queries(size: int, rng: random.Random) -> List[str]:
+    """size different natural-language queries built from the synthetic pool's titles and skills"""
+    queries: List[str] = []
+    seen = set()
+    for _ in range(100 * size):
+        if len(queries) == size:
+            break
+        sector = rng.choice(list(SECTORS))
+        titles, core, adjacent = SECTORS[sector]
+        skill, other = rng.sample(core + adjacent, 2)
+        query = rng.choice(QUERY_TEMPLATES).format(
+            seniority=rng.choice(SENIORITY_WORDS), title=rng.choice(titles).lower(), years=rng.randint(1, 10),
+            skill=skill, other=other, sector=sector, work=rng.choice(WORK_WORDS))
+        if query not in seen:
+            seen.add(query)
+            queries.append(query)
+    return queries
+
+
+def query_mix(size: int, seed: int, distinct: int = 0) -> List[Tuple[str, Optional[Dict]]]:
+    """size (query, filters) pairs, about FILTERED_SHARE of them with structured filters.
+
+    Every query differs unless distinct > 0, in which case they are drawn from distinct queries.
+    """
+    rng = random.Random(seed)
+    queries = distinct_queries(distinct or size, rng)
+    mix = []
+    for i in range(size):
+        filters = None
+        if rng.random() < FILTERED_SHARE:
+            filters = rng.choice([
+                {'min_experience': rng.randint(2, 8)},
+                {'work_preference': ['Remote']},
+                {'sector': [rng.choice(list(SECTORS))]},
+                {'skills_any': ['Python', 'SQL'], 'max_experience': 10},
+                {'available_by': '2025-06-30', 'work_preference': ['Hybrid', 'Remote']},
+            ])
+        mix.append((rng.choice(queries) if distinct else queries[i % len(queries)], filters))
+    return mix
+
+
+def percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p90_ms': round(float(np.percentile(values, 90)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'mean_ms': round(float(np.mean(values)), 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """High-water resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def replay(engine: CandidateEmbeddings, mix: List[Tuple[str, Optional[Dict]]], k: int,
+           concurrency: int) -> Dict:
+    """Run every query of mix once over concurrency threads and collect each request's timings"""
+    counter = itertools.count()
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    scanned: List[int] = []
+    reranked: List[int] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            i = next(counter)
+            if i >= len(mix):
+                return
+            query, filters = mix[i]
+            timer = StageTimer()
+            response = engine.search_candidates_json(query, k=k, filters=SearchFilters.from_dict(filters),
+                                                     timer=timer)
+            total = (time.perf_counter() - timer.started) * 1000
+            with lock:
+                if response.get('status') != 'success':
+                    errors[0] += 1
+                latencies.append(total)
+                for name, seconds in timer.stages.items():
+                    stages.setdefault(name, []).append(seconds * 1000)
+                scanned.append(timer.scanned)
+                reranked.append(timer.reranked)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'queries': len(latencies),
+        'errors': errors[0],
+        'seconds': round(elapsed, 3),
+        'qps': round(len(latencies) / elapsed, 1),
+        'latency': percentiles(latencies),
+        'stages': {name: percentiles(values) for name, values in sorted(stages.items())},
+        'mean_scanned': round(float(np.mean(scanned)), 1) if scanned else 0,
+        'mean_reranked': round(float(np.mean(reranked)), 1) if reranked else 0,
+    }
+
+
+def run(engine: CandidateEmbeddings, size: int, data_dir: Path, args) -> Dict:
+    path = data_dir / f"candidates_{size}_{args.seed}.jsonl"
+    if not path.exists():
+        logger.info(f"Generating {size} synthetic candidates...")
+        write_jsonl(str(path), size, args.seed)
+    start = time.perf_counter()
+    loaded = engine.stream_candidates(str(path), batch_size=args.batch_size)
+    build_seconds = time.perf_counter() - start
+    rss_after_build = rss_mb(os.getpid())
+
+    # Warm-up queries load lazy state and the model kernels and are not reported
+    replay(engine, query_mix(args.warmup, args.seed + 1), args.k, 1)
+    result = replay(engine, query_mix(args.queries, args.seed, args.distinct), args.k, args.concurrency)
+    row = {
+        'num_candidates': loaded,
+        'build_seconds': round(build_seconds, 3),
+        'build_candidates_per_second': round(loaded / build_seconds, 1),
+        **result,
+        'rss_after_build_mb': rss_after_build,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    logger.info(json.dumps(row))
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--index-type', type=str, default='flat', choices=INDEX_TYPES)
+    parser.add_argument('--storage', type=str, default='float32', choices=STORAGE_TYPES)
+    parser.add_argument('--pca-dim', type=int, default=None)
+    parser.add_argument('--backend', type=str, default='torch', choices=['torch', 'onnx'])
+    parser.add_argument('--batch-size', type=int, default=64, help='encoding batch size while building')
+    parser.add_argument('--warm-caches', action='store_true', help='keep the query and rerank caches on')
+    parser.add_argument('--distinct', type=int, default=0,
+                        help='replay this many distinct queries (default: every query is different)')
+    parser.add_argument('--data-dir', type=str, default=None, help='keep generated pools here for reuse')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    index_config = IndexConfig(index_type=args.index_type, storage=args.storage, pca_dim=args.pca_dim)
+    cache_sizes = {} if args.warm_caches else {'query_cache_size': 0, 'rerank_cache_size': 0}
+    start = time.perf_counter()
+    engine = CandidateEmbeddings(index_config=index_config, backend=args.backend, **cache_sizes)
+    model_load_seconds = time.perf_counter() - start
+
+    temporary = None if args.data_dir else tempfile.TemporaryDirectory()
+    data_dir = Path(args.data_dir or temporary.name)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        results = [run(engine, size, data_dir, args) for size in sorted(args.sizes)]
+    finally:
+        engine.query_encoder.close()
+        engine.rerank_batcher.close()
+        if temporary is not None:
+            temporary.cleanup()
+
+    report = {
+        'commit': git_commit(),
+        'cpu_count': os.cpu_count(),
+        'backend': args.backend,
+        'index_type': args.index_type,
+        'storage': args.storage,
+        'pca_dim': args.pca_dim,
+        'k': args.k,
+        'concurrency': args.concurrency,
+        'warm_caches': args.warm_caches,
+        'distinct_queries': args.distinct or args.queries,
+        'seed': args.seed,
+        'model_load_seconds': round(model_load_seconds, 3),
+        'results': results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Search throughput of serve.py as the number of worker processes grows.
+
+Run from Backendd/embedding on a multi-core machine:
+
+    python -m benchmarks.serving_benchmark --workers 1 2 4 8 --output results/serving_benchmark.json
+
+For each worker count it starts serve.py, waits for /health/ready, then has
+--concurrency client threads issue /search requests for --duration seconds.
+It records throughput, latency percentiles and the combined proportional set
+size (PSS, Linux only) of the server processes. Each worker loads its own
+model weights, while the mapped index and embedding pages are split among the
+workers in PSS, so PSS grows per worker by about the models' footprint, not the
+pool's; pss_per_added_worker_mb is that growth between consecutive worker
+counts. Set INFERENCE_BACKEND=onnx to measure the int8 backend instead of torch.
+The first run builds the snapshot; later runs start from it.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUERIES = [
+    "Looking for senior AI engineer with 5+ years experience in LangChain",
+    "Need a remote Python expert with RAG experience",
+    "Seeking ML engineer with 3+ years at top AI companies",
+    "healthcare data analyst with sql",
+    "lead react javascript developer open to hybrid work",
+    "junior devops engineer docker kubernetes aws",
+    "computer vision researcher pytorch",
+    "product-minded full stack engineer for an early stage startup",
+]
+
+
+def wait_ready(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/health/ready", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{base_url} not ready after {timeout}s")
+
+
+def server_pids(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [pid] + [int(child) for child in f.read().split()]
+    except OSError:
+        return [pid]
+
+
+def pss_mb(pids: List[int]):
+    """Combined proportional set size of pids in MB, None where /proc does not report it"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        except (OSError, StopIteration):
+            return None
+    return round(total / 1024, 1)
+
+
+def load(base_url: str, concurrency: int, duration: float, k: int, unique: bool) -> Dict:
+    """Closed-loop load: every client sends its next request as soon as the previous one returns"""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            i = next(counter)
+            query = QUERIES[i % len(QUERIES)]
+            if unique:
+                query = f"{query} {i}"  # defeat the query, rerank and coalescing caches
+            body = json.dumps({'query': query, 'top_k': k}).encode()
+            request = urllib.request.Request(f"{base_url}/search", data=body,
+                                             headers={'Content-Type': 'application/json'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+            except (urllib.error.URLError, ConnectionError):
+                with lock:
+                    errors[0] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+    times = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / wall, 2),
+        'p50_ms': round(float(np.percentile(times, 50)), 2) if len(times) else None,
+        'p99_ms': round(float(np.percentile(times, 99)), 2) if len(times) else None,
+    }
+
+
+def run_workers(workers: int, args) -> Dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(args.port),
+                               '--workers', str(workers)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url, args.startup_timeout)
+        load(base_url, args.concurrency, min(5.0, args.duration), args.k, args.unique)  # warm-up
+        result = load(base_url, args.concurrency, args.duration, args.k, args.unique)
+        result['workers'] = workers
+        pids = server_pids(server.pid)
+        result['pss_mb'] = pss_mb(pids)
+        result['master_pss_mb'] = pss_mb(pids[:1])
+        logger.info(f"{workers} workers: {json.dumps(result)}")
+        return result
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--startup-timeout', type=float, default=600.0)
+    parser.add_argument('--repeat-queries', dest='unique', action='store_false',
+                        help='reuse the same few queries, so the caches answer most of them')
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    results = [run_workers(workers, args) for workers in args.workers]
+    baseline = results[0]['throughput_rps'] or 1
+    for result in results:
+        result['speedup'] = round(result['throughput_rps'] / baseline, 2)
+    for previous, result in zip(results, results[1:]):
+        if previous['pss_mb'] is not None and result['pss_mb'] is not None:
+            result['pss_per_added_worker_mb'] = round(
+                (result['pss_mb'] - previous['pss_mb']) / (result['workers'] - previous['workers']), 1)
+    report = {'cpu_count': os.cpu_count(), 'concurrency': args.concurrency, 'duration_seconds': args.duration,
+              'unique_queries': args.unique, 'inference_backend': os.getenv('INFERENCE_BACKEND', 'torch'),
+              'results': results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Build time, query throughput and per-shard memory of the sharded index as shards are added.
+
+Run from Backendd/embedding on a multi-core machine:
+
+    python -m benchmarks.shard_benchmark --shards 1 2 4 8 --size 1000000 --output results/shard_benchmark.json
+
+For each shard count it spawns that many local shard servers, builds the index
+over --size synthetic candidates, checks recall@k against an exact flat search
+and has --concurrency coordinator threads issue single-query searches for
+--duration seconds. Each shard holds about size / shards vectors, so resident
+memory per shard shows how far the pool can grow before one process runs out.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from ann_index import INDEX_TYPES, IndexConfig, build_index
+from benchmarks.ann_benchmark import recall_at_k, synthetic_embeddings
+from sharding import ShardCluster, ShardedIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of pid in MB, None where /proc does not report it"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return round(next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) / 1024, 1)
+    except (OSError, StopIteration):
+        return None
+
+
+def load(index: ShardedIndex, queries: np.ndarray, k: int, concurrency: int, duration: float) -> Dict:
+    """Closed-loop load: every thread searches its next query as soon as the previous one returns"""
+    counter = itertools.count()
+    latencies: List[float] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            i = next(counter) % len(queries)
+            start = time.perf_counter()
+            index.search(queries[i:i + 1], k)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+    times = np.array(latencies) * 1000
+    return {
+        'queries': len(latencies),
+        'throughput_qps': round(len(latencies) / wall, 2),
+        'p50_ms': round(float(np.percentile(times, 50)), 3),
+        'p99_ms': round(float(np.percentile(times, 99)), 3),
+    }
+
+
+def run_shards(num_shards: int, data: np.ndarray, queries: np.ndarray, truth: np.ndarray, args) -> Dict:
+    config = IndexConfig(index_type=args.index_type, num_shards=num_shards)
+    cluster = ShardCluster(num_shards)
+    try:
+        start = time.perf_counter()
+        index = ShardedIndex(cluster, config, data.shape[1], data)
+        build_seconds = time.perf_counter() - start
+        _, found = index.search(queries, args.k)
+        load(index, queries, args.k, args.concurrency, min(2.0, args.duration))  # warm-up
+        result = load(index, queries, args.k, args.concurrency, args.duration)
+        shard_rss = [rss_mb(pid) for pid in cluster.pids]
+        result.update({
+            'shards': num_shards,
+            'build_seconds': round(build_seconds, 3),
+            f'recall@{args.k}': round(recall_at_k(found, truth), 4),
+            'shard_rss_mb': shard_rss,
+            'max_shard_rss_mb': max((rss for rss in shard_rss if rss is not None), default=None),
+        })
+        logger.info(f"{num_shards} shards: {json.dumps(result)}")
+        return result
+    finally:
+        cluster.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--index-type', default='flat', choices=INDEX_TYPES)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None)
+    args = parser.parse_args()
+
+    logger.info(f"Generating {args.size} synthetic candidates ({args.dimension} dims)...")
+    data = synthetic_embeddings(args.size, args.dimension, clusters=max(10, args.size // 1000), seed=args.seed)
+    queries = data[np.random.default_rng(args.seed + 1).choice(args.size, args.queries, replace=False)].copy()
+    queries += 0.05 * np.random.default_rng(args.seed + 2).standard_normal(queries.shape).astype('float32')
+    faiss.normalize_L2(queries)
+    _, truth = build_index(IndexConfig(index_type='flat'), args.dimension, data).search(queries, args.k)
+
+    results = [run_shards(num_shards, data, queries, truth, args) for num_shards in args.shards]
+    baseline = results[0]['throughput_qps'] or 1
+    for result in results:
+        result['speedup'] = round(result['throughput_qps'] / baseline, 2)
+    report = {'cpu_count': os.cpu_count(), 'num_candidates': args.size, 'index_type': args.index_type,
+              'concurrency': args.concurrency, 'duration_seconds': args.duration, 'results': results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Seeded synthetic candidate pools with the schema of Backend/candidates.json.
+
+Run from Backendd/embedding:
+
+    python -m benchmarks.synthetic_candidates --size 100000 --output results/candidates_100k.jsonl
+
+Every record has the fields the sample file has (title, skills, location,
+yearsOfExperience, workPreference, education, pastCompanies, summary,
+availableFrom, ...) plus a sector. Titles and skills are drawn per sector so
+the pool clusters the way real candidates do, and the same seed always gives
+the same pool, so results from different commits are comparable. Records are
+generated one at a time and written as JSON Lines, which stream_candidates
+reads without holding the file in memory.
+"""
+import argparse
+import json
+import logging
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# sector -> (titles, core skills, adjacent skills)
+SECTORS = {
+    'AI': (['AI Engineer', 'Machine Learning Engineer', 'Applied Scientist', 'MLOps Engineer',
+            'Research Engineer', 'NLP Engineer', 'Computer Vision Engineer'],
+           ['Python', 'PyTorch', 'TensorFlow', 'LangChain', 'RAG', 'GenAI', 'LLMOps', 'Transformers',
+            'Hugging Face', 'Computer Vision', 'NLP', 'Scikit-learn'],
+           ['Docker', 'Kubernetes', 'AWS', 'SQL', 'Spark', 'FastAPI']),
+    'Fintech': (['Backend Engineer', 'Quantitative Developer', 'Data Engineer', 'Risk Analyst',
+                 'Payments Engineer'],
+                ['Java', 'Kotlin', 'Python', 'SQL', 'PostgreSQL', 'Kafka', 'Microservices', 'Risk Modeling'],
+                ['AWS', 'Docker', 'Spring Boot', 'Redis', 'Go']),
+    'Healthcare': (['Data Analyst', 'Health Informatics Specialist', 'Bioinformatician',
+                    'Clinical Data Scientist', 'Backend Engineer'],
+                   ['SQL', 'Python', 'R', 'Tableau', 'HL7', 'FHIR', 'Statistics', 'Bioinformatics'],
+                   ['Excel', 'Power BI', 'Machine Learning', 'AWS']),
+    'E-commerce': (['Full Stack Developer', 'Frontend Engineer', 'Product Engineer', 'Growth Engineer',
+                    'Search Engineer'],
+                   ['JavaScript', 'TypeScript', 'React', 'Node.js', 'GraphQL', 'Elasticsearch', 'Next.js'],
+                   ['AWS', 'Docker', 'Redis', 'PostgreSQL', 'Python']),
+    'Cloud': (['DevOps Engineer', 'Site Reliability Engineer', 'Cloud Architect', 'Platform Engineer'],
+              ['AWS', 'GCP', 'Azure', 'Kubernetes', 'Docker', 'Terraform', 'Ansible', 'CI/CD'],
+              ['Python', 'Go', 'Bash', 'Prometheus', 'Linux']),
+    'Gaming': (['Game Developer', 'Graphics Engineer', 'Gameplay Programmer', 'Technical Artist'],
+               ['C++', 'C#', 'Unity', 'Unreal Engine', 'OpenGL', 'Vulkan'],
+               ['Python', 'Lua', 'Blender', 'Multiplayer Networking']),
+    'Cybersecurity': (['Security Engineer', 'Penetration Tester', 'SOC Analyst', 'Security Architect'],
+                      ['Network Security', 'SIEM', 'Threat Modeling', 'Penetration Testing', 'Python',
+                       'Incident Response'],
+                      ['Linux', 'AWS', 'Kubernetes', 'Go']),
+    'EdTech': (['Product Manager', 'Mobile Developer', 'Full Stack Developer', 'Learning Data Analyst'],
+               ['React Native', 'Flutter', 'JavaScript', 'Python', 'Django', 'Product Analytics'],
+               ['SQL', 'Figma', 'AWS', 'A/B Testing']),
+}
+# (min years, max years, title prefixes)
+SENIORITY = [(0, 2, ['Junior ', 'Associate ', '']), (3, 6, ['', 'Senior ']),
+             (7, 20, ['Senior ', 'Lead ', 'Principal ', 'Staff '])]
+WORK_PREFERENCES = [('Remote', 46), ('Hybrid', 37), ('Onsite', 9), ('On-site', 8)]  # mix of the sample file
+LOCATIONS = ['Berlin, Germany', 'London, UK', 'Bangalore, India', 'San Francisco, USA', 'New York, USA',
+             'Toronto, Canada', 'Singapore', 'Tokyo, Japan', 'São Paulo, Brazil', 'Madrid, Spain',
+             'Barcelona, Spain', 'Dubai, UAE', 'Accra, Ghana', 'Nairobi, Kenya', 'Sydney, Australia',
+             'Amsterdam, Netherlands', 'Paris, France', 'Warsaw, Poland', 'Seoul, South Korea', 'Mexico City, Mexico']
+DEGREES = ['BSc in Computer Science', 'BTech in CS', 'MSc in Computer Science', 'MSc in Data Science',
+           'PhD in Machine Learning', 'BEng in Electrical Engineering', 'MBA', 'BSc in Mathematics']
+UNIVERSITIES = ['ETH Zurich', 'Stanford University', 'IIT Bombay', 'University of Toronto', 'TU Munich',
+                'National University of Singapore', 'University of Cape Town', 'Tsinghua University',
+                'Imperial College London', 'Universidad de Buenos Aires']
+COMPANIES = ['Google', 'Microsoft', 'Amazon', 'Meta', 'DeepMind', 'Hugging Face', 'OpenAI', 'Stripe',
+             'Shopify', 'Spotify', 'Infosys', 'Revolut', 'Zalando', 'Booking.com', 'Atlassian', 'Grab',
+             'Nubank', 'Flipkart', 'Unity', 'CrowdStrike']
+FIRST_NAMES = ['Jane', 'Arjun', 'Maria', 'Kwame', 'Yuki', 'Lucas', 'Aisha', 'Chen', 'Sofia', 'Omar',
+               'Elena', 'Mateo', 'Priya', 'Noah', 'Amara', 'Lars', 'Fatima', 'Diego', 'Hana', 'Tomasz']
+LAST_NAMES = ['Doe', 'Sharma', 'Garcia', 'Mensah', 'Tanaka', 'Silva', 'Khan', 'Wei', 'Rossi', 'Haddad',
+              'Petrova', 'Lopez', 'Nair', 'Smith', 'Okafor', 'Berg', 'Zahra', 'Fernandez', 'Kim', 'Nowak']
+
+
+def synthetic_candidate(rng: random.Random, i: int) -> Dict:
+    sector = rng.choice(list(SECTORS))
+    titles, core, adjacent = SECTORS[sector]
+    years = min(int(rng.expovariate(1 / 5)), 20)
+    prefixes = next(prefixes for low, high, prefixes in SENIORITY if low <= years <= high)
+    title = rng.choice(prefixes) + rng.choice(titles)
+    skills = rng.sample(core, rng.randint(3, min(6, len(core)))) + rng.sample(adjacent, rng.randint(0, 2))
+    companies = rng.sample(COMPANIES, rng.randint(0, 3))
+    available = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+    return {
+        'id': f"synthetic-{i:07d}",
+        'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'photo': f"https://example.com/photo{i}.jpg",
+        'title': title,
+        'sector': sector,
+        'location': rng.choice(LOCATIONS),
+        'yearsOfExperience': years,
+        'skills': skills,
+        'workPreference': rng.choices([p for p, _ in WORK_PREFERENCES], [w for _, w in WORK_PREFERENCES])[0],
+        'education': f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)}",
+        'pastCompanies': companies,
+        'summary': (f"{title} with {years} years in {sector}, working mostly with "
+                    f"{', '.join(skills[:3])}" + (f" at {companies[0]}." if companies else ".")),
+        'availableFrom': available.isoformat(),
+        'screeningQuestion': f"How would you apply {skills[0]} to a {sector} product?",
+    }
+
+
+def synthetic_candidates(size: int, seed: int = 42) -> Iterator[Dict]:
+    """size candidates, the same ones for the same seed"""
+    rng = random.Random(seed)
+    for i in range(size):
+        yield synthetic_candidate(rng, i)
+
+
+def write_jsonl(path: str, size: int, seed: int = 42) -> Path:
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for candidate in synthetic_candidates(size, seed):
+            f.write(json.dumps(candidate) + '\n')
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, required=True)
+    args = parser.parse_args()
+
+    path = write_jsonl(args.output, args.size, args.seed)
+    logger.info(f"Wrote {args.size} synthetic candidates to {path}")
+
+
+if __name__ == '__main__':
+    main()
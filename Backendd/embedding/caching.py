@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional
+
+# Returned by get_many() for keys that are absent or expired
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with an optional time-to-live and hit/miss counters"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _store(self, key: Hashable, value, now: float):
+        self._entries[key] = (now + self.ttl if self.ttl else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+        return default if value is MISSING else value
+
+    def get_many(self, keys: Iterable[Hashable]) -> List:
+        """Values for keys in order, MISSING where not cached, under a single lock acquisition"""
+        now = time.monotonic()
+        with self._lock:
+            return [self._lookup(key, now) for key in keys]
+
+    def put(self, key: Hashable, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, value, time.monotonic())
+
+    def put_many(self, items: Iterable[tuple]):
+        if self.maxsize <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items:
+                self._store(key, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query; the uncased models ignore case and repeated whitespace anyway"""
+    return ' '.join(query.lower().split())
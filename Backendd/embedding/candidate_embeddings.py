@@ -1,17 +1,43 @@
+import base64
+import copy
+import hashlib
+import hmac
 import json
-import faiss
+import math
 import numpy as np
-from sentence_transformers import SentenceTransformer, CrossEncoder
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Dict, Set, Optional, Tuple
 import os
-import re
+import secrets
+import threading
+import time
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
+from ann_index import IndexConfig, build_index, exact_search, search_parameters
+from caching import MISSING, LRUCache, normalize_query
+from concurrency import ReadWriteLock, SingleFlight
+from embedding_cache import EmbeddingCache
+from candidate_loader import iter_batches, iter_candidates
+from candidate_store import CandidateStore
+from compression import CODEC_TRAINING_ROWS, MatrixIndex, VectorCodec
+from feature_store import CandidateFeatures, FeatureStore
+from filters import EXACT_SEARCH_MAX_MATCHES, FilterIndex, SearchFilters, date_ordinal
+from inference import MicroBatcher
+from metrics import CONTENT_TYPE, REGISTRY, StageTimer
+from profiling import MAX_PROFILE_SECONDS, CallProfiler, ProfilerBusy, SamplingProfiler, authorized
+from query_analyzer import QueryAnalyzer
+from scoring import ScoringEngine, cascade_depth
+from sharding import ShardCluster, ShardedIndex
+from snapshot import read_manifest, read_snapshot, write_snapshot
+from startup import StartupProgress, lazy_import
+
+# faiss and torch (via sentence-transformers) load in the background warm-up, not at import
+faiss = lazy_import('faiss')
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
@@ -19,6 +45,13 @@ CORS(app)  # Enable CORS for all routes
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rebuild an index that cannot delete vectors (HNSW) once this share of it is tombstoned
+TOMBSTONE_REBUILD_RATIO = 0.1
+
+# Initial cross-encoder cost estimate for latency budgets, and the weight of each new measurement
+RERANK_SECONDS_PER_PAIR = 0.002
+RERANK_COST_SMOOTHING = 0.2
+
 class WorkPreference(Enum):
     REMOTE = "remote"
     ONSITE = "onsite"
@@ -34,20 +67,103 @@ class SearchConfig:
     location_bonus: float = 0.3
     work_pref_bonus: float = 0.4
     education_bonus: float = 0.2
+    # Cascade ranking: retrieve candidate_depth by similarity, score them with the structured
+    # bonuses, then cross-encode the top k plus those within rerank_margin of the k-th
+    candidate_depth: int = 50
+    rerank_margin: float = 0.1
+    max_rerank_pairs: int = 100  # per query
+    max_latency_ms: Optional[float] = None  # default per-request budget, None for no limit
+    # Paginated searches rank this many results once and serve every page from the result cache
+    page_depth: int = 100
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that is malformed or was not signed with this server's secret"""
 
 class CandidateEmbeddings:
     def __init__(self, 
                  model_name: str = 'all-MiniLM-L6-v2',
                  reranker_name: str = 'cross-encoder/ms-marco-MiniLM-L-12-v2',
-                 config: Optional[SearchConfig] = None):
-        self.model = SentenceTransformer(model_name)
-        self.reranker = CrossEncoder(reranker_name)
+                 config: Optional[SearchConfig] = None,
+                 cache_path: Optional[str] = None,
+                 index_config: Optional[IndexConfig] = None,
+                 query_analyzer: Optional[QueryAnalyzer] = None,
+                 rerank_cache_size: int = 100000,
+                 rerank_cache_ttl: Optional[float] = 3600,
+                 query_cache_size: int = 10000,
+                 result_cache_size: int = 1000,
+                 result_cache_ttl: Optional[float] = 600,
+                 cursor_secret: Optional[bytes] = None,
+                 encode_batch_size: int = 64,
+                 rerank_batch_size: int = 256,
+                 batch_wait_ms: float = 2.0,
+                 backend: str = 'torch'):
+        self.model_name = model_name
+        self.reranker_name = reranker_name
+        self.backend = backend
+        if backend == 'onnx':
+            # Optional int8 ONNX Runtime path with the same encode()/predict() interface
+            from onnx_backend import OnnxCrossEncoder, OnnxSentenceEncoder
+            self.model = OnnxSentenceEncoder(model_name)
+            self.reranker = OnnxCrossEncoder(reranker_name)
+        elif backend == 'torch':
+            from sentence_transformers import CrossEncoder, SentenceTransformer
+            self.model = SentenceTransformer(model_name)
+            self.reranker = CrossEncoder(reranker_name)
+        else:
+            raise ValueError(f"Unknown inference backend {backend!r}, expected 'torch' or 'onnx'")
         self.dimension = self.model.get_sentence_embedding_dimension()
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.candidates: List[Dict] = []
+        self.index_config = index_config or IndexConfig()
+        self.index = build_index(self.index_config, self.dimension)
+        self.codec: Optional[VectorCodec] = None  # set per generation when index_config.compressed
+        self._shard_cluster: Optional[ShardCluster] = None  # started with the first sharded index
+        self.candidates = CandidateStore()
         self.embeddings = None
         self.config = config or SearchConfig()
         
+        # Compiled, memoised query parsing shared by scoring and explanations
+        self.query_analyzer = query_analyzer or QueryAnalyzer(
+            work_preferences=[pref.value for pref in WorkPreference])
+        self.features = FeatureStore(self.query_analyzer.seniority)
+        
+        # Row i of candidates/embeddings is stored in the index under label _row_labels[i]
+        self._row_labels: List[int] = []
+        self._label_to_row: Dict[int, int] = {}
+        self._id_to_labels: Dict[str, List[int]] = {}
+        self._next_label = 0
+        self._embedding_buffer = None
+        self._tombstones: Set[int] = set()
+        self._tombstone_selector = None
+        self._filter_index = FilterIndex()
+        self._read_only = False
+        self._lock = ReadWriteLock()
+        
+        # Persistent embedding cache so restarts only encode new or changed candidates
+        # Quantized vectors differ slightly from fp32 ones, so each backend keeps its own cache entries
+        cache_model = model_name if backend == 'torch' else f"{model_name}@{backend}"
+        self.embedding_cache = EmbeddingCache(cache_path, cache_model, self.dimension) if cache_path else None
+        
+        # Cross-encoder scores keyed by (reranker, normalised query, candidate id, candidate text hash);
+        # a changed candidate has a new text hash, so its stale scores are never hit and age out
+        self.rerank_cache = LRUCache(rerank_cache_size, ttl=rerank_cache_ttl)
+        
+        # Embeddings of recent (normalised) queries, and coalescing of identical in-flight searches
+        self.query_cache = LRUCache(query_cache_size)
+        self._search_flights = SingleFlight()
+        
+        # Ranked result lists of paginated searches, keyed by the search their cursors describe;
+        # cursors are signed with cursor_secret, which processes serving the same pool must share
+        self.result_cache = LRUCache(result_cache_size, ttl=result_cache_ttl)
+        self._cursor_secret = cursor_secret or secrets.token_bytes(32)
+        
+        # Query-time inference from concurrent requests is merged into shared forward passes
+        self.query_encoder = MicroBatcher(lambda texts: self.model.encode(texts, normalize_embeddings=True),
+                                          max_batch_size=encode_batch_size, max_wait_ms=batch_wait_ms,
+                                          name='encode')
+        self.rerank_batcher = MicroBatcher(lambda pairs: self.reranker.predict(pairs),
+                                           max_batch_size=rerank_batch_size, max_wait_ms=batch_wait_ms,
+                                           name='rerank')
+        self._rerank_seconds_per_pair = RERANK_SECONDS_PER_PAIR
+        
         # Skill synonyms for better matching
         self.skill_synonyms = {
             'javascript': ['js', 'node.js', 'nodejs'],
@@ -58,37 +174,51 @@ class CandidateEmbeddings:
             'angular': ['angularjs'],
             'vue': ['vuejs', 'vue.js'],
         }
+        
+        # Vectorised bonus scoring over columnar candidate features
+        self.scoring = ScoringEngine(self.config, self.skill_synonyms)
 
     def load_candidates(self, json_path: str):
-        """Load candidates with validation"""
+        """Load candidates with validation from a JSON array or JSON Lines file"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                self.candidates = json.load(f)
+            self.candidates = CandidateStore(self._validated(iter_candidates(json_path)))
             logger.info(f"Loaded {len(self.candidates)} candidates")
-            self._validate_candidates()
         except Exception as e:
             logger.error(f"Error loading candidates: {e}")
             raise
 
-    def _validate_candidates(self):
+    def _validate_candidates(self, candidates: List[Dict]):
         """Validate and clean candidate data"""
+        for i, candidate in enumerate(candidates):
+            self._validate_candidate(i, candidate)
+
+    def _validate_candidate(self, i: int, candidate: Dict):
+        """Validate and clean one candidate record"""
         required_fields = ['name', 'title']
-        for i, candidate in enumerate(self.candidates):
-            # Check required fields
-            for field in required_fields:
-                if field not in candidate or not candidate[field]:
-                    logger.warning(f"Candidate {i} missing required field: {field}")
-            
-            # Normalize numeric fields
-            if 'yearsOfExperience' in candidate:
-                try:
-                    candidate['yearsOfExperience'] = int(candidate['yearsOfExperience'])
-                except (ValueError, TypeError):
-                    candidate['yearsOfExperience'] = 0
-            
-            # Normalize skills to lowercase
-            if 'skills' in candidate and candidate['skills']:
-                candidate['skills'] = [skill.lower().strip() for skill in candidate['skills']]
+        # Check required fields
+        for field in required_fields:
+            if field not in candidate or not candidate[field]:
+                logger.warning(f"Candidate {i} missing required field: {field}")
+        self._normalize_candidate(candidate)
+
+    def _validated(self, candidates: Iterable[Dict]) -> Iterator[Dict]:
+        """Validate and clean records as they stream past"""
+        for i, candidate in enumerate(candidates):
+            self._validate_candidate(i, candidate)
+            yield candidate
+
+    def _normalize_candidate(self, candidate: Dict):
+        """Normalize field types in place"""
+        # Normalize numeric fields
+        if 'yearsOfExperience' in candidate:
+            try:
+                candidate['yearsOfExperience'] = int(candidate['yearsOfExperience'])
+            except (ValueError, TypeError):
+                candidate['yearsOfExperience'] = 0
+        
+        # Normalize skills to lowercase
+        if 'skills' in candidate and candidate['skills']:
+            candidate['skills'] = [skill.lower().strip() for skill in candidate['skills']]
 
     def create_candidate_text(self, candidate: Dict) -> str:
         """Enhanced text representation with weighted fields"""
@@ -116,214 +246,746 @@ class CandidateEmbeddings:
         ]
         return ' '.join([str(field) for field in fields if field])
 
-    def generate_embeddings(self, batch_size: int = 32):
+    def _extract_features(self, candidate: Dict, text: Optional[str] = None) -> CandidateFeatures:
+        """Derive the rerank text and scoring attributes of a candidate once, at indexing time"""
+        return CandidateFeatures(
+            text=self.create_candidate_text(candidate) if text is None else text,
+            skills=frozenset(skill.lower().strip() for skill in candidate.get('skills') or []),
+            title=(candidate.get('title') or '').lower(),
+            sector=(candidate.get('sector') or '').lower(),
+            work_preference=(candidate.get('workPreference') or '').lower(),
+            years_of_experience=candidate.get('yearsOfExperience', 0) or 0,
+            available_from=date_ordinal(candidate.get('availableFrom')),
+        )
+
+    def generate_embeddings(self, batch_size: int = 32, progress: Optional[StartupProgress] = None):
         """Generate embeddings with batching for efficiency"""
         if not self.candidates:
             raise ValueError("No candidates loaded")
         
-        texts = [self.create_candidate_text(c) for c in self.candidates]
-        logger.info(f"Generating embeddings for {len(texts)} candidates...")
+        self._swap_generation(self.candidates, batch_size, progress)
+        logger.info(f"Embeddings generated and {self.index_config.index_type} index built")
+        return self.embeddings
+
+    def reload_candidates(self, json_path: str, batch_size: int = 32,
+                          progress: Optional[StartupProgress] = None) -> Dict:
+        """Rebuild the pool from json_path as a new generation and swap it in atomically.
+
+        Cached embeddings are reused for unchanged candidates. Searches keep running on
+        the old generation while the new one is built, and searches in flight at the
+        swap finish on the generation they started on. Upserts made while the new
+        generation is being built are superseded by the file.
+        """
+        previous = len(self.candidates)
+        total = self.stream_candidates(json_path, batch_size, progress=progress)
+        logger.info(f"Reloaded {total} candidates from {json_path} (previously {previous})")
+        return {'previous_candidates': previous, 'total_candidates': total}
+
+    def stream_candidates(self, path: str, batch_size: int = 32, chunk_size: int = 1024,
+                          progress: Optional[StartupProgress] = None) -> int:
+        """Build the pool from a JSON array or JSON Lines file in chunks, then swap it in atomically.
+
+        Records are parsed, validated and normalised one at a time, and every chunk_size
+        of them are embedded (reusing cached vectors) and, for flat and HNSW indexes,
+        added to the index right away. Peak memory is the compact candidate table and
+        the embeddings plus one chunk, never the parsed file. IVF/PQ indexes are trained
+        once all vectors are in. With compressed storage the first CODEC_TRAINING_ROWS
+        vectors are held as float32 until the codec is trained on them, and every chunk
+        after that is stored as codes straight away. Returns the number of candidates loaded.
+        """
+        if progress is not None:
+            progress.begin('streaming_candidates')
+        candidates = CandidateStore()
+        features = FeatureStore(self.query_analyzer.seniority)
+        compressed = self.index_config.compressed
+        incremental = self.index_config.index_type in ('flat', 'hnsw') and not compressed
+        index = self._build_index() if incremental else None
+        codec = None
+        buffer = None
+        held: List[np.ndarray] = []  # float32 chunks waiting for the codec
+        held_rows = 0
+        cache_keys = []
+        n = 0  # candidates streamed
+        stored = 0  # rows written to buffer
+        # Progress is bytes parsed, published once the records read so far are embedded
+        bytes_read = [0, 0]
+
+        def on_read(done: int, total: int):
+            bytes_read[:] = [done, total]
+
+        records = self._validated(iter_candidates(path, on_read))
+        for batch in iter_batches(records, chunk_size):
+            batch_features = [self._extract_features(c) for c in batch]
+            vectors = self._embed_features(batch_features, batch_size)
+            end = n + len(batch)
+            if compressed and codec is None:
+                held.append(vectors)
+                held_rows += len(vectors)
+                if held_rows >= CODEC_TRAINING_ROWS:
+                    vectors = np.vstack(held)
+                    held = []
+                    codec = self._train_codec(vectors)
+            if not held:
+                buffer = self._write_rows(buffer, stored, vectors if codec is None else codec.encode(vectors))
+                stored += len(vectors)
+            if index is not None:
+                self._index_add(index, vectors, np.arange(n, end, dtype='int64'), batch)
+            for candidate, candidate_features in zip(batch, batch_features):
+                candidates.append(candidate)
+                features.append(candidate_features)
+            if self.embedding_cache is not None:
+                cache_keys.extend(self.embedding_cache.key(f.text) for f in batch_features)
+            n = end
+            if progress is not None:
+                progress.update(*bytes_read)
+        if not n:
+            raise ValueError(f"No candidates in {path}")
+        if held:
+            # A pool smaller than the codec's training sample is trained on in full
+            vectors = np.vstack(held)
+            codec = self._train_codec(vectors)
+            buffer = self._write_rows(buffer, stored, codec.encode(vectors))
+        logger.info(f"Streamed and embedded {n} candidates from {path}")
+        if self.embedding_cache is not None:
+            # Keep the cache file sized to the current pool
+            self.embedding_cache.retain(cache_keys)
+            self.embedding_cache.save()
         
+        if index is None:
+            if progress is not None:
+                progress.begin('indexing')
+            index = self._build_index(buffer[:n], candidates=candidates, codec=codec)
+        self._install_generation(candidates, features, buffer[:n], index, buffer, codec)
+        return n
+
+    def _swap_generation(self, candidates: CandidateStore, batch_size: int = 32,
+                         progress: Optional[StartupProgress] = None):
+        """Encode and index candidates off-lock, then make them live in one short write-locked swap"""
+        logger.info(f"Generating embeddings for {len(candidates)} candidates...")
+        if progress is not None:
+            progress.begin('embedding')
+        features = [self._extract_features(c) for c in candidates]
+        embeddings = self._embed_features(features, batch_size, progress.update if progress is not None else None)
+        if self.embedding_cache is not None:
+            # Keep the cache file sized to the current pool
+            self.embedding_cache.retain(self.embedding_cache.key(f.text) for f in features)
+            self.embedding_cache.save()
+        
+        # Build a fresh (and, for IVF/PQ, freshly trained) index over the whole pool
+        if progress is not None:
+            progress.begin('indexing')
+        codec = self._train_codec(embeddings) if self.index_config.compressed else None
+        if codec is not None:
+            embeddings = codec.encode(embeddings)
+        index = self._build_index(embeddings, candidates=candidates, codec=codec)
+        self._install_generation(candidates, FeatureStore(self.query_analyzer.seniority, features), embeddings, index,
+                                 codec=codec)
+
+    def _install_generation(self, candidates: CandidateStore, features: FeatureStore, embeddings: np.ndarray,
+                            index, buffer: Optional[np.ndarray] = None, codec: Optional[VectorCodec] = None):
+        """Make a fully built generation live, labelled 0..n-1, in one short write-locked swap"""
+        labels = np.arange(len(candidates), dtype='int64')
+        label_maps = self._label_maps(labels, candidates, features)
+        with self._lock.write():
+            previous = self.index
+            self.index = index
+            self.codec = codec
+            self.embeddings = embeddings
+            self._embedding_buffer = embeddings if buffer is None else buffer
+            self.candidates = candidates
+            self.features = features
+            self._read_only = False
+            self._set_labels(labels, label_maps)
+        self._retire_index(previous)
+
+    def _train_codec(self, sample: np.ndarray) -> VectorCodec:
+        return VectorCodec.train(self.index_config.storage, sample, self.index_config.pca_dim)
+
+    @staticmethod
+    def _write_rows(buffer: Optional[np.ndarray], start: int, rows: np.ndarray) -> np.ndarray:
+        """Write rows into buffer from row start, doubling it first if they do not fit (amortised O(1))"""
+        end = start + len(rows)
+        if buffer is None or len(buffer) < end:
+            grown = np.empty((max(end, 2 * start, 64), rows.shape[1]), dtype=rows.dtype)
+            if start:
+                grown[:start] = buffer[:start]
+            buffer = grown
+        buffer[start:end] = rows
+        return buffer
+
+    def _build_index(self, embeddings: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None,
+                     candidates: Optional[Iterable[Dict]] = None, config: Optional[IndexConfig] = None,
+                     codec: Optional[VectorCodec] = None):
+        """A faiss index, or with num_shards > 1 a ShardedIndex placing rows by candidate id.
+
+        embeddings are stored rows, i.e. codes when codec is given. A flat index is a
+        MatrixIndex scanning those rows (float32 or codes) rather than a second copy of
+        them; HNSW and IVF indexes are built from the decoded rows and keep a copy of their own.
+        """
+        config = config or self.index_config
+        dimension = self.dimension
+        if config.index_type == 'flat' and config.num_shards <= 1:
+            return MatrixIndex(codec or VectorCodec('float32', dimension), 0 if embeddings is None else len(embeddings))
+        if codec is not None:
+            dimension = codec.dimension
+            if embeddings is not None:
+                embeddings = codec.decode(embeddings)
+        if config.num_shards <= 1:
+            return build_index(config, dimension, embeddings, ids=ids)
+        if self._shard_cluster is None or len(self._shard_cluster) != config.num_shards:
+            self._shard_cluster = ShardCluster(config.num_shards, config.shard_addresses)
+        if ids is None and embeddings is not None:
+            ids = np.arange(len(embeddings), dtype='int64')
+        keys = None if candidates is None else self._shard_keys(candidates, ids)
+        return ShardedIndex(self._shard_cluster, config, dimension, embeddings, ids, keys)
+
+    @staticmethod
+    def _shard_keys(candidates: Iterable[Dict], labels: np.ndarray) -> List:
+        """Placement key of each row: its candidate id, or its label when it has none"""
+        return [label if candidate.get('id') is None else candidate['id']
+                for candidate, label in zip(candidates, labels.tolist())]
+
+    def _index_add(self, index, vectors: np.ndarray, labels: np.ndarray, candidates: List[Dict]):
+        if isinstance(index, ShardedIndex):
+            index.add_with_ids(vectors, labels, keys=self._shard_keys(candidates, labels))
+        else:
+            index.add_with_ids(vectors, labels)
+
+    @staticmethod
+    def _retire_index(index):
+        """Free a replaced index's shards (searches on it finished before the swap's write lock)"""
+        if isinstance(index, ShardedIndex):
+            index.close()
+
+    def _index_search(self, queries: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int],
+                      mask: Optional[np.ndarray] = None):
+        """Top k of the live index, restricted to the labels set in mask if given (call under the read lock)"""
+        if isinstance(self.index, ShardedIndex):
+            return self.index.search(queries, k, nprobe=nprobe, ef_search=ef_search, mask=mask)
+        if isinstance(self.index, MatrixIndex):
+            return self.index.search(queries, k, self.embeddings, self._row_labels, mask=mask)
+        # Removed labels are already cleared from the mask, so it replaces the tombstone selector
+        selector = self._tombstone_selector if mask is None else self._filter_index.selector(mask)
+        params = search_parameters(self.index, nprobe=nprobe, ef_search=ef_search, selector=selector)
+        return self.index.search(queries, k, params=params)
+
+    def _embed_features(self, features: List[CandidateFeatures], batch_size: int = 32,
+                        progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """Embed candidate texts, reusing cached vectors where the text is unchanged"""
+        texts = [f.text for f in features]
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(texts, lambda batch: self._encode_texts(batch, batch_size, progress))
+        return self._encode_texts(texts, batch_size, progress)
+
+    def _encode_texts(self, texts: List[str], batch_size: int = 32,
+                      progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """Encode texts with the bi-encoder in fixed-size batches, reporting (encoded, total) after each"""
         # Process in batches for memory efficiency
         all_embeddings = []
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
             batch_embeddings = self.model.encode(batch, normalize_embeddings=True, show_progress_bar=False)
             all_embeddings.append(batch_embeddings)
+            if progress is not None:
+                progress(i + len(batch), len(texts))
+        if not all_embeddings:
+            return np.zeros((0, self.dimension), dtype='float32')
+        return np.vstack(all_embeddings).astype('float32')
+
+    def _label_maps(self, labels: np.ndarray, candidates: CandidateStore,
+                    features: FeatureStore) -> Tuple[List[int], Dict[int, int], Dict[str, List[int]], FilterIndex]:
+        """Label <-> row <-> candidate id maps and the filter index of a generation's rows"""
+        row_labels = [int(label) for label in labels]
+        label_to_row = {label: row for row, label in enumerate(row_labels)}
+        id_to_labels: Dict[str, List[int]] = {}
+        for label, candidate in zip(row_labels, candidates):
+            if candidate.get('id') is not None:
+                id_to_labels.setdefault(str(candidate['id']), []).append(label)
+        filter_index = FilterIndex()
+        for label, candidate_features in zip(row_labels, features):
+            filter_index.add(label, candidate_features)
+        return row_labels, label_to_row, id_to_labels, filter_index
+
+    def _set_labels(self, labels: np.ndarray, label_maps: Optional[Tuple] = None):
+        """Install the label maps for the current rows, built here unless precomputed off-lock"""
+        if label_maps is None:
+            label_maps = self._label_maps(labels, self.candidates, self.features)
+        self._row_labels, self._label_to_row, self._id_to_labels, self._filter_index = label_maps
+        self._next_label = max(self._row_labels, default=-1) + 1
+        self._tombstones = set()
+        self._tombstone_selector = None
+
+    @property
+    def memory_mapped(self) -> bool:
+        """Whether the index and embeddings are served straight from a memory-mapped snapshot"""
+        return self._read_only
+
+    def _ensure_writable(self):
+        """Copy a memory-mapped snapshot into private memory before the first mutation"""
+        if self._read_only:
+            if not isinstance(self.index, (ShardedIndex, MatrixIndex)):
+                self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+            self.embeddings = self._embedding_buffer = np.array(self.embeddings)
+            self._read_only = False
+
+    def _append_rows(self, candidates: List[Dict], features: List[CandidateFeatures],
+                     vectors: np.ndarray, labels: np.ndarray):
+        """Append rows, doubling the embedding buffer so appends are amortised O(1)"""
+        start = len(self.candidates)
+        end = start + len(candidates)
+        self._embedding_buffer = self._write_rows(self._embedding_buffer, start, vectors)
+        self.embeddings = self._embedding_buffer[:end]
+        for row, (candidate, candidate_features, label) in enumerate(zip(candidates, features, labels), start):
+            label = int(label)
+            self.candidates.append(candidate)
+            self.features.append(candidate_features)
+            self._filter_index.add(label, candidate_features)
+            self._row_labels.append(label)
+            self._label_to_row[label] = row
+            self._id_to_labels.setdefault(str(candidate['id']), []).append(label)
+
+    def _remove_labels(self, labels: List[int]):
+        """Drop rows by label, moving the last row into each hole so removal is O(1)"""
+        for label in labels:
+            row = self._label_to_row.pop(label)
+            self._filter_index.remove(label)
+            last = len(self.candidates) - 1
+            if row != last:
+                moved = self._row_labels[last]
+                self.candidates.move(last, row)
+                self.features.move(last, row)
+                self.embeddings[row] = self.embeddings[last]
+                self._row_labels[row] = moved
+                self._label_to_row[moved] = row
+            self.candidates.pop()
+            self.features.pop()
+            self._row_labels.pop()
+            self.embeddings = self._embedding_buffer[:last]
         
-        self.embeddings = np.vstack(all_embeddings)
-        self.index.add(self.embeddings.astype('float32'))
-        logger.info("Embeddings generated and index built")
-        return self.embeddings
+        if not labels:
+            return
+        try:
+            self.index.remove_ids(np.asarray(labels, dtype='int64'))
+        except RuntimeError:
+            # HNSW graphs cannot drop vectors; hide them from searches until the next rebuild
+            self._tombstones.update(labels)
+            if len(self._tombstones) > TOMBSTONE_REBUILD_RATIO * max(1, self.index.ntotal):
+                self._rebuild_index()
+            else:
+                tombstones = np.array(sorted(self._tombstones), dtype='int64')
+                self._tombstone_selector = faiss.IDSelectorNot(faiss.IDSelectorBatch(tombstones))
+
+    def _rebuild_index(self):
+        """Rebuild the index from the current rows, keeping their labels"""
+        labels = np.array(self._row_labels, dtype='int64')
+        previous = self.index
+        self.index = self._build_index(self.embeddings, labels, self.candidates, codec=self.codec)
+        self._retire_index(previous)
+        self._tombstones = set()
+        self._tombstone_selector = None
+
+    def upsert_candidates(self, candidates: List[Dict], batch_size: int = 32) -> Dict:
+        """Add new candidates or replace existing ones (matched by id) without a full rebuild"""
+        if self.embeddings is None:
+            raise ValueError("Embeddings not generated. Call generate_embeddings() first.")
+        
+        # Last record wins when the same id appears twice in one batch
+        by_id = {}
+        for candidate in candidates:
+            if candidate.get('id') is None:
+                raise ValueError("Every candidate needs an 'id' to be upserted")
+            by_id[str(candidate['id'])] = candidate
+        batch = list(by_id.values())
+        for candidate in batch:
+            self._normalize_candidate(candidate)
+        
+        # Encode before taking the lock so searches keep running meanwhile
+        features = [self._extract_features(c) for c in batch]
+        vectors = self._embed_features(features, batch_size)
+        
+        with self._lock.write():
+            self._ensure_writable()
+            replaced = [label for cid in by_id for label in self._id_to_labels.pop(cid, [])]
+            self._remove_labels(replaced)
+            labels = np.arange(self._next_label, self._next_label + len(batch), dtype='int64')
+            self._next_label += len(batch)
+            if self.codec is None:
+                self._append_rows(batch, features, vectors, labels)
+                self._index_add(self.index, vectors, labels, batch)
+            else:
+                # New rows are encoded with this generation's codec
+                self._append_rows(batch, features, self.codec.encode(vectors), labels)
+                self._index_add(self.index, self.codec.project(vectors), labels, batch)
+        
+        logger.info(f"Upserted {len(batch)} candidates ({len(replaced)} replaced rows)")
+        return {'upserted': len(batch), 'replaced': len(replaced), 'total_candidates': len(self.candidates)}
+
+    def remove_candidates(self, candidate_ids: List[str]) -> Dict:
+        """Remove candidates by id from the candidate list and the live index"""
+        with self._lock.write():
+            self._ensure_writable()
+            labels = [label for cid in candidate_ids for label in self._id_to_labels.pop(str(cid), [])]
+            self._remove_labels(labels)
+        
+        logger.info(f"Removed {len(labels)} candidates")
+        return {'removed': len(labels), 'total_candidates': len(self.candidates)}
 
     def save_index(self, path: str):
         """Save the FAISS index to disk"""
         if self.index is None:
             raise ValueError("No index to save. Generate embeddings first.")
+        if isinstance(self.index, ShardedIndex):
+            raise ValueError("A sharded index lives in the shard servers; use save_snapshot()")
+        if isinstance(self.index, MatrixIndex):
+            raise ValueError("A flat index is the embedding matrix itself; use save_snapshot()")
         faiss.write_index(self.index, path)
         logger.info(f"Index saved to {path}")
 
     def load_index(self, path: str):
-        """Load the FAISS index from disk"""
+        """Load the FAISS index from disk (use load_snapshot() to restore embeddings and candidates too)"""
         if not os.path.exists(path):
             raise FileNotFoundError(f"Index file not found: {path}")
         self.index = faiss.read_index(path)
         logger.info(f"Index loaded from {path}")
 
+    def save_snapshot(self, path: str, source: Optional[Dict] = None) -> str:
+        """Persist index, embeddings and candidate table together as one snapshot"""
+        if self.embeddings is None:
+            raise ValueError("Embeddings not generated. Call generate_embeddings() first.")
+        manifest = {
+            'model_name': self.model_name,
+            'backend': self.backend,
+            'dimension': self.dimension,
+            'index_type': type(self.index).__name__,
+            'index_config': asdict(self.index_config),
+            'source': source,
+        }
+        with self._lock.write():
+            if self._tombstones:
+                self._rebuild_index()
+        with self._lock.read():
+            # Shards and flat indexes are rebuilt from the embeddings on load,
+            # so no index file is written for them
+            index = None if isinstance(self.index, (ShardedIndex, MatrixIndex)) else self.index
+            return write_snapshot(path, index, self.embeddings, self.candidates.iter_dicts(),
+                                  np.array(self._row_labels, dtype='int64'), manifest, codec=self.codec)
+
+    def load_snapshot(self, path: str, mmap: bool = True) -> Dict:
+        """Restore a snapshot written by save_snapshot() so search() works without re-encoding.
+
+        Embeddings (and HNSW/IVF index files) are mapped, but the candidate store and the
+        search features are rebuilt from the snapshot's candidate table, record by record.
+        """
+        snapshot = read_snapshot(path, mmap=mmap)
+        manifest = snapshot.manifest
+        if (manifest.get('model_name') != self.model_name or manifest.get('dimension') != self.dimension or
+                manifest.get('backend', 'torch') != self.backend):
+            raise ValueError(f"Snapshot was built with {manifest.get('model_name')} "
+                             f"({manifest.get('backend', 'torch')}, {manifest.get('dimension')} dims), "
+                             f"not {self.model_name} ({self.backend}, {self.dimension} dims)")
+        features = FeatureStore(self.query_analyzer.seniority,
+                                [self._extract_features(c) for c in snapshot.candidates])
+        candidates = CandidateStore(snapshot.candidates)
+        label_maps = self._label_maps(snapshot.labels, candidates, features)
+        index_config = self.index_config
+        if manifest.get('index_config'):
+            # Shard placement belongs to this deployment, not to the snapshot
+            index_config = IndexConfig(**{**manifest['index_config'], 'num_shards': self.index_config.num_shards,
+                                          'shard_addresses': self.index_config.shard_addresses})
+        index = snapshot.index
+        # A flat index scans the embeddings, even where an older snapshot stored an IndexFlatIP
+        if index_config.num_shards > 1 or index_config.index_type == 'flat' or (
+                index is None and snapshot.codec is not None):
+            index = self._build_index(snapshot.embeddings, snapshot.labels, candidates, index_config, snapshot.codec)
+        elif index is None:
+            raise ValueError(f"Snapshot at {path} has no index file (it was written from a sharded index)")
+        with self._lock.write():
+            previous = self.index
+            self.index_config = index_config
+            self.index = index
+            self.codec = snapshot.codec
+            self.embeddings = self._embedding_buffer = snapshot.embeddings
+            self.candidates = candidates
+            self.features = features
+            self._read_only = mmap
+            self._set_labels(snapshot.labels, label_maps)
+        self._retire_index(previous)
+        return manifest
+
     def extract_query_requirements(self, query: str) -> Dict:
         """Extract structured requirements from query"""
-        requirements = {
-            'years_exp': None,
-            'skills': [],
-            'work_preference': None,
-            'location': None,
-            'seniority': None,
-            'sector': None
-        }
-        
-        query_lower = query.lower()
-        
-        # Extract years of experience
-        exp_patterns = [
-            r'(\d+)\+?\s*years?\s*(?:of\s*)?(?:experience|exp)',
-            r'(\d+)\+?\s*yrs?',
-            r'with\s*(\d+)\+?\s*years?'
-        ]
-        for pattern in exp_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                requirements['years_exp'] = int(match.group(1))
-                break
-        
-        # Extract work preference
-        for pref in WorkPreference:
-            if pref.value in query_lower:
-                requirements['work_preference'] = pref.value
-                break
-        
-        # Extract seniority level
-        seniority_keywords = ['senior', 'lead', 'principal', 'staff', 'junior', 'entry']
-        for keyword in seniority_keywords:
-            if keyword in query_lower:
-                requirements['seniority'] = keyword
-                break
-        
-        # Extract technical skills (basic approach)
-        common_skills = ['python', 'javascript', 'react', 'langchain', 'tensorflow', 'pytorch', 
-                        'aws', 'docker', 'kubernetes', 'sql', 'nosql', 'machine learning', 'ai']
-        for skill in common_skills:
-            if skill in query_lower:
-                requirements['skills'].append(skill)
-        
-        # Extract sector/industry information
-        common_sectors = ['healthcare', 'finance', 'tech', 'education', 'retail', 'manufacturing', 
-                         'government', 'nonprofit', 'media', 'entertainment', 'energy', 'transportation',
-                         'consulting', 'legal', 'hospitality', 'construction', 'agriculture', 'pharmaceutical']
-        for sector in common_sectors:
-            if sector in query_lower:
-                requirements['sector'] = sector
-                break
-        
-        return requirements
+        return self.query_analyzer.analyze(query)
 
     def calculate_enhanced_score(self, similarity_score: float, rerank_score: float, 
-                               query: str, candidate: Dict) -> Tuple[int, Dict]:
+                               query: str, candidate: Dict,
+                               features: Optional[CandidateFeatures] = None,
+                               requirements: Optional[Dict] = None) -> Tuple[int, Dict]:
         """Enhanced scoring with detailed breakdown"""
-        requirements = self.extract_query_requirements(query)
-        
-        # Normalize scores to 0-1 range
-        sim_norm = (similarity_score + 1) / 2
-        rerank_norm = (rerank_score + 1) / 2
-        
-        # Base score from similarity and reranking
-        base_score = (sim_norm * self.config.similarity_weight + 
-                     rerank_norm * self.config.rerank_weight)
-        
-        # Detailed scoring breakdown
-        breakdown = {
-            'base_score': round(base_score, 3),
-            'experience_bonus': 0,
-            'skill_bonus': 0,
-            'work_pref_bonus': 0,
-            'seniority_bonus': 0,
-            'sector_bonus': 0,
-            'total_bonus': 0
-        }
+        if requirements is None:
+            requirements = self.extract_query_requirements(query)
+        if features is None:
+            features = self._extract_features(candidate, text='')
         
-        # Experience matching
-        if requirements['years_exp']:
-            candidate_exp = candidate.get('yearsOfExperience', 0)
-            if candidate_exp >= requirements['years_exp']:
-                exp_bonus = min(0.2, (candidate_exp - requirements['years_exp']) * 0.05 + 0.1)
-                breakdown['experience_bonus'] = round(exp_bonus, 3)
-        
-        # Skill matching with fuzzy matching
-        if requirements['skills']:
-            candidate_skills = set(skill.lower() for skill in candidate.get('skills', []))
-            matched_skills = 0
-            for req_skill in requirements['skills']:
-                if req_skill in candidate_skills:
-                    matched_skills += 1
-                else:
-                    # Check synonyms
-                    if req_skill in self.skill_synonyms:
-                        for synonym in self.skill_synonyms[req_skill]:
-                            if synonym in candidate_skills:
-                                matched_skills += 0.8  # Partial credit for synonyms
-                                break
-            
-            skill_bonus = min(0.3, matched_skills * 0.1)
-            breakdown['skill_bonus'] = round(skill_bonus, 3)
-        
-        # Work preference matching
-        if (requirements['work_preference'] and 
-            candidate.get('workPreference', '').lower() == requirements['work_preference']):
-            breakdown['work_pref_bonus'] = 0.15
-        
-        # Seniority matching
-        if requirements['seniority']:
-            candidate_title = candidate.get('title', '').lower()
-            if requirements['seniority'] in candidate_title:
-                breakdown['seniority_bonus'] = 0.1
-        
-        # Sector matching
-        if requirements['sector'] and candidate.get('sector', '').lower() == requirements['sector']:
-            breakdown['sector_bonus'] = 0.2
-        else:
-            breakdown['sector_bonus'] = 0
+        # A pool of one, scored against its own vocabulary
+        store = FeatureStore(self.query_analyzer.seniority, [features])
+        scores = self.scoring.score(store, store.columns(np.array([0])),
+                                    np.array([similarity_score]), np.array([rerank_score]), requirements)
+        return int(scores.final[0]), scores.breakdown(0)
+
+    def search(self, query: str, k: int = 5, rerank: bool = True,
+               nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+               filters: Optional[SearchFilters] = None, max_rerank_pairs: Optional[int] = None,
+               max_latency_ms: Optional[float] = None) -> List[Dict]:
+        """Enhanced search with detailed scoring.
+
+        Identical searches already running in other threads are joined rather than
+        repeated; every caller gets its own copy of the shared results.
+        """
+        return self._search_with_stats(query, k, rerank, nprobe, ef_search, filters,
+                                       max_rerank_pairs, max_latency_ms)[0]
+
+    def _search_with_stats(self, query: str, k: int, rerank: bool, nprobe: Optional[int],
+                           ef_search: Optional[int], filters: Optional[SearchFilters],
+                           max_rerank_pairs: Optional[int], max_latency_ms: Optional[float],
+                           timer: Optional[StageTimer] = None) -> Tuple[List[Dict], Dict]:
+        """search() plus the cascade stage counts of the query"""
+        key = (normalize_query(query), k, rerank, nprobe, ef_search, repr(filters), max_rerank_pairs, max_latency_ms)
+        started = time.perf_counter()
+        (results, stats), shared = self._search_flights.do(
+            key, lambda: self._batch_search([query], k, rerank, nprobe, ef_search, filters,
+                                            max_rerank_pairs, max_latency_ms, timer))
+        if shared and timer is not None:
+            # The stages ran in the caller this search was coalesced with
+            timer.add('coalesced_wait', time.perf_counter() - started)
+        return (copy.deepcopy(results[0]), dict(stats[0])) if shared else (results[0], stats[0])
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Normalised query embeddings, encoding only queries missing from the query cache"""
+        keys = [normalize_query(query) for query in queries]
+        vectors = self.query_cache.get_many(keys)
+        missing: Dict[str, List[int]] = {}
+        for i, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is MISSING:
+                missing.setdefault(key, []).append(i)
+        if missing:
+            encoded = self.query_encoder.submit([queries[positions[0]] for positions in missing.values()])
+            encoded = np.asarray(encoded, dtype='float32')
+            self.query_cache.put_many(zip(missing, encoded.copy()))
+            for positions, vector in zip(missing.values(), encoded):
+                for i in positions:
+                    vectors[i] = vector
+        return np.vstack(vectors).astype('float32')
+
+    def _filtered_search(self, query_embeddings: np.ndarray, k: int, filters: SearchFilters,
+                         nprobe: Optional[int], ef_search: Optional[int]):
+        """Nearest neighbours among the candidates passing filters (call under the read lock)"""
+        mask = self._filter_index.mask(filters)
+        matching = np.flatnonzero(mask)
+        if len(matching) <= EXACT_SEARCH_MAX_MATCHES:
+            rows = [self._label_to_row[label] for label in matching]
+            vectors = self.embeddings[rows]
+            if self.codec is not None:
+                vectors = self.codec.decode(vectors)
+            return exact_search(query_embeddings, vectors, matching, k)
+        return self._index_search(query_embeddings, k, nprobe, ef_search, mask)
+
+    def batch_search(self, queries: List[str], k: int = 5, rerank: bool = True,
+                     nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                     filters: Optional[SearchFilters] = None, max_rerank_pairs: Optional[int] = None,
+                     max_latency_ms: Optional[float] = None) -> List[List[Dict]]:
+        """Search many queries with one encode pass, one FAISS search and one rerank call.
+
+        filters are hard constraints applied inside the ANN search, so k results are
+        returned whenever k candidates pass them. max_rerank_pairs (per query) and
+        max_latency_ms (for the whole request) cap the cross-encoder work.
+        """
+        return self._batch_search(queries, k, rerank, nprobe, ef_search, filters,
+                                  max_rerank_pairs, max_latency_ms)[0]
+
+    def _batch_search(self, queries: List[str], k: int, rerank: bool, nprobe: Optional[int],
+                      ef_search: Optional[int], filters: Optional[SearchFilters],
+                      max_rerank_pairs: Optional[int], max_latency_ms: Optional[float],
+                      timer: Optional[StageTimer] = None) -> Tuple[List[List[Dict]], List[Dict]]:
+        """batch_search() plus per-query cascade stage counts.
+
+        Ranking is a cascade: FAISS retrieves candidate_depth neighbours, the
+        vectorised structured bonuses rank them with the bi-encoder similarity
+        standing in for the cross-encoder score, and only the top N go to the
+        cross-encoder, where N covers the top k plus every candidate within
+        rerank_margin of the k-th (see cascade_depth). Stage times and candidate
+        counts go to timer if given.
+        """
+        if self.embeddings is None:
+            raise ValueError("Embeddings not generated. Call generate_embeddings() first.")
+        if not queries:
+            return [], []
+        timer = timer or StageTimer()
+        started = time.perf_counter()
+        if max_latency_ms is None:
+            max_latency_ms = self.config.max_latency_ms
+        pair_limit = self.config.max_rerank_pairs
+        if max_rerank_pairs is not None:
+            pair_limit = min(pair_limit, max_rerank_pairs)
         
-        # Calculate total bonus
-        breakdown['total_bonus'] = round(sum([
-            breakdown['experience_bonus'],
-            breakdown['skill_bonus'],
-            breakdown['work_pref_bonus'],
-            breakdown['seniority_bonus'],
-            breakdown['sector_bonus']
-        ]), 3)
+        with timer.stage('encode'):
+            query_embeddings = self._encode_queries(queries)
+        depth = max(self.config.candidate_depth, k * 2) if rerank else k * 2
         
-        # Final score (0-1 range, then scale to 1-10)
-        final_score_normalized = base_score + breakdown['total_bonus']
-        final_score = max(1, min(10, int(round(final_score_normalized * 10))))
+        # Stage 1, per query: the hits' labels, similarities and gathered scoring columns
+        pools = []
+        stats = []
+        with self._lock.read():
+            if self.codec is not None:
+                # Into this generation's code space (a PCA projection, if any)
+                query_embeddings = self.codec.project(query_embeddings)
+            with timer.stage('ann_search'):
+                if filters is not None:
+                    scores, labels = self._filtered_search(query_embeddings.astype('float32'), depth, filters,
+                                                           nprobe, ef_search)
+                else:
+                    scores, labels = self._index_search(query_embeddings.astype('float32'), depth, nprobe, ef_search)
+            for query_labels, query_scores in zip(labels, scores):
+                rows = []
+                hit_labels = []
+                similarities = []
+                for label, score in zip(query_labels, query_scores):
+                    row = self._label_to_row.get(int(label))
+                    if row is not None:
+                        rows.append(row)
+                        hit_labels.append(int(label))
+                        similarities.append(score)
+                stats.append({'retrieved': len(rows), 'reranked': 0, 'budget_limited': False})
+                timer.scanned += len(rows)
+                if not rerank:
+                    pools.append([dict(self.candidates.to_dict(row), similarity_score=float(similarity))
+                                  for row, similarity in zip(rows[:k], similarities[:k])])
+                    continue
+                pools.append((
+                    hit_labels,
+                    np.array(similarities, dtype='float32'),
+                    [(self.candidates[row].get('id'), self.features.text(row)) for row in rows],
+                    self.features.columns(np.array(rows, dtype='int64')),
+                ))
+            # Vocabularies only grow, so a reference stays valid for decoding after release
+            store = self.features
+            # A reload swaps in new objects, so these keep resolving labels of this search's generation
+            candidates = self.candidates
+            label_to_row = self._label_to_row
+
+        if not rerank:
+            for query_stats, results in zip(stats, pools):
+                query_stats['returned'] = len(results)
+            return pools, stats
+
+        # Stage 2: structured bonuses on the similarity-only score decide what is worth cross-encoding
+        with timer.stage('scoring'):
+            requirements = [self.extract_query_requirements(query) for query in queries]
+            stage2 = []
+            for (_, similarities, _, columns), query_requirements, query_stats in zip(pools, requirements, stats):
+                prelim = self.scoring.score(store, columns, similarities, similarities, query_requirements)
+                order = np.argsort(-prelim.normalized, kind='stable')
+                wanted = cascade_depth(prelim.normalized[order], k, self.config.rerank_margin, len(order))
+                query_stats['budget_limited'] = wanted > pair_limit
+                stage2.append([prelim, order, min(wanted, pair_limit)])
         
-        return final_score, breakdown
+        if max_latency_ms is not None and max_latency_ms < math.inf:
+            # Whatever is left of the budget after retrieval, at the measured cost per pair
+            remaining = max_latency_ms / 1000 - (time.perf_counter() - started)
+            affordable = max(0, int(remaining / self._rerank_seconds_per_pair)) // len(queries)
+            for cascade, query_stats in zip(stage2, stats):
+                if cascade[2] > affordable:
+                    cascade[2] = affordable
+                    query_stats['budget_limited'] = True
 
-    def search(self, query: str, k: int = 5, rerank: bool = True) -> List[Dict]:
-        """Enhanced search with detailed scoring"""
-        if self.embeddings is None:
-            raise ValueError("Embeddings not generated. Call generate_embeddings() first.")
+        # Stage 3: every uncached selected (query, candidate) pair goes to the cross-encoder in one call;
+        # selections keep retrieval order so that equal match scores keep their similarity order
+        selections = [np.sort(order[:n]) for _, order, n in stage2]
+        pairs = []
+        keys = []
+        for query, (_, _, documents, _), selected in zip(queries, pools, selections):
+            query_key = normalize_query(query)
+            for i in selected:
+                candidate_id, text = documents[i]
+                pairs.append([query, text])
+                keys.append((self.reranker_name, query_key, candidate_id, hash(text)))
+        with timer.stage('rerank'):
+            rerank_scores = self._rerank_pairs(pairs, keys)
+        timer.reranked += len(pairs)
+        
+        # Per query: (pool position, scores, index into scores, rerank score) in final order
+        rankings = []
+        offset = 0
+        with timer.stage('scoring'):
+            for (_, similarities, _, columns), (prelim, order, n), selected, query_requirements, query_stats in zip(
+                    pools, stage2, selections, requirements, stats):
+                pool_rerank = rerank_scores[offset:offset + len(selected)]
+                offset += len(selected)
+                pool_scores = self.scoring.score(store, columns.take(selected), similarities[selected], pool_rerank,
+                                                 query_requirements)
+                ranking = [(selected[j], pool_scores, j, pool_rerank[j])
+                           for j in np.argsort(-pool_scores.final, kind='stable')]
+                # Short of k cross-encoded candidates, the rest follow in stage-2 order
+                ranking.extend((i, prelim, i, None) for i in order[n:n + k])
+                rankings.append(ranking)
+                query_stats['reranked'] = len(selected)
         
-        query_embedding = self.model.encode([query], normalize_embeddings=True)
-        scores, indices = self.index.search(query_embedding.astype('float32'), k * 2)  # Get more for reranking
+        # Only the returned top k are materialised as result dicts
+        batch_results = []
+        with self._lock.read():
+            for (hit_labels, similarities, _, _), ranking, query_stats in zip(pools, rankings, stats):
+                results = []
+                for i, pool_scores, j, rerank_score in ranking:
+                    if len(results) == k:
+                        break
+                    row = label_to_row.get(hit_labels[i])
+                    if row is None:
+                        continue  # removed or replaced while reranking
+                    result = candidates.to_dict(row)
+                    result['similarity_score'] = float(similarities[i])
+                    if rerank_score is not None:
+                        result['rerank_score'] = float(rerank_score)
+                    result['match_score'] = int(pool_scores.final[j])
+                    result['score_breakdown'] = pool_scores.breakdown(j)
+                    results.append(result)
+                query_stats['returned'] = len(results)
+                batch_results.append(results)
 
-        results = []
-        for idx, score in zip(indices[0], scores[0]):
-            if idx < len(self.candidates):
-                result = self.candidates[idx].copy()
-                result['similarity_score'] = float(score)
-                results.append(result)
+        return batch_results, stats
 
-        if rerank and results:
-            pairs = [[query, self.create_candidate_text(r)] for r in results]
-            rerank_scores = self.reranker.predict(pairs)
-            
-            for i, r in enumerate(results):
-                r['rerank_score'] = float(rerank_scores[i])
-                score, breakdown = self.calculate_enhanced_score(
-                    r['similarity_score'], 
-                    r['rerank_score'],
-                    query,
-                    r
-                )
-                r['match_score'] = score
-                r['score_breakdown'] = breakdown
-            
-            results.sort(key=lambda x: x['match_score'], reverse=True)
+    def _rerank_pairs(self, pairs: List[List[str]], keys: List[Tuple]) -> np.ndarray:
+        """Cross-encoder scores for pairs, sending only those missing from the rerank cache to the model"""
+        scores = self.rerank_cache.get_many(keys)
+        missing = [i for i, score in enumerate(scores) if score is MISSING]
+        if missing:
+            started = time.perf_counter()
+            predicted = self.rerank_batcher.submit([pairs[i] for i in missing])
+            per_pair = (time.perf_counter() - started) / len(missing)
+            self._rerank_seconds_per_pair += RERANK_COST_SMOOTHING * (per_pair - self._rerank_seconds_per_pair)
+            self.rerank_cache.put_many((keys[i], score) for i, score in zip(missing, predicted))
+            for i, score in zip(missing, predicted):
+                scores[i] = score
+        return np.asarray(scores)
 
-        return results[:k]
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the search caches, for sizing them"""
+        stats = {
+            'rerank': self.rerank_cache.stats(),
+            'query_embeddings': self.query_cache.stats(),
+            'search_results': self.result_cache.stats(),
+            'search_coalescing': self._search_flights.stats(),
+        }
+        if self.embedding_cache is not None:
+            stats['candidate_embeddings'] = {
+                'size': len(self.embedding_cache),
+                'hits': self.embedding_cache.hits,
+                'misses': self.embedding_cache.misses,
+            }
+        return stats
 
-    def get_match_explanation(self, query: str, candidate: Dict) -> Dict:
+    def get_match_explanation(self, query: str, candidate: Dict, requirements: Optional[Dict] = None) -> Dict:
         """Get structured match explanation"""
-        requirements = self.extract_query_requirements(query)
+        if requirements is None:
+            requirements = self.extract_query_requirements(query)
         explanation = {
             'candidate_name': candidate.get('name', 'Unknown'),
             'checks': []
@@ -370,41 +1032,18 @@ class CandidateEmbeddings:
         
         return explanation
 
-    def search_candidates_json(self, query: str, k: int = 5, include_explanations: bool = False) -> Dict:
+    def search_candidates_json(self, query: str, k: int = 5, include_explanations: bool = False,
+                               nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                               filters: Optional[SearchFilters] = None, max_rerank_pairs: Optional[int] = None,
+                               max_latency_ms: Optional[float] = None, timer: Optional[StageTimer] = None) -> Dict:
         """Search candidates and return JSON response for frontend"""
+        timer = timer or StageTimer()
         try:
-            results = self.search(query, k=k)
-            
-            response = {
-                'status': 'success',
-                'query': query,
-                'total_results': len(results),
-                'candidates': []
-            }
-            
-            for result in results:
-                candidate_data = {
-                    'id': result.get('id'),
-                    'name': result.get('name', 'Unknown'),
-                    'title': result.get('title', 'No Title'),
-                    'location': result.get('location', 'Not specified'),
-                    'years_of_experience': result.get('yearsOfExperience', 0),
-                    'skills': result.get('skills', []),
-                    'work_preference': result.get('workPreference', 'Not specified'),
-                    'education': result.get('education', 'Not specified'),
-                    'past_companies': result.get('pastCompanies', []),
-                    'summary': result.get('summary', ''),
-                    'match_score': result.get('match_score', 0),
-                    'similarity_score': round(result.get('similarity_score', 0), 3),
-                    'rerank_score': round(result.get('rerank_score', 0), 3),
-                    'score_breakdown': result.get('score_breakdown', {})
-                }
-                
-                if include_explanations:
-                    candidate_data['match_explanation'] = self.get_match_explanation(query, result)
-                
-                response['candidates'].append(candidate_data)
-            
+            results, cascade = self._search_with_stats(query, k, True, nprobe, ef_search, filters,
+                                                       max_rerank_pairs, max_latency_ms, timer)
+            with timer.stage('format'):
+                response = self._format_results(query, results, include_explanations)
+            response['cascade'] = cascade
             return response
             
         except Exception as e:
@@ -415,17 +1054,136 @@ class CandidateEmbeddings:
                 'candidates': []
             }
 
-    def batch_search_json(self, queries: List[str], k: int = 3, include_explanations: bool = False) -> Dict:
+    def search_page_json(self, query: Optional[str] = None, page_size: int = 10, cursor: Optional[str] = None,
+                         include_explanations: bool = False, nprobe: Optional[int] = None,
+                         ef_search: Optional[int] = None, filters: Optional[SearchFilters] = None,
+                         max_rerank_pairs: Optional[int] = None, max_latency_ms: Optional[float] = None,
+                         timer: Optional[StageTimer] = None) -> Dict:
+        """One page of a search, walked with the opaque cursor each page returns.
+
+        Without a cursor the query is ranked once, config.page_depth deep, and its
+        first page_size results are returned. Each next_cursor is self-contained: it
+        carries the query, filters, ANN knobs, ranking depth, the number of pairs the
+        cross-encoder scored and the offset, signed with the cursor secret. The
+        process that ranked the search slices later pages out of its result cache;
+        any other process sharing the secret (another serve.py worker), or this one
+        after the entry expired, re-ranks the search from the cursor with the same
+        pair count and no latency budget, which gives the same ranking as long as the
+        candidate pool has not changed. Raises InvalidCursor for a tampered cursor.
+        """
+        timer = timer or StageTimer()
+        if cursor is not None:
+            search, offset = self._read_cursor(cursor)
+            query = search['query']
+            filters = SearchFilters.from_dict(search['filters'])
+            nprobe, ef_search = search['nprobe'], search['ef_search']
+        else:
+            search = {'query': query, 'filters': filters.to_dict() if filters else None, 'nprobe': nprobe,
+                      'ef_search': ef_search, 'depth': max(self.config.page_depth, page_size)}
+            offset = 0
+        
+        entry = self.result_cache.get(self._result_key(search)) if cursor is not None else None
+        if entry is None:
+            try:
+                if cursor is None:
+                    results, cascade = self._search_with_stats(query, search['depth'], True, nprobe, ef_search,
+                                                               filters, max_rerank_pairs, max_latency_ms, timer)
+                    search['reranked'] = cascade['reranked']
+                else:
+                    results, cascade = self._search_with_stats(query, search['depth'], True, nprobe, ef_search,
+                                                               filters, search['reranked'], math.inf, timer)
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'message': str(e),
+                    'query': query,
+                    'candidates': []
+                }
+            self.result_cache.put(self._result_key(search), (results, cascade))
+        else:
+            results, cascade = entry
+        
+        end = offset + page_size
+        with timer.stage('format'):
+            response = self._format_results(query, results[offset:end], include_explanations)
+        response['cascade'] = cascade
+        response['page'] = {
+            'offset': offset,
+            'page_size': page_size,
+            'ranked_results': len(results),
+            'next_cursor': self._write_cursor(search, end) if end < len(results) else None,
+        }
+        return response
+
+    @staticmethod
+    def _result_key(search: Dict) -> str:
+        return json.dumps(search, sort_keys=True)
+
+    def _write_cursor(self, search: Dict, offset: int) -> str:
+        """search and offset as base64url JSON, then its HMAC-SHA256 under the cursor secret"""
+        payload = base64.urlsafe_b64encode(json.dumps(dict(search, offset=offset), sort_keys=True).encode())
+        signature = hmac.new(self._cursor_secret, payload, hashlib.sha256).digest()
+        return f"{payload.decode()}.{base64.urlsafe_b64encode(signature).decode()}"
+
+    def _read_cursor(self, cursor: str) -> Tuple[Dict, int]:
+        """The search and offset a cursor from _write_cursor carries"""
+        payload, _, signature = cursor.encode().partition(b'.')
+        expected = base64.urlsafe_b64encode(hmac.new(self._cursor_secret, payload, hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidCursor("Invalid cursor, use the next_cursor of a previous page")
+        search = json.loads(base64.urlsafe_b64decode(payload))
+        return search, search.pop('offset')
+
+    def _format_results(self, query: str, results: List[Dict], include_explanations: bool = False) -> Dict:
+        """Shape ranked results into the JSON response the frontend expects"""
+        response = {
+            'status': 'success',
+            'query': query,
+            'total_results': len(results),
+            'candidates': []
+        }
+        requirements = self.extract_query_requirements(query) if include_explanations else None
+        
+        for result in results:
+            candidate_data = {
+                'id': result.get('id'),
+                'name': result.get('name', 'Unknown'),
+                'title': result.get('title', 'No Title'),
+                'location': result.get('location', 'Not specified'),
+                'years_of_experience': result.get('yearsOfExperience', 0),
+                'skills': result.get('skills', []),
+                'work_preference': result.get('workPreference', 'Not specified'),
+                'education': result.get('education', 'Not specified'),
+                'past_companies': result.get('pastCompanies', []),
+                'summary': result.get('summary', ''),
+                'match_score': result.get('match_score', 0),
+                'similarity_score': round(result.get('similarity_score', 0), 3),
+                'rerank_score': round(result.get('rerank_score', 0), 3),
+                'score_breakdown': result.get('score_breakdown', {})
+            }
+            
+            if include_explanations:
+                candidate_data['match_explanation'] = self.get_match_explanation(query, result, requirements)
+            
+            response['candidates'].append(candidate_data)
+        
+        return response
+
+    def batch_search_json(self, queries: List[str], k: int = 3, include_explanations: bool = False,
+                          nprobe: Optional[int] = None, ef_search: Optional[int] = None,
+                          filters: Optional[SearchFilters] = None, max_rerank_pairs: Optional[int] = None,
+                          max_latency_ms: Optional[float] = None, timer: Optional[StageTimer] = None) -> Dict:
         """Batch search and return JSON response"""
+        timer = timer or StageTimer()
         try:
             results = {}
             
-            for query in queries:
-                results[query] = self.search_candidates_json(
-                    query, 
-                    k=k, 
-                    include_explanations=include_explanations
-                )
+            batch_results, batch_stats = self._batch_search(queries, k, True, nprobe, ef_search, filters,
+                                                            max_rerank_pairs, max_latency_ms, timer)
+            with timer.stage('format'):
+                for query, query_results, cascade in zip(queries, batch_results, batch_stats):
+                    results[query] = self._format_results(query, query_results, include_explanations)
+                    results[query]['cascade'] = cascade
             
             return {
                 'status': 'success',
@@ -441,17 +1199,118 @@ class CandidateEmbeddings:
             }
 
 # Initialize the candidate search instance
-candidate_search = CandidateEmbeddings()
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', os.path.join('src', 'embeddings', 'embedding_cache.npz'))
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', os.path.join('src', 'embeddings', 'snapshot'))
+# INDEX_SHARDS > 1 spreads the index over that many shard processes, spawned locally unless
+# SHARD_ADDRESSES lists running ones (host:port,...; they share the hex key in SHARD_AUTHKEY)
+# EMBEDDING_STORAGE (float32, float16, int8) and EMBEDDING_PCA_DIM keep the pool as one compact code matrix
+INDEX_CONFIG = IndexConfig(index_type=os.getenv('INDEX_TYPE', 'flat'),
+                           num_shards=int(os.getenv('INDEX_SHARDS', '1')),
+                           shard_addresses=[address for address in os.getenv('SHARD_ADDRESSES', '').split(',')
+                                            if address] or None,
+                           storage=os.getenv('EMBEDDING_STORAGE', 'float32'),
+                           pca_dim=int(os.getenv('EMBEDDING_PCA_DIM', '0')) or None)
+RERANK_CACHE_SIZE = int(os.getenv('RERANK_CACHE_SIZE', '100000'))
+RERANK_CACHE_TTL = float(os.getenv('RERANK_CACHE_TTL', '3600'))
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '10000'))
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '1000'))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '600'))
+# Key signing pagination cursors; processes serving one pool behind a balancer must share it
+# (serve.py hands its workers a random one). Unset, cursors only resolve in the process that issued them
+CURSOR_SECRET = os.getenv('CURSOR_SECRET')
+BATCH_WAIT_MS = float(os.getenv('INFERENCE_BATCH_WAIT_MS', '2'))
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'torch')  # 'torch' or 'onnx' (int8, needs onnxruntime)
+# Seconds between checks of candidates.json for changes that trigger a reload; 0 disables the watcher
+CANDIDATES_WATCH_INTERVAL = float(os.getenv('CANDIDATES_WATCH_INTERVAL', '0'))
+
+# Bearer token of the /admin endpoints, the live-update endpoints (/candidates writes, POST /reload)
+# and ?profile=1 requests; unset disables them
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Built by the background warm-up; routes only touch it once search_initialized is set
+candidate_search: Optional[CandidateEmbeddings] = None
+search_initialized = False
+startup = StartupProgress()
+candidates_source: Optional[str] = None  # the candidates.json being served
+reload_progress: Optional[StartupProgress] = None  # the latest reload
+_reload_lock = threading.Lock()
+# Set by serve.py in its worker processes, which share one snapshot; each would only update its own copy
+shared_serving = False
+SHARED_SERVING_ERROR = ('Live updates are disabled with multiple worker processes; '
+                        'update candidates.json and restart the server')
+ADMIN_AUTH_ERROR = 'Admin bearer token required (set ADMIN_TOKEN on the server)'
+sampling_profiler = SamplingProfiler()
+
+def rerank_budget(data: Dict) -> Dict:
+    """Optional per-request cross-encoder budget (max_rerank_pairs, max_latency_ms) from a search request"""
+    budget = {'max_rerank_pairs': data.get('max_rerank_pairs'), 'max_latency_ms': data.get('max_latency_ms')}
+    pairs = budget['max_rerank_pairs']
+    if pairs is not None and (isinstance(pairs, bool) or not isinstance(pairs, int) or pairs < 0):
+        raise ValueError("max_rerank_pairs must be a non-negative integer")
+    latency = budget['max_latency_ms']
+    if latency is not None and (isinstance(latency, bool) or not isinstance(latency, (int, float)) or latency <= 0):
+        raise ValueError("max_latency_ms must be a positive number")
+    return budget
+
+def request_profiler() -> Optional[CallProfiler]:
+    """A CallProfiler when the request asks for ?profile=1, which only admins may"""
+    if request.args.get('profile') != '1':
+        return None
+    if not authorized(request.headers.get('Authorization'), ADMIN_TOKEN):
+        raise PermissionError(ADMIN_AUTH_ERROR)
+    return CallProfiler()
+
+def admin_denied():
+    """The 401/403 response for a request without the admin bearer token, None when it has it"""
+    header = request.headers.get('Authorization')
+    if authorized(header, ADMIN_TOKEN):
+        return None
+    if not header:
+        return jsonify({'error': ADMIN_AUTH_ERROR}), 401, {'WWW-Authenticate': 'Bearer'}
+    return jsonify({'error': ADMIN_AUTH_ERROR}), 403
+
+def run_profiled(profiler: Optional[CallProfiler], search: Callable[[], Dict]) -> Dict:
+    """search(), with a 'profile' block of just that call when profiler is given.
+
+    Raises ProfilerBusy, before running the search, while another request is being profiled.
+    """
+    if profiler is None:
+        return search()
+    with profiler:
+        payload = search()
+    payload['profile'] = profiler.summary()
+    return payload
+
+def timed_response(payload: Dict, status: int, timer: StageTimer, endpoint: str, include_timings: bool = False):
+    """jsonify payload and record the request's stage metrics, serialisation included, under endpoint.
+
+    With include_timings the payload carries a timings block (in ms) of the stages
+    up to serialisation, which is only measured once the block is part of the body.
+    """
+    if include_timings:
+        payload['timings'] = timer.timings()
+    with timer.stage('serialize'):
+        response = jsonify(payload)
+    timer.observe(endpoint, status)
+    return response, status
+
+def candidates_fingerprint(path: str) -> Dict:
+    """Cheap identity of a candidates file, used to tell whether a snapshot is stale"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
 
 def initialize_search_system():
     """Initialize the search system on startup"""
+    global candidate_search, candidates_source
     try:
         # Try different possible paths for candidates.json
         possible_paths = [
             'candidates.json',
             'data/candidates.json',
             '../data/candidates.json',
-            './data/candidates.json'
+            './data/candidates.json',
+            'candidates.jsonl',
+            'data/candidates.jsonl'
         ]
         
         candidates_path = None
@@ -464,18 +1323,131 @@ def initialize_search_system():
             logger.error("candidates.json not found in any of the expected locations")
             logger.info(f"Searched in: {possible_paths}")
             logger.info("Please ensure candidates.json exists in one of these locations")
+            startup.fail("candidates.json not found")
             return False
         
-        candidate_search.load_candidates(candidates_path)
-        candidate_search.generate_embeddings()
+        candidates_source = candidates_path
+        startup.begin('loading_models')
+        search = CandidateEmbeddings(cache_path=EMBEDDING_CACHE_PATH, index_config=INDEX_CONFIG,
+                                     rerank_cache_size=RERANK_CACHE_SIZE, rerank_cache_ttl=RERANK_CACHE_TTL,
+                                     query_cache_size=QUERY_CACHE_SIZE, result_cache_size=RESULT_CACHE_SIZE,
+                                     result_cache_ttl=RESULT_CACHE_TTL, batch_wait_ms=BATCH_WAIT_MS,
+                                     cursor_secret=CURSOR_SECRET.encode() if CURSOR_SECRET else None,
+                                     backend=INFERENCE_BACKEND)
+        
+        if shared_serving:
+            # serve.py prepared the snapshot before starting the workers, and they all map that one
+            startup.begin('loading_snapshot')
+            search.load_snapshot(SNAPSHOT_PATH, mmap=True)
+            candidate_search = search
+            logger.info("Search system initialized from the shared snapshot")
+            return True
+        
+        # Serve from the snapshot when it was built from this exact candidates file
+        fingerprint = candidates_fingerprint(candidates_path)
+        manifest = read_manifest(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+        if (manifest and manifest.get('source') == fingerprint and
+                manifest.get('backend', 'torch') == INFERENCE_BACKEND and
+                (manifest.get('index_config') or {}).get('index_type') == INDEX_CONFIG.index_type and
+                (manifest.get('index_config') or {}).get('num_shards', 1) == INDEX_CONFIG.num_shards and
+                (manifest.get('index_config') or {}).get('storage', 'float32') == INDEX_CONFIG.storage and
+                (manifest.get('index_config') or {}).get('pca_dim') == INDEX_CONFIG.pca_dim):
+            try:
+                startup.begin('loading_snapshot')
+                search.load_snapshot(SNAPSHOT_PATH)
+                candidate_search = search
+                logger.info("Search system initialized from snapshot")
+                return True
+            except Exception as e:
+                logger.warning(f"Snapshot load failed, rebuilding: {e}")
+        
+        search.stream_candidates(candidates_path, progress=startup)
+        if SNAPSHOT_PATH:
+            try:
+                startup.begin('saving_snapshot')
+                search.save_snapshot(SNAPSHOT_PATH, source=fingerprint)
+            except Exception as e:
+                logger.warning(f"Could not write snapshot: {e}")
+        candidate_search = search
         logger.info("Search system initialized successfully")
         return True
     except Exception as e:
         logger.error(f"Setup failed: {e}")
+        startup.fail(str(e))
         return False
 
-# Initialize on import
-search_initialized = initialize_search_system()
+def reload_search_system(progress: StartupProgress):
+    """Rebuild the live generation from candidates.json (run with _reload_lock held; releases it)"""
+    try:
+        # Fingerprint first, so a write landing mid-reload is picked up by the next one
+        fingerprint = candidates_fingerprint(candidates_source)
+        result = candidate_search.reload_candidates(candidates_source, progress=progress)
+        if SNAPSHOT_PATH:
+            try:
+                progress.begin('saving_snapshot')
+                candidate_search.save_snapshot(SNAPSHOT_PATH, source=fingerprint)
+            except Exception as e:
+                logger.warning(f"Could not write snapshot: {e}")
+        progress.finish()
+        logger.info(f"Reload complete: {result}")
+    except Exception as e:
+        logger.error(f"Reload failed, still serving the previous generation: {e}")
+        progress.fail(str(e))
+    finally:
+        _reload_lock.release()
+
+def start_reload() -> bool:
+    """Start a background reload; False if one is already running or live updates are disabled"""
+    global reload_progress
+    if shared_serving or not _reload_lock.acquire(blocking=False):
+        return False
+    reload_progress = StartupProgress()
+    threading.Thread(target=reload_search_system, args=(reload_progress,), name='search-reload', daemon=True).start()
+    return True
+
+def watch_candidates(interval: float):
+    """Poll candidates.json and reload whenever its size or modification time changes"""
+    last = candidates_fingerprint(candidates_source)
+    while True:
+        time.sleep(interval)
+        try:
+            current = candidates_fingerprint(candidates_source)
+        except OSError:
+            continue  # being replaced right now
+        if current != last and start_reload():
+            logger.info(f"{candidates_source} changed, reloading")
+            last = current
+
+def warm_up():
+    """Build the search system, flipping search_initialized once it can serve"""
+    global search_initialized
+    search_initialized = initialize_search_system()
+    if search_initialized:
+        startup.finish()
+        # Worker processes of serve.py serve the snapshot prepared at startup and never reload
+        if CANDIDATES_WATCH_INTERVAL > 0 and not shared_serving:
+            threading.Thread(target=watch_candidates, args=(CANDIDATES_WATCH_INTERVAL,),
+                             name='candidates-watcher', daemon=True).start()
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread: Optional[threading.Thread] = None
+
+def start_warm_up():
+    """Warm up in the background (once) so the server can bind (and answer probes) immediately.
+
+    Importing this module builds nothing; whatever serves the app starts the
+    warm-up: the __main__ block, serve.py, or a WSGI server loading create_app().
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name='search-warmup', daemon=True)
+            _warm_up_thread.start()
+
+def create_app() -> Flask:
+    """The API with its search system warming up, for WSGI servers (gunicorn 'candidate_embeddings:create_app()')"""
+    start_warm_up()
+    return app
 
 @app.route('/search', methods=['POST'])
 def search_candidates():
@@ -488,17 +1460,168 @@ def search_candidates():
     
     query = data.get('query')
     k = data.get('top_k', 5)
+    # Optional ANN recall/latency knobs (IVF cells to visit, HNSW candidate list size)
+    nprobe = data.get('nprobe')
+    ef_search = data.get('ef_search')
+    # Pagination: "page_size" starts a paged search, "cursor" (a page's next_cursor) fetches the next page
+    cursor = data.get('cursor')
+    page_size = data.get('page_size')
+    paginated = cursor is not None or page_size is not None
 
-    if not query:
+    if not query and cursor is None:
         return jsonify({'error': 'Missing query in request'}), 400
+    if paginated:
+        page_size = k if page_size is None else page_size
+        if isinstance(page_size, bool) or not isinstance(page_size, int) or page_size < 1:
+            return jsonify({'error': 'page_size must be a positive integer'}), 400
+        if cursor is not None and not isinstance(cursor, str):
+            return jsonify({'error': 'cursor must be a string'}), 400
+    
+    # Optional hard constraints, e.g. {"min_experience": 3, "work_preference": "remote", "skills_all": ["python"]}
+    # and cross-encoder budget, e.g. {"max_rerank_pairs": 20, "max_latency_ms": 150}
+    try:
+        filters = SearchFilters.from_dict(data.get('filters'))
+        budget = rerank_budget(data)
+        profiler = request_profiler()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
 
+    # "timings": true adds per-stage latencies to the response, ?profile=1 (admins) a cProfile summary
+    timer = StageTimer()
     try:
-        results = candidate_search.search_candidates_json(query=query, k=k)
-        return jsonify(results), 200
+        if paginated:
+            results = run_profiled(profiler, lambda: candidate_search.search_page_json(
+                query=query, page_size=page_size, cursor=cursor, nprobe=nprobe, ef_search=ef_search,
+                filters=filters, timer=timer, **budget))
+        else:
+            results = run_profiled(profiler, lambda: candidate_search.search_candidates_json(
+                query=query, k=k, nprobe=nprobe, ef_search=ef_search, filters=filters, timer=timer, **budget))
+        return timed_response(results, 200, timer, 'search', bool(data.get('timings')))
+    except InvalidCursor as e:
+        return timed_response({'error': str(e)}, 400, timer, 'search')
+    except ProfilerBusy as e:
+        return timed_response({'error': str(e)}, 409, timer, 'search')
     except Exception as e:
         logger.error(f"Search failed: {e}")
+        return timed_response({'error': str(e)}, 500, timer, 'search')
+
+@app.route('/batch_search', methods=['POST'])
+def batch_search_candidates():
+    """Run many queries through one batched encode/search/rerank pass"""
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    queries = data.get('queries')
+    k = data.get('top_k', 3)
+    include_explanations = data.get('include_explanations', False)
+    
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q for q in queries):
+        return jsonify({'error': 'Missing queries in request'}), 400
+    
+    try:
+        filters = SearchFilters.from_dict(data.get('filters'))
+        budget = rerank_budget(data)
+        profiler = request_profiler()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    
+    timer = StageTimer()
+    try:
+        results = run_profiled(profiler, lambda: candidate_search.batch_search_json(
+            queries, k=k, include_explanations=include_explanations,
+            nprobe=data.get('nprobe'), ef_search=data.get('ef_search'), filters=filters, timer=timer, **budget))
+        status = 200 if results['status'] == 'success' else 500
+        return timed_response(results, status, timer, 'batch_search', bool(data.get('timings')))
+    except ProfilerBusy as e:
+        return timed_response({'error': str(e)}, 409, timer, 'batch_search')
+    except Exception as e:
+        logger.error(f"Batch search failed: {e}")
+        return timed_response({'error': str(e)}, 500, timer, 'batch_search')
+
+@app.route('/candidates', methods=['POST'])
+def upsert_candidates():
+    """Add new candidates or update existing ones (by id) in the live index (admin only)"""
+    denied = admin_denied()
+    if denied:
+        return denied
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    if shared_serving:
+        return jsonify({'error': SHARED_SERVING_ERROR}), 409
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    candidates = data.get('candidates')
+    if not isinstance(candidates, list) or not candidates:
+        return jsonify({'error': 'Missing candidates in request'}), 400
+    
+    try:
+        result = candidate_search.upsert_candidates(candidates)
+        return jsonify({'status': 'success', **result}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Candidate upsert failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/candidates', methods=['DELETE'])
+def remove_candidates():
+    """Remove candidates by id from the live index (admin only)"""
+    denied = admin_denied()
+    if denied:
+        return denied
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    if shared_serving:
+        return jsonify({'error': SHARED_SERVING_ERROR}), 409
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return jsonify({'error': 'Missing ids in request'}), 400
+    
+    try:
+        result = candidate_search.remove_candidates(ids)
+        return jsonify({'status': 'success', **result}), 200
+    except Exception as e:
+        logger.error(f"Candidate removal failed: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/reload', methods=['POST'])
+def reload_candidates():
+    """Rebuild the index from candidates.json in the background and swap it in when ready (admin only)"""
+    denied = admin_denied()
+    if denied:
+        return denied
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    if shared_serving:
+        return jsonify({'error': SHARED_SERVING_ERROR}), 409
+    
+    if not start_reload():
+        return jsonify({'status': 'already_running', 'reload': reload_progress.status()}), 409
+    return jsonify({'status': 'started', 'source': candidates_source}), 202
+
+@app.route('/reload', methods=['GET'])
+def reload_status():
+    """Progress of the latest reload"""
+    if reload_progress is None:
+        return jsonify({'status': 'idle'}), 200
+    return jsonify({'status': 'running' if _reload_lock.locked() else 'done', 'reload': reload_progress.status()}), 200
+
 @app.route('/sector_ranking', methods=['POST'])
 def rank_candidates_by_sector():
     """Rank candidates based on sector and other criteria"""
@@ -512,6 +1635,10 @@ def rank_candidates_by_sector():
     sector = data.get('sector')
     if not sector:
         return jsonify({'error': 'Missing sector in request'}), 400
+    try:
+        profiler = request_profiler()
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
     
     # Additional filters
     min_experience = data.get('min_experience', 0)
@@ -525,9 +1652,11 @@ def rank_candidates_by_sector():
     if skills:
         query += f" who know {', '.join(skills)}"
     
+    timer = StageTimer()
     try:
         # Use the existing search functionality with the constructed query
-        results = candidate_search.search_candidates_json(query=query, k=k, include_explanations=True)
+        results = run_profiled(profiler, lambda: candidate_search.search_candidates_json(
+            query=query, k=k, include_explanations=True, timer=timer))
         
         # Add sector match percentage to the results
         for candidate in results['candidates']:
@@ -545,10 +1674,62 @@ def rank_candidates_by_sector():
                 candidate['matchScoreBreakdown'] = {}
             candidate['matchScoreBreakdown']['sectorMatch'] = sector_match
         
-        return jsonify(results), 200
+        return timed_response(results, 200, timer, 'sector_ranking', bool(data.get('timings')))
+    except ProfilerBusy as e:
+        return timed_response({'error': str(e)}, 409, timer, 'sector_ranking')
     except Exception as e:
         logger.error(f"Sector ranking failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return timed_response({'error': str(e)}, 500, timer, 'sector_ranking')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Cache sizes and hit/miss counters"""
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    return jsonify(candidate_search.cache_stats()), 200
+
+@app.route('/inference/stats', methods=['GET'])
+def inference_stats():
+    """Queue depth and batch-size histograms of the micro-batched models"""
+    if not search_initialized:
+        return jsonify({'error': 'Search system not initialized. Please check if candidates.json exists.'}), 500
+    return jsonify({
+        'encode': candidate_search.query_encoder.stats(),
+        'rerank': candidate_search.rerank_batcher.stats(),
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and per-stage latency histograms and candidate counters (of all serve.py workers), Prometheus text"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route('/admin/profile', methods=['POST'])
+def profile_process():
+    """Sample every thread of this process for ?seconds=N (default 10, at most MAX_PROFILE_SECONDS).
+
+    Returns the top functions and the collapsed stacks as JSON, or with
+    ?format=collapsed just the collapsed-stack file, ready for flamegraph.pl or
+    speedscope. ?interval_ms sets the sampling interval (default 5).
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', 5))
+    except ValueError:
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or interval_ms <= 0:
+        return jsonify({'error': f"seconds must be in (0, {MAX_PROFILE_SECONDS}] and interval_ms positive"}), 400
+
+    try:
+        profile = sampling_profiler.run(seconds, interval_ms / 1000)
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    if request.args.get('format') == 'collapsed':
+        return Response(profile['collapsed'], content_type='text/plain; charset=utf-8',
+                        headers={'Content-Disposition': 'attachment; filename=profile.collapsed'})
+    return jsonify(profile), 200
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -556,11 +1737,30 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'search_initialized': search_initialized,
-        'candidates_loaded': len(candidate_search.candidates) if search_initialized else 0
+        'candidates_loaded': len(candidate_search.candidates) if search_initialized else 0,
+        'startup': startup.status()
+    }), 200
+
+@app.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving HTTP, warmed up or not"""
+    return jsonify({'status': 'alive'}), 200
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once searches can be served, 503 with warm-up progress until then"""
+    status = startup.status()
+    if not search_initialized:
+        return jsonify({'status': 'failed' if status['phase'] == 'failed' else 'starting', 'startup': status}), 503
+    return jsonify({
+        'status': 'ready',
+        'candidates_loaded': len(candidate_search.candidates),
+        'startup': status
     }), 200
 
 def main():
     """Main function for standalone execution"""
+    startup.wait()
     if not search_initialized:
         logger.error("Cannot run main() - search system not initialized")
         return
@@ -573,7 +1773,7 @@ def main():
         skill_match_bonus=0.8
     )
     
-    embedder = CandidateEmbeddings(config=config)
+    embedder = CandidateEmbeddings(config=config, cache_path=EMBEDDING_CACHE_PATH)
     
     # Load candidates
     candidates_path = Path('data') / 'candidates.json'
@@ -624,6 +1824,7 @@ def main():
     print(f"\nResults saved to {output_path}")
 
 if __name__ == '__main__':
+    start_warm_up()
     if len(os.sys.argv) > 1 and os.sys.argv[1] == 'main':
         main()
     else:
@@ -0,0 +1,184 @@
+import codecs
+import json
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Bytes read from the file per chunk
+CHUNK_SIZE = 1 << 20
+
+# A single candidate may span this many characters before an unclosed bracket is
+# taken for malformed input rather than a long record, bounding the buffer
+MAX_CANDIDATE_CHARS = 16 * CHUNK_SIZE
+
+_WHITESPACE = ' \t\n\r'
+_STRUCTURE = re.compile(r'["{}\[\]]')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+class _ChunkReader:
+    """UTF-8 text chunks of a binary file, counting the bytes consumed for progress"""
+
+    def __init__(self, f, total: int, progress: Optional[Callable[[int, int], None]]):
+        self.f = f
+        self.total = total
+        self.progress = progress
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def read(self) -> str:
+        """Next chunk of text, '' at end of file"""
+        while True:
+            data = self.f.read(CHUNK_SIZE)
+            self.bytes_read += len(data)
+            if self.progress is not None:
+                self.progress(self.bytes_read, self.total)
+            text = self._decoder.decode(data, final=not data)
+            if text or not data:
+                return text
+
+
+def _record(value, position: str) -> Dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"Candidate {position} is not a JSON object")
+    return value
+
+
+def _value_end(text: str, pos: int) -> Optional[int]:
+    """End of the JSON value starting at pos if its brackets and strings close within text, else None.
+
+    Only structure is tracked, so a value that ends here may still be invalid JSON;
+    a scalar is taken to end where it starts, as no amount of further input makes
+    it a candidate object.
+    """
+    if text[pos] not in '[{"':
+        return pos + 1
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(text, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        if match.group() == '"':
+            tail = _STRING_TAIL.match(text, pos)
+            if tail is None:
+                return None
+            pos = tail.end()
+            if depth == 0:
+                return pos
+        elif match.group() in '[{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth <= 0:
+                return pos
+
+
+def _iter_json_array(reader: _ChunkReader, buffer: str) -> Iterator[Dict]:
+    """Elements of a top-level JSON array, decoded one at a time from a sliding buffer.
+
+    Only an element that genuinely continues past the buffer makes it read on, so
+    a malformed one fails as soon as it is complete (or once it is longer than
+    MAX_CANDIDATE_CHARS) instead of buffering the rest of the file. Errors give
+    the character offset in the file.
+    """
+    decoder = json.JSONDecoder()
+    pos = _skip_whitespace(buffer, 0) + 1  # past the '['
+    offset = 0  # characters of the file dropped from the front of buffer
+    count = 0
+
+    def next_token() -> bool:
+        """Move pos to the next non-whitespace character, reading on; False at end of file"""
+        nonlocal buffer, pos, offset
+        while True:
+            pos = _skip_whitespace(buffer, pos)
+            if pos < len(buffer):
+                return True
+            chunk = reader.read()
+            if not chunk:
+                return False
+            offset += len(buffer)
+            buffer, pos = chunk, 0
+
+    while True:
+        if not next_token():
+            raise ValueError(f"Truncated JSON array after {count} candidates")
+        if buffer[pos] == ']':
+            return
+        if count:
+            if buffer[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' after candidate #{count - 1} "
+                                 f"at character {offset + pos}")
+            pos += 1
+            if not next_token():
+                raise ValueError(f"Truncated JSON array after {count} candidates")
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as e:
+                if _value_end(buffer, pos) is not None or len(buffer) - pos > MAX_CANDIDATE_CHARS:
+                    raise ValueError(f"Invalid JSON in candidate #{count} at character {offset + e.pos}: "
+                                     f"{e.msg}") from None
+            # The element continues past the buffer: drop what is consumed and read on
+            chunk = reader.read()
+            if not chunk:
+                raise ValueError(f"Truncated JSON array in candidate #{count} at character {offset + pos}")
+            offset += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        yield _record(value, f"#{count}")
+        count += 1
+
+
+def _iter_json_lines(reader: _ChunkReader, buffer: str) -> Iterator[Dict]:
+    """One JSON object per non-blank line"""
+    line_number = 0
+    while True:
+        lines = buffer.split('\n')
+        buffer = lines.pop()  # possibly incomplete last line
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _record(json.loads(line), f"on line {line_number}")
+        chunk = reader.read()
+        if not chunk:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield _record(json.loads(buffer), f"on line {line_number + 1}")
+
+
+def iter_candidates(path: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict]:
+    """Stream candidate dicts from a JSON array or JSON Lines file without loading it whole.
+
+    The format is sniffed from the first non-blank character ('[' for an array).
+    progress, if given, is called with (bytes read, file size) after each chunk.
+    """
+    with open(path, 'rb') as f:
+        reader = _ChunkReader(f, os.fstat(f.fileno()).st_size, progress)
+        buffer = reader.read()
+        while buffer and not buffer.strip():
+            buffer = reader.read()
+        if buffer.lstrip().startswith('['):
+            yield from _iter_json_array(reader, buffer)
+        else:
+            yield from _iter_json_lines(reader, buffer)
+
+
+def iter_batches(records: Iterable, batch_size: int) -> Iterator[List]:
+    """Consecutive lists of up to batch_size records"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,162 @@
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from feature_store import GrowableColumn
+
+# Strings up to this length (names, titles, skills, locations...) are interned so
+# repeated values share one object; longer free text is stored as-is
+INTERN_MAX_LENGTH = 128
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Schema slot marking a field held in an int64 column rather than the row tuple
+NUMERIC = -1
+
+
+def _pack(value):
+    """Compact, immutable form of a JSON value: interned strings, tuples for lists"""
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, list):
+        return tuple(_pack(item) for item in value)
+    if isinstance(value, dict):
+        return {_pack(key): _pack(item) for key, item in value.items()}
+    return value
+
+
+def _unpack(value):
+    """Fresh mutable JSON value from its packed form"""
+    if isinstance(value, tuple):
+        return [_unpack(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _unpack(item) for key, item in value.items()}
+    return value
+
+
+def _is_numeric(value) -> bool:
+    return type(value) is int and INT64_MIN <= value <= INT64_MAX
+
+
+class CandidateRecord(Mapping):
+    """Read-only dict-like view of one stored candidate.
+
+    A view addresses a row, so it is only valid until the store is next mutated;
+    use to_dict() (or copy()) for a candidate that outlives the lock it was read under.
+    """
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'CandidateStore', row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str):
+        return self._store.get_field(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.schema(self._row))
+
+    def __len__(self) -> int:
+        return len(self._store.schema(self._row))
+
+    def to_dict(self) -> Dict:
+        return self._store.to_dict(self._row)
+
+    copy = to_dict
+
+    def __repr__(self) -> str:
+        return f"CandidateRecord({self.to_dict()!r})"
+
+
+class CandidateStore:
+    """Compact columnar replacement for a list of candidate dicts.
+
+    Each row keeps only a schema id and a tuple of packed field values; the key
+    order of every distinct schema is stored once, integer fields live in int64
+    columns and short strings are interned. Rows are addressed by position like
+    the list they replace (len, indexing, iteration, append, move/pop for
+    swap-with-last removal) and are materialised as dicts only on demand.
+    """
+
+    def __init__(self, candidates: Optional[Iterable[Dict]] = None):
+        self._schemas: List[Tuple[str, ...]] = []
+        self._schema_slots: List[Dict[str, int]] = []
+        self._schema_ids: Dict[Tuple, int] = {}
+        self._row_schema = GrowableColumn('int32')
+        self._rows: List[tuple] = []
+        self._numeric: Dict[str, GrowableColumn] = {}
+        for candidate in candidates or []:
+            self.append(candidate)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, row: int) -> CandidateRecord:
+        if not -len(self._rows) <= row < len(self._rows):
+            raise IndexError('candidate row out of range')
+        return CandidateRecord(self, row % len(self._rows))
+
+    def __iter__(self) -> Iterator[CandidateRecord]:
+        return (CandidateRecord(self, row) for row in range(len(self._rows)))
+
+    def schema(self, row: int) -> Tuple[str, ...]:
+        return self._schemas[self._row_schema.values[row]]
+
+    def get_field(self, row: int, key: str):
+        slot = self._schema_slots[self._row_schema.values[row]][key]
+        if slot == NUMERIC:
+            return int(self._numeric[key].values[row])
+        return _unpack(self._rows[row][slot])
+
+    def to_dict(self, row: int) -> Dict:
+        """Materialise one row as a new candidate dict"""
+        schema_id = self._row_schema.values[row]
+        values = self._rows[row]
+        slots = self._schema_slots[schema_id]
+        return {key: int(self._numeric[key].values[row]) if slots[key] == NUMERIC else _unpack(values[slots[key]])
+                for key in self._schemas[schema_id]}
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        return (self.to_dict(row) for row in range(len(self._rows)))
+
+    def _schema_id(self, candidate: Dict) -> int:
+        signature = tuple((key, _is_numeric(value)) for key, value in candidate.items())
+        schema_id = self._schema_ids.get(signature)
+        if schema_id is None:
+            schema_id = self._schema_ids[signature] = len(self._schemas)
+            slots = {}
+            position = 0
+            for key, numeric in signature:
+                if not numeric:
+                    slots[key] = position
+                    position += 1
+                    continue
+                slots[key] = NUMERIC
+                if key not in self._numeric:
+                    # Rows stored before the column existed never have this field numerically
+                    column = self._numeric[key] = GrowableColumn('int64')
+                    for _ in range(len(self._rows)):
+                        column.append(0)
+            self._schemas.append(tuple(sys.intern(key) for key, _ in signature))
+            self._schema_slots.append(slots)
+        return schema_id
+
+    def append(self, candidate: Dict):
+        schema_id = self._schema_id(candidate)
+        slots = self._schema_slots[schema_id]
+        self._rows.append(tuple(_pack(value) for key, value in candidate.items() if slots[key] != NUMERIC))
+        self._row_schema.append(schema_id)
+        for key, column in self._numeric.items():
+            column.append(candidate[key] if slots.get(key) == NUMERIC else 0)
+
+    def move(self, source: int, target: int):
+        """Overwrite row target with row source (used for swap-with-last removal)"""
+        self._rows[target] = self._rows[source]
+        self._row_schema.move(source, target)
+        for column in self._numeric.values():
+            column.move(source, target)
+
+    def pop(self):
+        self._rows.pop()
+        self._row_schema.pop()
+        for column in self._numeric.values():
+            column.pop()
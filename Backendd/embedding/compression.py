@@ -0,0 +1,172 @@
+"""Compact storage of the candidate embedding matrix.
+
+A VectorCodec maps model embeddings to the codes CandidateEmbeddings keeps as its
+one canonical copy of the pool: optionally projected onto the top principal axes
+(pca_dim) and then stored as float32, float16 or per-dimension scaled int8.
+MatrixIndex is the flat index of every unsharded pool, float32 included: rather
+than holding a second copy in a faiss IndexFlatIP it scans the matrix block by
+block. HNSW and IVF indexes are still built in faiss and hold their own copy of
+every vector (scalar-quantized like the codes with float16/int8 storage, plus
+graph links or list ids), so with those the pool takes the code matrix plus
+that index; benchmarks/compression_benchmark.py reports both.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ann_index import STORAGE_TYPES, exact_search
+
+logger = logging.getLogger(__name__)
+
+# Rows decoded to float32 at a time by MatrixIndex, bounding the scan's scratch memory
+SCAN_BLOCK_ROWS = 65536
+# Rows the codec is trained on (PCA axes, int8 ranges)
+CODEC_TRAINING_ROWS = 100000
+CODEC_FILE_VERSION = 1
+
+
+class VectorCodec:
+    """Encode float32 embeddings into compact codes and decode them back for scoring.
+
+    The PCA projection is uncentred (the top eigenvectors of X^T X) so inner
+    products, not distances to the mean, are what it preserves; queries are
+    projected with the same axes. int8 codes map each dimension's training
+    range onto [-128, 127]; values outside it are clipped.
+    """
+
+    def __init__(self, storage: str, input_dimension: int, components: Optional[np.ndarray] = None,
+                 low: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage {storage!r}, expected one of {STORAGE_TYPES}")
+        self.storage = storage
+        self.input_dimension = input_dimension
+        self.components = components  # (pca_dim, input_dimension), or None for no projection
+        self.low = low  # int8: value of code -128 per dimension
+        self.scale = scale  # int8: value of one code step per dimension
+
+    @classmethod
+    def train(cls, storage: str, sample: np.ndarray, pca_dim: Optional[int] = None) -> 'VectorCodec':
+        """Fit the projection and quantizer ranges on a sample of (normalised) embeddings"""
+        sample = np.asarray(sample, dtype='float32')
+        if len(sample) > CODEC_TRAINING_ROWS:
+            rows = np.random.default_rng(0).choice(len(sample), CODEC_TRAINING_ROWS, replace=False)
+            sample = sample[np.sort(rows)]
+        input_dimension = sample.shape[1]
+        components = None
+        if pca_dim is not None:
+            if not 0 < pca_dim <= input_dimension:
+                raise ValueError(f"pca_dim must be between 1 and {input_dimension}, got {pca_dim}")
+            eigenvalues, eigenvectors = np.linalg.eigh(sample.T.astype('float64') @ sample)
+            order = np.argsort(eigenvalues)[::-1][:pca_dim]
+            components = np.ascontiguousarray(eigenvectors[:, order].T, dtype='float32')
+            kept = eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12)
+            logger.info(f"PCA to {pca_dim} of {input_dimension} dims keeps {kept:.1%} of the energy")
+        codec = cls(storage, input_dimension, components)
+        if storage == 'int8':
+            projected = codec.project(sample)
+            low = projected.min(axis=0) if len(projected) else np.zeros(codec.dimension, dtype='float32')
+            high = projected.max(axis=0) if len(projected) else np.ones(codec.dimension, dtype='float32')
+            codec.low = low.astype('float32')
+            codec.scale = np.maximum(high - low, 1e-6).astype('float32') / 255
+        return codec
+
+    @property
+    def dimension(self) -> int:
+        """Width of the codes (and of the vectors the ANN index sees)"""
+        return self.input_dimension if self.components is None else len(self.components)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.storage)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Vectors in code space as float32 (queries, and vectors added to an ANN index)"""
+        vectors = np.asarray(vectors, dtype='float32')
+        if self.components is None:
+            return vectors
+        return np.ascontiguousarray(vectors @ self.components.T)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        projected = self.project(vectors)
+        if self.storage == 'int8':
+            codes = np.rint((projected - self.low) / self.scale) - 128
+            return np.clip(codes, -128, 127).astype('int8')
+        return projected.astype(self.dtype)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """float32 code-space vectors; scores against projected queries approximate the originals"""
+        if self.storage == 'int8':
+            return (np.asarray(codes, dtype='float32') + 128) * self.scale + self.low
+        return np.asarray(codes, dtype='float32')
+
+    def empty(self, rows: int) -> np.ndarray:
+        return np.empty((rows, self.dimension), dtype=self.dtype)
+
+    def save(self, path: str):
+        arrays = {'version': np.array(CODEC_FILE_VERSION), 'storage': np.array(self.storage),
+                  'input_dimension': np.array(self.input_dimension)}
+        for name in ('components', 'low', 'scale'):
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'VectorCodec':
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != CODEC_FILE_VERSION:
+                raise ValueError(f"Unsupported codec file version {int(data['version'])} at {path}")
+            return cls(str(data['storage']), int(data['input_dimension']),
+                       *(data[name] if name in data else None for name in ('components', 'low', 'scale')))
+
+
+def _merge_top_k(scores: np.ndarray, labels: np.ndarray, more_scores: np.ndarray, more_labels: np.ndarray,
+                 k: int):
+    """Best k of two (scores, labels) result sets per query, best first"""
+    scores = np.concatenate([scores, more_scores], axis=1)
+    labels = np.concatenate([labels, more_labels], axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(labels, order, axis=1)
+
+
+class MatrixIndex:
+    """Exact inner-product index over a code (or float32) matrix owned by its caller.
+
+    CandidateEmbeddings already adds, moves and removes rows of its code matrix,
+    so add_with_ids and remove_ids only keep ntotal; search() is handed the
+    current matrix and the label of each of its rows.
+    """
+
+    def __init__(self, codec: VectorCodec, ntotal: int = 0):
+        self.codec = codec
+        self.ntotal = ntotal
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray):
+        self.ntotal += len(ids)
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        self.ntotal -= len(ids)
+        return len(ids)
+
+    def search(self, queries: np.ndarray, k: int, codes: np.ndarray, labels: Sequence[int],
+               mask: Optional[np.ndarray] = None):
+        """Top k rows for projected queries, restricted to the labels set in mask if given"""
+        labels = np.asarray(labels, dtype='int64')
+        scores = np.full((len(queries), k), -np.inf, dtype='float32')
+        found = np.full((len(queries), k), -1, dtype='int64')
+        for start in range(0, len(codes), SCAN_BLOCK_ROWS):
+            block_labels = labels[start:start + SCAN_BLOCK_ROWS]
+            block = codes[start:start + SCAN_BLOCK_ROWS]
+            if mask is not None:
+                keep = mask[block_labels]
+                block, block_labels = block[keep], block_labels[keep]
+            block_scores, block_found = exact_search(queries, self.codec.decode(block), block_labels, k)
+            scores, found = _merge_top_k(scores, found, block_scores, block_found, k)
+        return scores, found
@@ -0,0 +1,157 @@
+import hashlib
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+KEY_BYTES = 16
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store persisted as a single binary .npz file.
+
+    Entries are keyed by a digest of the model name and the exact text that was
+    encoded, so a candidate is only re-encoded when its text (or the model) changes.
+    """
+
+    def __init__(self, path: str, model_name: str, dimension: int):
+        self.path = path
+        self.model_name = model_name
+        self.dimension = dimension
+        self._rows: Dict[bytes, int] = {}
+        self._matrix = np.zeros((0, dimension), dtype='float32')
+        self._pending: Dict[bytes, np.ndarray] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending)
+
+    def key(self, text: str) -> bytes:
+        """Digest identifying one (model, text) pair"""
+        digest = hashlib.blake2b(digest_size=KEY_BYTES)
+        digest.update(self.model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.digest()
+
+    def load(self):
+        """Load cached vectors from disk, ignoring files written for another model"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                version = int(data['version'])
+                model_name = str(data['model_name'])
+                keys = data['keys']
+                vectors = data['vectors']
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding cache {self.path}: {e}")
+            return
+
+        if version != CACHE_FORMAT_VERSION or model_name != self.model_name:
+            logger.info(f"Embedding cache {self.path} was built for another model/format, ignoring it")
+            return
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            logger.info(f"Embedding cache {self.path} has dimension {vectors.shape[-1]}, expected {self.dimension}")
+            return
+
+        self._matrix = np.ascontiguousarray(vectors, dtype='float32')
+        self._rows = {k.tobytes(): i for i, k in enumerate(keys)}
+        logger.info(f"Loaded {len(self._rows)} cached embeddings from {self.path}")
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is not None:
+            return self._matrix[row]
+        return self._pending.get(key)
+
+    def put(self, key: bytes, vector: np.ndarray):
+        if key in self._rows or key in self._pending:
+            return
+        self._pending[key] = np.asarray(vector, dtype='float32')
+        self._dirty = True
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for texts, calling encoder only for texts not cached yet"""
+        keys = [self.key(text) for text in texts]
+        result = np.empty((len(texts), self.dimension), dtype='float32')
+
+        missing: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(keys):
+            vector = self.get(key)
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                result[i] = vector
+        self.hits += len(texts) - sum(len(positions) for positions in missing.values())
+        self.misses += len(missing)
+
+        if missing:
+            logger.info(f"Embedding cache: {len(texts) - len(missing)} hits, encoding {len(missing)} new texts")
+            miss_keys = list(missing)
+            vectors = encoder([texts[missing[key][0]] for key in miss_keys])
+            for key, vector in zip(miss_keys, vectors):
+                self.put(key, vector)
+                result[missing[key]] = vector
+
+        return result
+
+    def retain(self, keys: Iterable[bytes]):
+        """Drop every entry whose key is not in keys"""
+        keep = set(keys)
+        stale = [key for key in self._rows if key not in keep]
+        stale_pending = [key for key in self._pending if key not in keep]
+        if not stale and not stale_pending:
+            return
+        for key in stale_pending:
+            del self._pending[key]
+        if stale:
+            self._compact(keep)
+        self._dirty = True
+
+    def _compact(self, keep: set):
+        """Rebuild the base matrix with only the rows whose key is in keep"""
+        kept = [(key, row) for key, row in self._rows.items() if key in keep]
+        rows = np.array([row for _, row in kept], dtype='int64')
+        matrix = self._matrix[rows] if len(rows) else np.zeros((0, self.dimension), dtype='float32')
+        self._rows = {key: i for i, (key, _) in enumerate(kept)}
+        self._matrix = matrix
+
+    def save(self):
+        """Write the cache atomically (temp file + rename) if anything changed"""
+        if not self.path or not self._dirty:
+            return
+        if self._pending:
+            pending_keys = list(self._pending)
+            start = len(self._rows)
+            self._matrix = np.vstack([self._matrix] + [self._pending[k][None, :] for k in pending_keys])
+            for offset, key in enumerate(pending_keys):
+                self._rows[key] = start + offset
+            self._pending = {}
+
+        # Raw uint8 rows rather than an 'S' array, which would strip trailing NUL bytes
+        keys = np.empty((len(self._rows), KEY_BYTES), dtype='uint8')
+        for key, row in self._rows.items():
+            keys[row] = np.frombuffer(key, dtype='uint8')
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     version=np.int32(CACHE_FORMAT_VERSION),
+                     model_name=np.str_(self.model_name),
+                     keys=keys,
+                     vectors=self._matrix)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        logger.info(f"Saved {len(self._rows)} embeddings to cache {self.path}")
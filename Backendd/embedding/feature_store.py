@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterator, List, Optional
+
+import numpy as np
+
+
+class CandidateFeatures:
+    """Search-time features of one candidate, derived once when it is indexed"""
+    __slots__ = ('text', 'skills', 'title', 'sector', 'work_preference', 'years_of_experience',
+                 'available_from')
+
+    def __init__(self, text: str, skills: FrozenSet[str], title: str, sector: str,
+                 work_preference: str, years_of_experience: int, available_from: Optional[int] = None):
+        self.text = text  # text that was embedded and is sent to the reranker
+        self.skills = skills  # canonical (lowercased, stripped) skill set
+        self.title = title  # lowercased title
+        self.sector = sector  # lowercased sector
+        self.work_preference = work_preference  # lowercased work preference
+        self.years_of_experience = years_of_experience
+        self.available_from = available_from  # date ordinal of availableFrom, None if unknown
+
+
+class Vocabulary:
+    """Interns strings as dense integer codes"""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def add(self, term: str) -> int:
+        code = self._codes.get(term)
+        if code is None:
+            code = self._codes[term] = len(self.terms)
+            self.terms.append(term)
+        return code
+
+    def get(self, term: str) -> int:
+        """Code of term, or -1 if no indexed candidate has it"""
+        return self._codes.get(term, -1)
+
+
+class GrowableColumn:
+    """Growable 1-d numpy column with amortised O(1) append"""
+
+    def __init__(self, dtype: str):
+        self._data = np.zeros(64, dtype=dtype)
+        self._size = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    def append(self, value):
+        if self._size == len(self._data):
+            grown = np.zeros(2 * len(self._data), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def move(self, source: int, target: int):
+        self._data[target] = self._data[source]
+
+    def pop(self):
+        self._size -= 1
+
+
+@dataclass
+class ScoringColumns:
+    """Scoring attributes of a pool of candidates, one array entry per candidate"""
+    years: np.ndarray  # int64 years of experience
+    skill_codes: np.ndarray  # int32 skill codes of every candidate, concatenated
+    skill_owner: np.ndarray  # int32 pool position owning each entry of skill_codes
+    work_preference: np.ndarray  # int32 work preference code
+    sector: np.ndarray  # int32 sector code
+    seniority_mask: np.ndarray  # int64, bit i set when seniority term i occurs in the title
+    titles: List[str]  # lowercased titles, for seniority terms outside the precomputed set
+
+    def take(self, positions: np.ndarray) -> 'ScoringColumns':
+        """Columns of the pool candidates at positions, in that order"""
+        positions = np.asarray(positions, dtype='int64')
+        new_position = np.full(len(self.years), -1, dtype='int64')
+        new_position[positions] = np.arange(len(positions))
+        owners = new_position[self.skill_owner]
+        kept = owners >= 0
+        return ScoringColumns(
+            years=self.years[positions],
+            skill_codes=self.skill_codes[kept],
+            skill_owner=owners[kept].astype('int32'),
+            work_preference=self.work_preference[positions],
+            sector=self.sector[positions],
+            seniority_mask=self.seniority_mask[positions],
+            titles=[self.titles[i] for i in positions],
+        )
+
+
+class FeatureStore:
+    """Columnar search-time features kept row-aligned with CandidateEmbeddings.candidates.
+
+    Numeric and categorical attributes live in numpy columns (categoricals as
+    Vocabulary codes, skills as per-row code arrays, seniority as a title bitmask)
+    so a whole rerank pool can be scored in one vectorised pass.
+    """
+
+    def __init__(self, seniority_terms: List[str], features: Optional[List[CandidateFeatures]] = None):
+        self.seniority_terms = list(seniority_terms)
+        self.skill_vocab = Vocabulary()
+        self.work_preference_vocab = Vocabulary()
+        self.sector_vocab = Vocabulary()
+        self._texts: List[str] = []
+        self._titles: List[str] = []
+        self._skills: List[np.ndarray] = []
+        self._years = GrowableColumn('int64')
+        self._work_preference = GrowableColumn('int32')
+        self._sector = GrowableColumn('int32')
+        self._seniority_mask = GrowableColumn('int64')
+        self._available_from = GrowableColumn('int64')  # -1 when unknown
+        for candidate_features in features or []:
+            self.append(candidate_features)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __getitem__(self, row: int) -> CandidateFeatures:
+        return CandidateFeatures(
+            text=self._texts[row],
+            skills=frozenset(self.skill_vocab.terms[code] for code in self._skills[row]),
+            title=self._titles[row],
+            sector=self.sector_vocab.terms[self._sector.values[row]],
+            work_preference=self.work_preference_vocab.terms[self._work_preference.values[row]],
+            years_of_experience=int(self._years.values[row]),
+            available_from=int(self._available_from.values[row]) if self._available_from.values[row] >= 0 else None,
+        )
+
+    def __iter__(self) -> Iterator[CandidateFeatures]:
+        return (self[row] for row in range(len(self)))
+
+    def text(self, row: int) -> str:
+        return self._texts[row]
+
+    def _seniority_bits(self, title: str) -> int:
+        return sum(1 << i for i, term in enumerate(self.seniority_terms) if term in title)
+
+    def append(self, features: CandidateFeatures):
+        self._texts.append(features.text)
+        self._titles.append(features.title)
+        self._skills.append(np.array(sorted(self.skill_vocab.add(s) for s in features.skills), dtype='int32'))
+        self._years.append(features.years_of_experience)
+        self._work_preference.append(self.work_preference_vocab.add(features.work_preference))
+        self._sector.append(self.sector_vocab.add(features.sector))
+        self._seniority_mask.append(self._seniority_bits(features.title))
+        self._available_from.append(-1 if features.available_from is None else features.available_from)
+
+    def _columns(self) -> List[GrowableColumn]:
+        return [self._years, self._work_preference, self._sector, self._seniority_mask, self._available_from]
+
+    def move(self, source: int, target: int):
+        """Overwrite row target with row source (used for swap-with-last removal)"""
+        self._texts[target] = self._texts[source]
+        self._titles[target] = self._titles[source]
+        self._skills[target] = self._skills[source]
+        for column in self._columns():
+            column.move(source, target)
+
+    def pop(self):
+        self._texts.pop()
+        self._titles.pop()
+        self._skills.pop()
+        for column in self._columns():
+            column.pop()
+
+    def columns(self, rows: np.ndarray) -> ScoringColumns:
+        """Gather (copy) the scoring columns of the given rows"""
+        rows = np.asarray(rows, dtype='int64')
+        skills = [self._skills[row] for row in rows]
+        lengths = np.fromiter((len(codes) for codes in skills), dtype='int64', count=len(skills))
+        return ScoringColumns(
+            years=self._years.values[rows],
+            skill_codes=np.concatenate(skills) if skills else np.zeros(0, dtype='int32'),
+            skill_owner=np.repeat(np.arange(len(rows), dtype='int32'), lengths),
+            work_preference=self._work_preference.values[rows],
+            sector=self._sector.values[rows],
+            seniority_mask=self._seniority_mask.values[rows],
+            titles=[self._titles[row] for row in rows],
+        )
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, FrozenSet, List, Optional, Set
+
+import numpy as np
+
+from feature_store import CandidateFeatures, Vocabulary
+from startup import lazy_import
+
+faiss = lazy_import('faiss')
+
+# Filters matching at most this many candidates are answered by an exact scan of
+# just those vectors; an ANN search restricted to a tiny subset (HNSW especially)
+# can miss matches that are there
+EXACT_SEARCH_MAX_MATCHES = 4096
+
+# Availability of candidates without a parseable availableFrom date: never matches
+UNKNOWN_DATE = np.iinfo('int64').max
+
+
+def date_ordinal(value) -> Optional[int]:
+    """Proleptic ordinal of an ISO date (or date-time) string, or None if it cannot be parsed"""
+    if isinstance(value, date):
+        return value.toordinal()
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _terms(name: str, value) -> List[str]:
+    """A filter value given as one string or a list of strings, normalised like candidate fields"""
+    values = [value] if isinstance(value, str) else value
+    if not isinstance(values, list) or not all(isinstance(v, str) and v.strip() for v in values):
+        raise ValueError(f"Filter {name} must be a string or a list of non-empty strings")
+    return [v.lower().strip() for v in values]
+
+
+def _years(name: str, value) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"Filter {name} must be a non-negative integer")
+    return value
+
+
+@dataclass
+class SearchFilters:
+    """Hard constraints a candidate must meet to be returned at all"""
+    min_experience: Optional[int] = None
+    max_experience: Optional[int] = None
+    work_preference: List[str] = field(default_factory=list)  # any of
+    sector: List[str] = field(default_factory=list)  # any of
+    skills_any: List[str] = field(default_factory=list)
+    skills_all: List[str] = field(default_factory=list)
+    available_by: Optional[date] = None  # availableFrom on or before this date
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional['SearchFilters']:
+        """Parse the 'filters' object of a search request; None when no filter is set"""
+        if not data:
+            return None
+        if not isinstance(data, dict):
+            raise ValueError("filters must be an object")
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+
+        filters = cls()
+        if data.get('min_experience') is not None:
+            filters.min_experience = _years('min_experience', data['min_experience'])
+        if data.get('max_experience') is not None:
+            filters.max_experience = _years('max_experience', data['max_experience'])
+        for name in ('work_preference', 'sector', 'skills_any', 'skills_all'):
+            if data.get(name):
+                setattr(filters, name, _terms(name, data[name]))
+        if data.get('available_by') is not None:
+            ordinal = date_ordinal(data['available_by'])
+            if ordinal is None:
+                raise ValueError("Filter available_by must be an ISO date (YYYY-MM-DD)")
+            filters.available_by = date.fromordinal(ordinal)
+        return filters
+
+    def to_dict(self) -> Dict:
+        """The 'filters' object from_dict parses back into these filters, unset ones left out"""
+        data = {}
+        for name in self.__dataclass_fields__:
+            value = getattr(self, name)
+            if value is not None and value != []:
+                data[name] = value.isoformat() if isinstance(value, date) else value
+        return data
+
+
+class FilterIndex:
+    """Per-attribute indexes over index labels for structured pre-filtering.
+
+    Numeric and categorical attributes are label-indexed arrays, skills are
+    inverted (skill -> labels) postings. Evaluating filters yields a boolean
+    mask over labels that becomes a FAISS IDSelectorBitmap, so filtering happens
+    inside the ANN search. Removed labels are cleared from the live mask, so the
+    selector also hides tombstoned vectors.
+    """
+
+    def __init__(self):
+        self._capacity = 0
+        self._size = 0  # highest label + 1
+        self._live = np.zeros(0, dtype=bool)
+        self._years = np.zeros(0, dtype='int64')
+        self._available = np.zeros(0, dtype='int64')
+        self._work_preference = np.zeros(0, dtype='int32')
+        self._sector = np.zeros(0, dtype='int32')
+        self.work_preference_vocab = Vocabulary()
+        self.sector_vocab = Vocabulary()
+        self._skill_postings: Dict[str, Set[int]] = {}
+        self._label_skills: Dict[int, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._label_skills)
+
+    def _reserve(self, label: int):
+        if label >= self._capacity:
+            capacity = max(64, 2 * self._capacity, label + 1)
+            for name, fill in (('_live', False), ('_years', 0), ('_available', UNKNOWN_DATE),
+                               ('_work_preference', -1), ('_sector', -1)):
+                old = getattr(self, name)
+                grown = np.full(capacity, fill, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+            self._capacity = capacity
+        self._size = max(self._size, label + 1)
+
+    def add(self, label: int, features: CandidateFeatures):
+        self._reserve(label)
+        self._live[label] = True
+        self._years[label] = features.years_of_experience
+        self._available[label] = UNKNOWN_DATE if features.available_from is None else features.available_from
+        self._work_preference[label] = self.work_preference_vocab.add(features.work_preference)
+        self._sector[label] = self.sector_vocab.add(features.sector)
+        self._label_skills[label] = features.skills
+        for skill in features.skills:
+            self._skill_postings.setdefault(skill, set()).add(label)
+
+    def remove(self, label: int):
+        self._live[label] = False
+        for skill in self._label_skills.pop(label, ()):
+            postings = self._skill_postings[skill]
+            postings.discard(label)
+            if not postings:
+                del self._skill_postings[skill]
+
+    def _skill_mask(self, skill: str) -> np.ndarray:
+        mask = np.zeros(self._size, dtype=bool)
+        postings = self._skill_postings.get(skill)
+        if postings:
+            mask[np.fromiter(postings, dtype='int64', count=len(postings))] = True
+        return mask
+
+    def _codes_mask(self, codes: np.ndarray, vocab: Vocabulary, values: List[str]) -> np.ndarray:
+        wanted = [code for code in (vocab.get(value) for value in values) if code >= 0]
+        return np.isin(codes, wanted) if wanted else np.zeros(self._size, dtype=bool)
+
+    def mask(self, filters: SearchFilters) -> np.ndarray:
+        """Boolean mask over labels 0..max label of live candidates passing every filter"""
+        n = self._size
+        mask = self._live[:n].copy()
+        if filters.min_experience is not None:
+            mask &= self._years[:n] >= filters.min_experience
+        if filters.max_experience is not None:
+            mask &= self._years[:n] <= filters.max_experience
+        if filters.work_preference:
+            mask &= self._codes_mask(self._work_preference[:n], self.work_preference_vocab, filters.work_preference)
+        if filters.sector:
+            mask &= self._codes_mask(self._sector[:n], self.sector_vocab, filters.sector)
+        if filters.available_by is not None:
+            mask &= self._available[:n] <= filters.available_by.toordinal()
+        for skill in filters.skills_all:
+            mask &= self._skill_mask(skill)
+        if filters.skills_any:
+            any_skill = np.zeros(n, dtype=bool)
+            for skill in filters.skills_any:
+                any_skill |= self._skill_mask(skill)
+            mask &= any_skill
+        return mask
+
+    @staticmethod
+    def selector(mask: np.ndarray) -> faiss.IDSelector:
+        """FAISS selector accepting exactly the labels set in mask"""
+        bitmap = np.packbits(mask, bitorder='little')
+        selector = faiss.IDSelectorBitmap(bitmap)
+        selector.bitmap_array = bitmap  # the selector only points into this buffer
+        return selector
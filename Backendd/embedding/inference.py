@@ -0,0 +1,164 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets (items per forward pass)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# Live batchers, whose worker threads do not survive fork() and are restarted in the child
+_batchers: 'weakref.WeakSet[MicroBatcher]' = weakref.WeakSet()
+
+
+class _Request:
+    __slots__ = ('items', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, items: List):
+        self.items = items
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Dynamic micro-batching in front of a batch inference function.
+
+    Concurrent callers submit lists of inputs; a worker thread merges whatever
+    is queued (up to max_batch_size inputs, waiting at most max_wait_ms for
+    more to arrive) into one call of fn and scatters the outputs back. While a
+    forward pass runs, new requests queue up and form the next batch, so under
+    load batches grow on their own and an idle server adds at most max_wait_ms.
+    """
+
+    def __init__(self, fn: Callable[[List], Sequence], max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0, name: str = 'inference'):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._closed = False
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.queue_wait_seconds = 0.0
+
+        self._start()
+        _batchers.add(self)
+
+    def _start(self):
+        self._queue: deque = deque()
+        self._queued_items = 0
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, items: List):
+        """Outputs of fn for items, computed as part of a shared batch"""
+        if not items:
+            return []
+        request = _Request(list(items))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} batcher is closed")
+            self._queue.append(request)
+            self._queued_items += len(request.items)
+            self.max_queue_depth = max(self.max_queue_depth, self._queued_items)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_batch(self) -> Optional[List[_Request]]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            batch = [self._queue.popleft()]
+            size = len(batch[0].items)
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                if self._queue:
+                    if size + len(self._queue[0].items) > self.max_batch_size:
+                        break
+                    request = self._queue.popleft()
+                    batch.append(request)
+                    size += len(request.items)
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+            self._queued_items -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            items = [item for request in batch for item in request.items]
+            started = time.perf_counter()
+            try:
+                outputs = self.fn(items)
+                offset = 0
+                for request in batch:
+                    request.result = outputs[offset:offset + len(request.items)]
+                    offset += len(request.items)
+            except Exception as e:
+                logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+                for request in batch:
+                    request.error = e
+            self._record(batch, len(items), started)
+            for request in batch:
+                request.done.set()
+
+    def _record(self, batch: List[_Request], size: int, started: float):
+        self.batches += 1
+        self.items += size
+        self.queue_wait_seconds += sum(started - request.enqueued_at for request in batch)
+        self.batch_size_counts[int(np.searchsorted(BATCH_SIZE_BUCKETS, size))] += 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+
+    def stats(self) -> Dict:
+        return {
+            'queue_depth': self._queued_items,
+            'max_queue_depth': self.max_queue_depth,
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'queue_wait_seconds_total': round(self.queue_wait_seconds, 6),
+            # Batches per size bucket, keyed by the bucket's upper bound
+            'batch_size_histogram': {
+                **{str(bound): count for bound, count in zip(BATCH_SIZE_BUCKETS, self.batch_size_counts)},
+                '+Inf': self.batch_size_counts[-1],
+            },
+        }
+
+
+def _restart_after_fork():
+    """Give every open batcher a fresh queue, lock and worker thread in a forked child"""
+    for batcher in list(_batchers):
+        if not batcher._closed:
+            batcher._start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
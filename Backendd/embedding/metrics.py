@@ -0,0 +1,258 @@
+"""In-process latency histograms and counters, exposed in the Prometheus text format.
+
+Observing is a perf_counter() read, a bisect and a short locked update, so the
+timers can stay on every request. Metrics are recorded per process. The
+serve.py workers sit behind one socket, so a scrape reaches an arbitrary one:
+each worker shares its registry through a directory (Registry.share), writing
+its state there every SHARE_INTERVAL seconds, and /metrics renders the sum over
+all files, so any worker answers for the whole server. Files of workers that
+exited are kept, so counters stay monotonic across restarts.
+
+This is the one metrics module of both search services: the pgvector service
+(Backend/Flask) imports it from here, so both expose the same series.
+"""
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from sub-millisecond cache hits to a slow cross-encoder batch
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds between writes of a process's state to the shared directory, the staleness of other workers' series
+SHARE_INTERVAL = 1.0
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def state(self) -> List:
+        """The values as JSON-serialisable [labels, value] pairs"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(total: Dict[Tuple[str, ...], float], state: List):
+        """Add another process's state() into total"""
+        for key, value in state:
+            key = tuple(key)
+            total[key] = total.get(key, 0) + value
+
+    def render(self, values: Optional[Dict[Tuple[str, ...], float]] = None) -> List[str]:
+        """Text lines for this process's values, or for values merged from several processes"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observations per label combination"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Per label combination: [count per bucket (last is +Inf)..., sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[bucket] += 1
+            series[-1] += value
+
+    def state(self) -> List:
+        """The series as JSON-serialisable [labels, [bucket counts..., sum]] pairs"""
+        with self._lock:
+            return [[list(key), list(values)] for key, values in self._series.items()]
+
+    @staticmethod
+    def merge(total: Dict[Tuple[str, ...], List[float]], state: List):
+        """Add another process's state() into total, bucket by bucket"""
+        for key, values in state:
+            key = tuple(key)
+            current = total.get(key)
+            total[key] = list(values) if current is None else [a + b for a, b in zip(current, values)]
+
+    def render(self, series: Optional[Dict[Tuple[str, ...], List[float]]] = None) -> List[str]:
+        """Text lines for this process's series, or for series merged from several processes"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        if series is None:
+            with self._lock:
+                series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {values[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics one /metrics endpoint renders"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._share_dir: Optional[str] = None
+        self._share_path: Optional[str] = None
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def share(self, directory: str, interval: float = SHARE_INTERVAL):
+        """Publish this process's state to directory and render the sum over every process publishing there"""
+        self._share_dir = directory
+        self._share_path = os.path.join(directory, f"{os.getpid()}.json")
+        self._write_state()
+        threading.Thread(target=self._publish, args=(interval,), name='metrics-share', daemon=True).start()
+
+    def _publish(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self._write_state()
+            except OSError as e:
+                logger.warning(f"Could not write metrics to {self._share_path}: {e}")
+
+    def _write_state(self):
+        """Replace this process's file atomically, so readers never see a partial one"""
+        state = {metric.name: metric.state() for metric in self._metrics}
+        temporary = f"{self._share_path}.{threading.get_ident()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, self._share_path)
+
+    def _merged(self) -> Dict[str, Dict]:
+        """Every metric's values summed over the state files in the shared directory"""
+        self._write_state()
+        totals: Dict[str, Dict] = {metric.name: {} for metric in self._metrics}
+        for path in glob.glob(os.path.join(self._share_dir, '*.json')):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric in self._metrics:
+                metric.merge(totals[metric.name], state.get(metric.name, []))
+        return totals
+
+    def render(self) -> str:
+        totals = self._merged() if self._share_dir else {}
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(totals.get(metric.name)))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.histogram('search_request_seconds', 'Wall time of search requests',
+                                     ('endpoint',))
+STAGE_SECONDS = REGISTRY.histogram('search_stage_seconds', 'Time spent in each stage of a search request',
+                                   ('endpoint', 'stage'))
+REQUESTS = REGISTRY.counter('search_requests_total', 'Search requests by endpoint and HTTP status',
+                            ('endpoint', 'status'))
+CANDIDATES_SCANNED = REGISTRY.counter('search_candidates_scanned_total',
+                                      'Candidates retrieved by the vector search (FAISS or pgvector) and scored', ('endpoint',))
+CANDIDATES_RERANKED = REGISTRY.counter('search_candidates_reranked_total',
+                                       'Candidates scored by the cross-encoder', ('endpoint',))
+
+
+class StageTimer:
+    """Wall time per named stage of one request, reported to the metrics when the request ends.
+
+    A stage entered more than once (or from several places) accumulates.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.scanned = 0
+        self.reranked = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def timings(self) -> Dict[str, float]:
+        """Stage and total times so far, in milliseconds, for a response's timings block"""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings['total'] = round((time.perf_counter() - self.started) * 1000, 3)
+        return timings
+
+    def observe(self, endpoint: str, status: Optional[int] = None):
+        """Record this request's stages, total time and counts under endpoint"""
+        REQUEST_SECONDS.observe(time.perf_counter() - self.started, endpoint=endpoint)
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, endpoint=endpoint, stage=name)
+        if status is not None:
+            REQUESTS.inc(endpoint=endpoint, status=str(status))
+        if self.scanned:
+            CANDIDATES_SCANNED.inc(self.scanned, endpoint=endpoint)
+        if self.reranked:
+            CANDIDATES_RERANKED.inc(self.reranked, endpoint=endpoint)
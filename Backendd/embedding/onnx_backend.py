@@ -0,0 +1,248 @@
+"""Quantized ONNX Runtime CPU backend for the bi-encoder and the cross-encoder.
+
+The PyTorch models are exported to ONNX once, dynamically quantized to int8
+and cached on disk next to their tokenizer and a small JSON of the settings
+the PyTorch wrapper applied (pooling, normalisation, score activation, max
+length). OnnxSentenceEncoder and OnnxCrossEncoder then expose the
+encode()/predict() interface CandidateEmbeddings uses; once exported, starting
+them loads only the tokenizer and the ONNX Runtime session, with no PyTorch.
+Every file is written to a temporary path and renamed into place, the model
+last, so an interrupted export is redone rather than loaded. Requires the
+optional onnx and onnxruntime packages (and PyTorch for the first export).
+"""
+import abc
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+except ImportError as e:  # pragma: no cover - optional dependency
+    raise ImportError("The onnx inference backend needs onnxruntime and onnx: "
+                      "pip install onnxruntime onnx") from e
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', os.path.join('src', 'models', 'onnx'))
+ONNX_OPSET = 14
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+# numpy versions of the score activations a CrossEncoder may apply, by lower-cased torch name
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'identity': lambda logits: logits,
+    'sigmoid': lambda logits: 1 / (1 + np.exp(-logits)),
+    'tanh': np.tanh,
+    'softmax': _softmax,
+}
+
+
+def _model_path(model_name: str, quantize: bool, model_dir: str) -> str:
+    stem = re.sub(r'[^A-Za-z0-9._-]+', '_', model_name)
+    return os.path.join(model_dir, f"{stem}{'-int8' if quantize else ''}.onnx")
+
+
+def _temporary(path: str) -> str:
+    return f"{path}.tmp-{os.getpid()}"
+
+
+def _write_settings(path: str, settings: Dict):
+    temporary = _temporary(path)
+    with open(temporary, 'w') as f:
+        json.dump(settings, f)
+    os.replace(temporary, path)
+
+
+def _save_tokenizer(tokenizer, directory: str):
+    temporary = _temporary(directory)
+    shutil.rmtree(temporary, ignore_errors=True)
+    tokenizer.save_pretrained(temporary)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+
+
+def _export(torch_model, tokenizer, path: str, quantize: bool, output_axes: dict):
+    """Export a Hugging Face encoder to ONNX with dynamic batch/sequence axes, then int8-quantize it"""
+    import torch
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    sample = tokenizer(['export sample'], ['paired text'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    fp32_path = path[:-len('-int8.onnx')] + '.onnx' if quantize else path
+    torch_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            torch_model,
+            tuple(sample[name] for name in input_names),
+            _temporary(fp32_path),
+            input_names=input_names,
+            output_names=['output'],
+            dynamic_axes={**{name: {0: 'batch', 1: 'sequence'} for name in input_names},
+                          'output': output_axes},
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(_temporary(fp32_path), fp32_path)
+    if quantize:
+        quantize_dynamic(fp32_path, _temporary(path), weight_type=QuantType.QInt8)
+        os.replace(_temporary(path), path)
+    logger.info(f"Exported {'int8 ' if quantize else ''}ONNX model to {path}")
+
+
+def _session(path: str, threads: Optional[int]) -> 'ort.InferenceSession':
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+class _OnnxModel(abc.ABC):
+    """Tokenizer plus ONNX Runtime session, exporting the model on first use"""
+    output_axes = {0: 'batch'}
+
+    def __init__(self, model_name: str, quantize: bool, model_dir: str, threads: Optional[int]):
+        self.path = _model_path(model_name, quantize, model_dir)
+        stem = self.path[:-len('.onnx')]
+        settings_path = f"{stem}.json"
+        tokenizer_dir = f"{stem}-tokenizer"
+        if not all(os.path.exists(p) for p in (self.path, settings_path, tokenizer_dir)):
+            torch_model, tokenizer, settings = self._load_torch(model_name)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            _save_tokenizer(tokenizer, tokenizer_dir)
+            _write_settings(settings_path, settings)
+            _export(torch_model, tokenizer, self.path, quantize, self.output_axes)
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_dir)
+        with open(settings_path) as f:
+            self.settings = json.load(f)
+        self.max_length = self.settings['max_length']
+        self.session = _session(self.path, threads)
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    @staticmethod
+    @abc.abstractmethod
+    def _load_torch(model_name: str) -> Tuple[object, object, Dict]:
+        """The Hugging Face model to export, its tokenizer and the settings the ONNX wrapper needs"""
+
+    def _run(self, first: List[str], second: Optional[List[str]] = None) -> tuple:
+        encoded = self.tokenizer(first, second, padding=True, truncation=True,
+                                 max_length=self.max_length, return_tensors='np')
+        feeds = {name: encoded[name].astype('int64') for name in self._input_names}
+        return self.session.run(None, feeds)[0], encoded['attention_mask']
+
+
+class OnnxSentenceEncoder(_OnnxModel):
+    """Drop-in for SentenceTransformer.encode() running an int8 ONNX export of the model"""
+    output_axes = {0: 'batch', 1: 'sequence'}  # token embeddings
+
+    def __init__(self, model_name: str, quantize: bool = True, model_dir: str = ONNX_MODEL_DIR,
+                 threads: Optional[int] = None):
+        super().__init__(model_name, quantize, model_dir, threads)
+        self.pooling = self.settings['pooling']
+        self.normalize = self.settings['normalize']
+        self.dimension = self.settings['dimension']
+
+    @staticmethod
+    def _load_torch(model_name: str) -> Tuple[object, object, Dict]:
+        from sentence_transformers import SentenceTransformer
+
+        torch_model = SentenceTransformer(model_name, device='cpu')
+        modules = list(torch_model)
+        settings = {
+            'pooling': OnnxSentenceEncoder._pooling_mode(modules),
+            'normalize': any(type(module).__name__ == 'Normalize' for module in modules),
+            'dimension': torch_model.get_sentence_embedding_dimension(),
+            'max_length': torch_model.max_seq_length,
+        }
+        return modules[0].auto_model, torch_model.tokenizer, settings
+
+    @staticmethod
+    def _pooling_mode(modules) -> str:
+        for module in modules:
+            if type(module).__name__ != 'Pooling':
+                continue
+            mode = getattr(module, 'pooling_mode', None)
+            if isinstance(mode, (list, tuple)) and len(mode) == 1:
+                mode = mode[0]
+            mode = getattr(mode, 'value', mode)
+            if mode in ('mean', 'cls', 'max'):
+                return mode
+            if getattr(module, 'pooling_mode_cls_token', False):
+                return 'cls'
+            if getattr(module, 'pooling_mode_max_tokens', False):
+                return 'max'
+        return 'mean'
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        batches = []
+        for i in range(0, len(sentences), batch_size):
+            token_embeddings, mask = self._run(sentences[i:i + batch_size])
+            mask = mask[..., None].astype('float32')
+            if self.pooling == 'cls':
+                pooled = token_embeddings[:, 0]
+            elif self.pooling == 'max':
+                pooled = np.where(mask > 0, token_embeddings, -np.inf).max(axis=1)
+            else:
+                pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize or normalize_embeddings:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype('float32'))
+        embeddings = np.vstack(batches) if batches else np.zeros((0, self.dimension), dtype='float32')
+        return embeddings[0] if single else embeddings
+
+
+class OnnxCrossEncoder(_OnnxModel):
+    """Drop-in for CrossEncoder.predict() running an int8 ONNX export of the model"""
+
+    def __init__(self, model_name: str, quantize: bool = True, model_dir: str = ONNX_MODEL_DIR,
+                 threads: Optional[int] = None):
+        super().__init__(model_name, quantize, model_dir, threads)
+        self.activation = ACTIVATIONS[self.settings['activation']]
+
+    @staticmethod
+    def _load_torch(model_name: str) -> Tuple[object, object, Dict]:
+        from sentence_transformers import CrossEncoder
+
+        torch_model = CrossEncoder(model_name, device='cpu')
+        # Same score transform (e.g. identity for ms-marco, sigmoid for others) as the PyTorch path
+        activation = getattr(torch_model, 'activation_fn', None) or \
+            getattr(torch_model, 'default_activation_function', None)
+        name = 'identity' if activation is None else getattr(activation, '__name__', type(activation).__name__).lower()
+        if name not in ACTIVATIONS:
+            raise ValueError(f"No ONNX equivalent for the {name} activation of {model_name}")
+        settings = {
+            'activation': name,
+            'max_length': getattr(torch_model, 'max_length', None) or min(512, torch_model.tokenizer.model_max_length),
+        }
+        return torch_model.model, torch_model.tokenizer, settings
+
+    def predict(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = len(sentences) == 2 and isinstance(sentences[0], str)
+        pairs = [sentences] if single else list(sentences)
+        scores = []
+        for i in range(0, len(pairs), batch_size):
+            batch = pairs[i:i + batch_size]
+            logits, _ = self._run([pair[0] for pair in batch], [pair[1] for pair in batch])
+            scores.append(self._activate(logits))
+        scores = np.concatenate(scores) if scores else np.zeros(0, dtype='float32')
+        return scores[0] if single else scores
+
+    def _activate(self, logits: np.ndarray) -> np.ndarray:
+        logits = self.activation(logits)
+        return (logits[:, 0] if logits.ndim == 2 and logits.shape[1] == 1 else logits).astype('float32')
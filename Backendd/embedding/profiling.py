@@ -0,0 +1,156 @@
+"""Profiling of the live search process without a debugger.
+
+SamplingProfiler snapshots every thread's stack with sys._current_frames() at a
+fixed interval, so its cost is one stack walk per thread per tick whatever the
+code being sampled does. Its output is a collapsed-stack file (one
+``frame;frame;frame count`` line per distinct stack, the input format of
+flamegraph.pl and speedscope) and a top-functions summary. CallProfiler is a
+deterministic cProfile of a single call, for attaching to one request.
+"""
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Admin-only profiles are capped so a typo cannot stall the sampler for an hour
+MAX_PROFILE_SECONDS = 60
+DEFAULT_INTERVAL_SECONDS = 0.005
+TOP_FUNCTIONS = 30
+
+
+class ProfilerBusy(RuntimeError):
+    """A profile was requested while another one is running"""
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Statistical profile of every thread of this process, one run at a time"""
+
+    def __init__(self):
+        self._running = threading.Lock()
+
+    def run(self, seconds: float, interval: float = DEFAULT_INTERVAL_SECONDS) -> Dict:
+        """Sample for seconds in the calling thread; raises ProfilerBusy if a run is already going"""
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("A sampling profile is already running")
+        try:
+            return self._sample(min(seconds, MAX_PROFILE_SECONDS), max(interval, 0.001))
+        finally:
+            self._running.release()
+
+    def _sample(self, seconds: float, interval: float) -> Dict:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        ticks = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stacks[tuple(reversed(stack))] += 1
+            ticks += 1
+            time.sleep(interval)
+        return {
+            'seconds': round(time.perf_counter() - started, 3),
+            'interval_ms': interval * 1000,
+            'ticks': ticks,
+            'samples': sum(stacks.values()),
+            'top_functions': top_functions(stacks),
+            'collapsed': collapse(stacks),
+        }
+
+
+def collapse(stacks: Counter) -> str:
+    """Stacks (root first) and their sample counts in collapsed-stack format"""
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+    """Functions by samples spent in them (self) and under them (total), most self time first"""
+    total = sum(stacks.values()) or 1
+    own: Counter = Counter()
+    inclusive: Counter = Counter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        # Count recursive frames once per sample
+        for name in set(stack[1:]):
+            inclusive[name] += count
+    return [{
+        'function': name,
+        'self_samples': count,
+        'self_pct': round(100 * count / total, 2),
+        'total_samples': inclusive[name],
+        'total_pct': round(100 * inclusive[name] / total, 2),
+    } for name, count in own.most_common(limit)]
+
+
+# cProfile hooks are interpreter-wide on newer Pythons, so only one call is profiled at a time
+_call_profile_lock = threading.Lock()
+
+
+class CallProfiler:
+    """Deterministic profile of the code run in its with-block, in the current thread only.
+
+    Work handed to other threads (the micro-batched model calls, a coalesced
+    search running in another request) shows up as time waiting for it.
+    Entering raises ProfilerBusy while another call is being profiled.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def __enter__(self) -> 'CallProfiler':
+        if not _call_profile_lock.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled, try again without ?profile=1 or later")
+        try:
+            self._profile.enable()
+        except BaseException:
+            # e.g. another profiler already active on this thread; later requests must still get the lock
+            _call_profile_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._profile.disable()
+        _call_profile_lock.release()
+        return False
+
+    def summary(self, limit: int = TOP_FUNCTIONS) -> Dict:
+        """Total time and the top functions by cumulative time"""
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f"{name} ({os.path.basename(filename)}:{line})",
+                'calls': calls,
+                'self_ms': round(own * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+            })
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return {
+            'total_ms': round(stats.total_tt * 1000, 3),
+            'total_calls': stats.total_calls,
+            'top_functions': rows[:limit],
+        }
+
+
+def authorized(header: Optional[str], token: Optional[str]) -> bool:
+    """Whether an Authorization header carries the admin bearer token (never, when no token is configured)"""
+    if not token or not header or not header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(header[len('Bearer '):].encode('utf-8'), token.encode('utf-8'))
@@ -0,0 +1,152 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Default vocabularies, in priority order: when several terms of a single-valued
+# category (seniority, sector, work preference) occur, the earliest listed wins.
+SENIORITY_KEYWORDS = ['senior', 'lead', 'principal', 'staff', 'junior', 'entry']
+COMMON_SKILLS = ['python', 'javascript', 'react', 'langchain', 'tensorflow', 'pytorch',
+                 'aws', 'docker', 'kubernetes', 'sql', 'nosql', 'machine learning', 'ai']
+COMMON_SECTORS = ['healthcare', 'finance', 'tech', 'education', 'retail', 'manufacturing',
+                  'government', 'nonprofit', 'media', 'entertainment', 'energy', 'transportation',
+                  'consulting', 'legal', 'hospitality', 'construction', 'agriculture', 'pharmaceutical']
+
+EXPERIENCE_PATTERNS = [
+    re.compile(r'(\d+)\+?\s*years?\s*(?:of\s*)?(?:experience|exp)'),
+    re.compile(r'(\d+)\+?\s*yrs?'),
+    re.compile(r'with\s*(\d+)\+?\s*years?'),
+]
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton finding every keyword occurring (as a substring) in a text in one pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        for keyword in keywords:
+            self._insert(keyword)
+        self._link()
+
+    def _insert(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if keyword not in self._output[state]:
+            self._output[state] += (keyword,)
+
+    def _link(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+def _ranks(terms: List[str]) -> Dict[str, int]:
+    ranks: Dict[str, int] = {}
+    for i, term in enumerate(terms):
+        ranks.setdefault(term, i)
+    return ranks
+
+
+def _first(found: Set[str], rank: Dict[str, int]) -> Optional[str]:
+    """Highest-priority term of one category among the matches"""
+    return min((term for term in found if term in rank), key=rank.get, default=None)
+
+
+class QueryAnalyzer:
+    """Extracts structured requirements from a search query, caching parsed queries"""
+
+    def __init__(self,
+                 skills: Optional[List[str]] = None,
+                 sectors: Optional[List[str]] = None,
+                 seniority: Optional[List[str]] = None,
+                 work_preferences: Optional[List[str]] = None,
+                 cache_size: int = 4096):
+        self.skills = [s.lower() for s in (skills if skills is not None else COMMON_SKILLS)]
+        self.sectors = [s.lower() for s in (sectors if sectors is not None else COMMON_SECTORS)]
+        self.seniority = [s.lower() for s in (seniority if seniority is not None else SENIORITY_KEYWORDS)]
+        self.work_preferences = [p.lower() for p in (work_preferences if work_preferences is not None
+                                                     else ['remote', 'onsite', 'hybrid'])]
+        self.cache_size = cache_size
+        self._build()
+
+    def _build(self):
+        # Vocabulary position of each term, so picking matches never scans the vocabulary
+        self._skill_rank = _ranks(self.skills)
+        self._sector_rank = _ranks(self.sectors)
+        self._seniority_rank = _ranks(self.seniority)
+        self._work_pref_rank = _ranks(self.work_preferences)
+        self._matcher = KeywordMatcher(self.skills + self.sectors + self.seniority + self.work_preferences)
+        self._parse_cached = lru_cache(maxsize=self.cache_size)(self._parse)
+
+    def add_skills(self, skills: Iterable[str]):
+        """Extend the skill vocabulary (lowest priority) and drop cached parses"""
+        known = set(self.skills)
+        for skill in skills:
+            skill = skill.lower().strip()
+            if skill and skill not in known:
+                self.skills.append(skill)
+                known.add(skill)
+        self._build()
+
+    def analyze(self, query: str) -> Dict:
+        """Requirements dict for query; a fresh copy, so callers may modify it"""
+        years_exp, skills, work_preference, seniority, sector = self._parse_cached(query.lower())
+        return {
+            'years_exp': years_exp,
+            'skills': list(skills),
+            'work_preference': work_preference,
+            'location': None,
+            'seniority': seniority,
+            'sector': sector,
+        }
+
+    def _parse(self, query_lower: str) -> Tuple:
+        years_exp = None
+        for pattern in EXPERIENCE_PATTERNS:
+            match = pattern.search(query_lower)
+            if match:
+                years_exp = int(match.group(1))
+                break
+
+        found = self._matcher.find(query_lower)
+        return (
+            years_exp,
+            tuple(sorted((term for term in found if term in self._skill_rank), key=self._skill_rank.get)),
+            _first(found, self._work_pref_rank),
+            _first(found, self._seniority_rank),
+            _first(found, self._sector_rank),
+        )
+
+    def cache_info(self):
+        return self._parse_cached.cache_info()
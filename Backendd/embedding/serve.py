@@ -0,0 +1,156 @@
+"""Multi-process server for the candidate search API.
+
+The master process never loads a model. It first runs a short-lived preparation
+process that builds the index snapshot (or checks that the existing one matches
+candidates.json) and exits, then starts the workers with the multiprocessing
+'spawn' method. Each worker is a fresh interpreter: it loads the models, maps
+the prepared snapshot read-only, so the index and embedding pages are shared
+through the page cache, and only then starts accepting on the listening socket
+all workers share, with a threaded WSGI server. Forking after torch or OpenMP
+has run inference can deadlock the child on the copied thread pool's locks, so
+no process here forks after inference.
+
+The price is that nothing model-related is shared: every worker holds its own
+bi-encoder and cross-encoder. With the default models (all-MiniLM-L6-v2 and
+ms-marco-MiniLM-L-12-v2, 22.7M + 33.4M parameters) that is about 225 MB of
+float32 weights per worker, plus the torch runtime's own heap; only the index
+and embedding pages are shared. INFERENCE_BACKEND=onnx cuts the weights to about
+a quarter (int8) and keeps torch out of the workers, as the preparation process
+exports the models once. benchmarks/serving_benchmark.py reports the PSS each
+added worker costs.
+
+    python serve.py --workers 4 --port 5001
+
+Live updates (POST/DELETE /candidates, /reload and the candidates.json watcher)
+are disabled in this mode, as each worker would only change its own copy; edit
+candidates.json and restart. Restarted workers map the snapshot prepared at
+startup, so every worker serves the same generation; SNAPSHOT_PATH must not be empty.
+Workers share their metrics through a temporary directory, so /metrics on any
+worker reports the whole server, and one cursor secret (CURSOR_SECRET, random
+unless set), so any worker can serve the next page of a paginated search.
+"""
+import argparse
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import secrets
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from werkzeug.serving import make_server
+
+import candidate_embeddings as ce
+from metrics import REGISTRY
+from snapshot import read_manifest
+
+logger = logging.getLogger(__name__)
+
+# Pause before replacing a worker that died, so a crash loop does not spin
+RESPAWN_DELAY = 1.0
+
+
+def prepare_snapshot():
+    """Build or validate the snapshot the workers map (runs in its own process, which then exits)"""
+    sys.exit(0 if ce.initialize_search_system() else 1)
+
+
+def limit_threads(threads: int):
+    """Cap intra-op threads so workers x threads does not oversubscribe the cores"""
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+    ce.faiss.omp_set_num_threads(threads)
+
+
+def run_worker(sock: socket.socket, host: str, port: int, threads: int, metrics_dir: str):
+    """Warm up, then serve requests on the shared socket until terminated (runs in a spawned process)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the whole group; the master stops us
+    REGISTRY.share(metrics_dir)
+    ce.shared_serving = True
+    ce.start_warm_up()
+    if not ce.startup.wait():
+        logger.error(f"Worker failed to start: {ce.startup.status().get('error')}")
+        sys.exit(1)
+    # Warm-up only maps the snapshot, so no inference has run before the thread pools are sized
+    limit_threads(threads)
+    server = make_server(host, port, ce.app, threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def serve(host: str, port: int, workers: int, threads: int):
+    """Bind, start workers and keep them running until SIGTERM/SIGINT"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+
+    context = multiprocessing.get_context('spawn')
+    metrics_dir = tempfile.mkdtemp(prefix='search-metrics-')
+    processes: Dict[int, multiprocessing.Process] = {}  # worker slot -> process
+    stopping = False
+
+    def spawn(slot: int):
+        process = context.Process(target=run_worker, args=(sock, host, port, threads, metrics_dir),
+                                  name=f"search-worker-{slot}")
+        process.start()
+        processes[slot] = process
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for slot in range(workers):
+        spawn(slot)
+    logger.info(f"Serving on http://{host}:{port} with {workers} workers x {threads} threads "
+                f"(pids {sorted(process.pid for process in processes.values())})")
+
+    while processes:
+        by_sentinel = {process.sentinel: slot for slot, process in processes.items()}
+        for sentinel in multiprocessing.connection.wait(list(by_sentinel)):
+            slot = by_sentinel[sentinel]
+            process = processes.pop(slot)
+            process.join()
+            if not stopping:
+                logger.warning(f"Worker {process.pid} exited with status {process.exitcode}, restarting")
+                time.sleep(RESPAWN_DELAY)
+                spawn(slot)
+    sock.close()
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=None,
+                        help='intra-op threads per worker (default: cores / workers)')
+    args = parser.parse_args()
+
+    if not ce.SNAPSHOT_PATH:
+        logger.error("serve.py needs SNAPSHOT_PATH: workers serve the snapshot prepared at startup")
+        sys.exit(1)
+    context = multiprocessing.get_context('spawn')
+    preparation = context.Process(target=prepare_snapshot, name='search-prepare')
+    preparation.start()
+    preparation.join()
+    if preparation.exitcode != 0 or read_manifest(ce.SNAPSHOT_PATH) is None:
+        logger.error(f"Could not prepare the snapshot at {ce.SNAPSHOT_PATH}")
+        sys.exit(1)
+    # Spawned workers import candidate_embeddings afresh and read it from the environment
+    os.environ.setdefault('CURSOR_SECRET', secrets.token_urlsafe(32))
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    serve(args.host, args.port, args.workers, threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+"""Candidate index sharded over separate shard server processes.
+
+Each shard server holds, per index generation, the ANN index over its part of
+the pool and answers add/remove/search requests from coordinators over an
+authenticated multiprocessing connection, one thread per connection.
+ShardedIndex is the coordinator side: it places candidates on shards by a hash
+of their id, scatters each query batch to every shard in parallel and merges
+the per-shard top-k lists with a heap. Shards are spawned as local processes,
+or, for placement on other hosts, started there with
+
+    SHARD_AUTHKEY=<hex> python sharding.py --host 0.0.0.0 --port 7001
+
+and listed in IndexConfig.shard_addresses.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ann_index import IndexConfig, build_index, search_parameters
+from concurrency import ReadWriteLock
+from startup import lazy_import
+
+faiss = lazy_import('faiss')
+
+logger = logging.getLogger(__name__)
+
+# Rebuild a shard's HNSW graph once this share of it is tombstoned
+TOMBSTONE_REBUILD_RATIO = 0.1
+# Seconds to wait for a spawned shard server to report its address
+SPAWN_TIMEOUT = 60
+
+
+class ShardError(Exception):
+    """A shard server rejected or failed a request"""
+
+
+def shard_of(key, num_shards: int) -> int:
+    """Shard holding the candidate with this id; stable across processes and restarts"""
+    return zlib.crc32(str(key).encode('utf-8')) % num_shards
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def _authkey() -> bytes:
+    key = os.getenv('SHARD_AUTHKEY')
+    if not key:
+        raise ValueError("SHARD_AUTHKEY must be set to the shard servers' shared key (hex)")
+    return bytes.fromhex(key)
+
+
+class _Shard:
+    """One generation's partition of the index inside a shard server"""
+
+    def __init__(self, config: IndexConfig, dimension: int, vectors: np.ndarray, labels: np.ndarray):
+        self.config = config
+        self.dimension = dimension
+        self.index = build_index(config, dimension, vectors if len(vectors) else None, ids=labels)
+        self.lock = ReadWriteLock()
+        self.tombstones = set()
+        self.tombstone_selector = None
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray):
+        with self.lock.write():
+            self.index.add_with_ids(vectors, labels)
+
+    def remove(self, labels: np.ndarray) -> int:
+        with self.lock.write():
+            try:
+                return int(self.index.remove_ids(labels))
+            except RuntimeError:
+                # HNSW graphs cannot drop vectors; hide them until the next rebuild
+                self.tombstones.update(int(label) for label in labels)
+                if len(self.tombstones) > TOMBSTONE_REBUILD_RATIO * max(1, self.index.ntotal):
+                    self._rebuild()
+                else:
+                    tombstones = np.array(sorted(self.tombstones), dtype='int64')
+                    self.tombstone_selector = faiss.IDSelectorNot(faiss.IDSelectorBatch(tombstones))
+                return len(labels)
+
+    def _rebuild(self):
+        labels = faiss.vector_to_array(self.index.id_map)
+        labels = labels[~np.isin(labels, np.fromiter(self.tombstones, dtype='int64'))]
+        vectors = self.index.reconstruct_batch(labels) if len(labels) else None
+        self.index = build_index(self.config, self.dimension, vectors, ids=labels)
+        self.tombstones = set()
+        self.tombstone_selector = None
+
+    def search(self, queries: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int],
+               bitmap: Optional[np.ndarray]):
+        with self.lock.read():
+            if bitmap is not None:
+                # Removed labels are already cleared from the coordinator's filter mask
+                selector = faiss.IDSelectorBitmap(bitmap)
+            else:
+                selector = self.tombstone_selector
+            params = search_parameters(self.index, nprobe=nprobe, ef_search=ef_search, selector=selector)
+            return self.index.search(queries, k, params=params)
+
+
+class ShardServer:
+    """Serves the shard partitions of any number of index generations"""
+
+    def __init__(self, host: str, port: int, authkey: bytes):
+        self.listener = Listener((host, port), authkey=authkey)
+        self._shards: Dict[str, _Shard] = {}
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.listener.address
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:  # failed handshake; keep serving the others
+                logger.warning(f"Rejected shard connection: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: Connection):
+        with conn:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(('ok', getattr(self, f"_op_{op}")(*args)))
+                except Exception as e:
+                    conn.send(('error', f"{type(e).__name__}: {e}"))
+
+    def _op_build(self, generation: str, config: IndexConfig, dimension: int,
+                  vectors: np.ndarray, labels: np.ndarray) -> int:
+        self._shards[generation] = _Shard(config, dimension, vectors, labels)
+        return len(labels)
+
+    def _op_add(self, generation: str, vectors: np.ndarray, labels: np.ndarray) -> int:
+        self._shards[generation].add(vectors, labels)
+        return len(labels)
+
+    def _op_remove(self, generation: str, labels: np.ndarray) -> int:
+        return self._shards[generation].remove(labels)
+
+    def _op_search(self, generation: str, queries: np.ndarray, k: int, nprobe: Optional[int],
+                   ef_search: Optional[int], bitmap: Optional[np.ndarray]):
+        return self._shards[generation].search(queries, k, nprobe, ef_search, bitmap)
+
+    def _op_drop(self, generation: str) -> bool:
+        return self._shards.pop(generation, None) is not None
+
+    def _op_stats(self) -> Dict:
+        return {generation: shard.index.ntotal for generation, shard in self._shards.items()}
+
+
+_clusters: 'weakref.WeakSet[ShardCluster]' = weakref.WeakSet()
+
+
+class ShardCluster:
+    """Pooled connections to the shard servers, spawning local ones unless addresses are given"""
+
+    def __init__(self, num_shards: int, addresses: Optional[Sequence[str]] = None):
+        self._processes: List[subprocess.Popen] = []
+        if addresses:
+            if len(addresses) != num_shards:
+                raise ValueError(f"{len(addresses)} shard addresses given for {num_shards} shards")
+            self.authkey = _authkey()
+            self.addresses = [_parse_address(address) for address in addresses]
+        else:
+            self.authkey = os.urandom(16)
+            self.addresses = [self._spawn() for _ in range(num_shards)]
+        self._idle = [queue.SimpleQueue() for _ in self.addresses]
+        _clusters.add(self)
+        logger.info(f"Connected to {num_shards} index shards at {self.addresses}")
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    @property
+    def pids(self) -> List[int]:
+        """Process ids of the locally spawned shard servers"""
+        return [process.pid for process in self._processes]
+
+    def _spawn(self) -> Tuple[str, int]:
+        """Start a local shard server on a free port and wait for it to report the port"""
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--host', '127.0.0.1', '--port', '0',
+             '--parent-pid', str(os.getpid())],
+            env={**os.environ, 'SHARD_AUTHKEY': self.authkey.hex()}, stdout=subprocess.PIPE, text=True)
+        self._processes.append(process)
+        line = process.stdout.readline().split()
+        if len(line) != 2:
+            raise RuntimeError(f"Shard server {process.pid} failed to start")
+        return line[0], int(line[1])
+
+    def _acquire(self, shard: int) -> Connection:
+        try:
+            return self._idle[shard].get_nowait()
+        except queue.Empty:
+            return Client(self.addresses[shard], authkey=self.authkey)
+
+    def scatter(self, requests: Dict[int, Tuple[str, tuple]]) -> Dict[int, object]:
+        """Send (op, args) to each shard at once, then gather the replies"""
+        sent = {}
+        try:
+            for shard, request in requests.items():
+                conn = self._acquire(shard)
+                sent[shard] = conn
+                conn.send(request)
+            replies = {shard: conn.recv() for shard, conn in sent.items()}
+        except Exception:
+            for conn in sent.values():
+                conn.close()  # may still have a reply in flight
+            raise
+        for shard, conn in sent.items():
+            self._idle[shard].put(conn)
+        errors = [f"shard {shard}: {reply[1]}" for shard, reply in replies.items() if reply[0] != 'ok']
+        if errors:
+            raise ShardError(f"Shard request failed ({'; '.join(errors)})")
+        return {shard: reply[1] for shard, reply in replies.items()}
+
+    def broadcast(self, op: str, *args) -> Dict[int, object]:
+        return self.scatter({shard: (op, args) for shard in range(len(self))})
+
+    def _reset_after_fork(self):
+        self._idle = [queue.SimpleQueue() for _ in self.addresses]
+
+    def close(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.wait()
+        self._processes = []
+
+
+def _reset_clusters_after_fork():
+    """Connections belong to the parent; a forked child opens its own"""
+    for cluster in list(_clusters):
+        cluster._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_clusters_after_fork)
+
+
+class ShardedIndex:
+    """One index generation partitioned over a ShardCluster by candidate id hash.
+
+    Supports the parts of the faiss index interface CandidateEmbeddings uses
+    (ntotal, add_with_ids, remove_ids, search). Searches take the ANN knobs and
+    an optional label mask directly, as faiss search parameters cannot be sent
+    to another process.
+    """
+
+    def __init__(self, cluster: ShardCluster, config: IndexConfig, dimension: int,
+                 embeddings: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None,
+                 keys: Optional[Sequence] = None):
+        self.cluster = cluster
+        self.config = config
+        self.dimension = dimension
+        self.generation = uuid.uuid4().hex
+        self.ntotal = 0
+        self._owner = np.full(0, -1, dtype='int16')  # shard of each label
+        n = 0 if embeddings is None else len(embeddings)
+        labels = np.arange(n, dtype='int64') if ids is None else np.asarray(ids, dtype='int64')
+        shards = self._place(labels, keys)
+        vectors = np.zeros((0, dimension), dtype='float32') if embeddings is None else embeddings
+        self.cluster.scatter({
+            shard: ('build', (self.generation, config, dimension,
+                              np.ascontiguousarray(vectors[shards == shard], dtype='float32'),
+                              labels[shards == shard]))
+            for shard in range(len(cluster))
+        })
+        self.ntotal = n
+
+    def _place(self, labels: np.ndarray, keys: Optional[Sequence]) -> np.ndarray:
+        """Shard of each label (by its candidate id where given), remembered for removal"""
+        keys = labels if keys is None else keys
+        shards = np.fromiter((shard_of(key, len(self.cluster)) for key in keys), dtype='int16', count=len(labels))
+        if len(labels):
+            top = int(labels.max()) + 1
+            if top > len(self._owner):
+                grown = np.full(max(top, 2 * len(self._owner)), -1, dtype='int16')
+                grown[:len(self._owner)] = self._owner
+                self._owner = grown
+            self._owner[labels] = shards
+        return shards
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray, keys: Optional[Sequence] = None):
+        labels = np.asarray(ids, dtype='int64')
+        shards = self._place(labels, keys)
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        self.cluster.scatter({
+            int(shard): ('add', (self.generation, vectors[shards == shard], labels[shards == shard]))
+            for shard in np.unique(shards)
+        })
+        self.ntotal += len(labels)
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        labels = np.asarray(ids, dtype='int64')
+        labels = labels[labels < len(self._owner)]
+        shards = self._owner[labels]
+        known = shards >= 0
+        labels, shards = labels[known], shards[known]
+        replies = self.cluster.scatter({
+            int(shard): ('remove', (self.generation, labels[shards == shard]))
+            for shard in np.unique(shards)
+        })
+        self._owner[labels] = -1
+        removed = sum(replies.values())
+        self.ntotal -= removed
+        return removed
+
+    def search(self, queries: np.ndarray, k: int, nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None, mask: Optional[np.ndarray] = None):
+        """Top k over all shards, shaped like faiss Index.search output (padded with -inf / -1)"""
+        queries = np.ascontiguousarray(queries, dtype='float32')
+        bitmap = None if mask is None else np.packbits(mask, bitorder='little')
+        replies = self.cluster.broadcast('search', self.generation, queries, k, nprobe, ef_search, bitmap)
+        scores = np.full((len(queries), k), -np.inf, dtype='float32')
+        labels = np.full((len(queries), k), -1, dtype='int64')
+        for q in range(len(queries)):
+            # Every shard's list is already sorted best-first, so a k-way heap merge suffices
+            runs = [[(float(score), int(label)) for score, label in zip(shard_scores[q], shard_labels[q])
+                     if label >= 0]
+                    for shard_scores, shard_labels in replies.values()]
+            merged = heapq.merge(*runs, key=lambda hit: -hit[0])
+            for i, (score, label) in enumerate(itertools.islice(merged, k)):
+                scores[q, i] = score
+                labels[q, i] = label
+        return scores, labels
+
+    def close(self):
+        """Free this generation on every shard"""
+        try:
+            self.cluster.broadcast('drop', self.generation)
+        except Exception as e:
+            logger.warning(f"Could not drop index generation {self.generation}: {e}")
+
+
+def _exit_with_parent(parent_pid: int):
+    """Stop a spawned shard server once the process that spawned it is gone"""
+    while True:
+        time.sleep(1)
+        if os.getppid() != parent_pid:
+            os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve index shards for ShardedIndex coordinators')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7001)
+    parser.add_argument('--parent-pid', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = ShardServer(args.host, args.port, _authkey())
+    if args.parent_pid is not None:
+        threading.Thread(target=_exit_with_parent, args=(args.parent_pid,), daemon=True).start()
+    host, port = server.address
+    print(host, port, flush=True)  # read by ShardCluster._spawn
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from compression import VectorCodec
+from startup import lazy_import
+
+faiss = lazy_import('faiss')
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'index.faiss'
+EMBEDDINGS_FILE = 'embeddings.npy'
+LABELS_FILE = 'labels.npy'
+CANDIDATES_FILE = 'candidates.json'
+CODEC_FILE = 'codec.npz'
+KEEP_GENERATIONS = 2
+
+
+@dataclass
+class Snapshot:
+    """Everything needed to serve searches without re-encoding"""
+    manifest: Dict
+    index: Optional[faiss.Index]  # None for snapshots of a sharded index
+    embeddings: np.ndarray
+    candidates: List[Dict]
+    labels: np.ndarray  # index label of each candidate row
+    codec: Optional[VectorCodec] = None  # set when embeddings holds compressed codes
+
+
+def _fsync_file(path: str):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _write_json(path: str, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_json_array(path: str, items: Iterable[Dict]) -> int:
+    """Write items as one JSON array, one element at a time, and return how many were written"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for item in items:
+            if count:
+                f.write(', ')
+            f.write(json.dumps(item))
+            count += 1
+        f.write(']')
+        f.flush()
+        os.fsync(f.fileno())
+    return count
+
+
+def current_generation(path: str) -> Optional[str]:
+    """Directory of the live snapshot generation, or None if there is none"""
+    pointer = os.path.join(path, CURRENT_FILE)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, 'r', encoding='utf-8') as f:
+        name = f.read().strip()
+    generation = os.path.join(path, name)
+    return generation if name and os.path.isdir(generation) else None
+
+
+def read_manifest(path: str) -> Optional[Dict]:
+    """Manifest of the live generation without touching the data files"""
+    generation = current_generation(path)
+    if generation is None:
+        return None
+    with open(os.path.join(generation, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_snapshot(path: str, index: Optional[faiss.Index], embeddings: np.ndarray,
+                   candidates: Iterable[Dict], labels: np.ndarray, manifest: Dict,
+                   codec: Optional[VectorCodec] = None) -> str:
+    """Write a new snapshot generation and atomically make it the live one.
+
+    Files go into a fresh generation directory first; the CURRENT pointer is
+    only swapped (write + rename) once they are all on disk, so readers never
+    see a partially written snapshot.
+    """
+    os.makedirs(path, exist_ok=True)
+    name = f"gen-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{time.monotonic_ns() % 1000000:06d}"
+    generation = os.path.join(path, name)
+    os.makedirs(generation)
+
+    if index is not None:
+        index_path = os.path.join(generation, INDEX_FILE)
+        faiss.write_index(index, index_path)
+        _fsync_file(index_path)
+
+    embeddings_path = os.path.join(generation, EMBEDDINGS_FILE)
+    with open(embeddings_path, 'wb') as f:
+        # Compressed codes keep their own dtype, so the mapped file is as small as the pool in memory
+        np.save(f, np.ascontiguousarray(embeddings, dtype=None if codec is not None else 'float32'))
+        f.flush()
+        os.fsync(f.fileno())
+
+    if codec is not None:
+        codec_path = os.path.join(generation, CODEC_FILE)
+        codec.save(codec_path)
+        _fsync_file(codec_path)
+
+    with open(os.path.join(generation, LABELS_FILE), 'wb') as f:
+        np.save(f, np.asarray(labels, dtype='int64'))
+        f.flush()
+        os.fsync(f.fileno())
+
+    num_candidates = _write_json_array(os.path.join(generation, CANDIDATES_FILE), candidates)
+    _write_json(os.path.join(generation, MANIFEST_FILE), {
+        **manifest,
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'created_at': time.time(),
+        'num_candidates': num_candidates,
+    })
+
+    tmp_pointer = os.path.join(path, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_pointer, 'w', encoding='utf-8') as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, os.path.join(path, CURRENT_FILE))
+
+    _prune_generations(path, keep=name)
+    logger.info(f"Snapshot written to {generation}")
+    return generation
+
+
+def _prune_generations(path: str, keep: str):
+    """Remove old generations, leaving the previous one for readers still opening it"""
+    generations = sorted(
+        (entry for entry in os.listdir(path)
+         if entry.startswith('gen-') and entry != keep and os.path.isdir(os.path.join(path, entry))),
+        key=lambda entry: os.path.getmtime(os.path.join(path, entry)))
+    for entry in generations[:max(0, len(generations) - (KEEP_GENERATIONS - 1))]:
+        shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+
+
+def read_snapshot(path: str, mmap: bool = True) -> Snapshot:
+    """Open the live snapshot generation.
+
+    With mmap=True the embedding matrix and any index file are mapped read-only
+    from the files, so they cost no read or copy at load time and processes
+    serving the same snapshot share the page cache instead of holding private
+    copies. The candidate table is not mapped: it is parsed from JSON here, and
+    load_snapshot() rebuilds the candidate store and search features from it, so
+    loading still takes time linear in the number of candidates (but never
+    re-encodes them).
+    """
+    generation = current_generation(path)
+    if generation is None:
+        raise FileNotFoundError(f"No snapshot found at {path}")
+
+    with open(os.path.join(generation, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {manifest.get('format_version')} at {generation}")
+
+    index_path = os.path.join(generation, INDEX_FILE)
+    if not os.path.exists(index_path):
+        index = None
+    elif mmap:
+        # Map flat index codes straight from the file where this faiss build supports it
+        flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        try:
+            index = faiss.read_index(index_path, flags)
+        except RuntimeError as e:
+            # Not every index type can be mapped (e.g. IVF inverted lists)
+            logger.info(f"Index at {index_path} cannot be memory-mapped, reading it instead: {e}")
+            index = faiss.read_index(index_path)
+    else:
+        index = faiss.read_index(index_path)
+    embeddings = np.load(os.path.join(generation, EMBEDDINGS_FILE), mmap_mode='r' if mmap else None)
+    labels = np.load(os.path.join(generation, LABELS_FILE))
+    codec_path = os.path.join(generation, CODEC_FILE)
+    codec = VectorCodec.load(codec_path) if os.path.exists(codec_path) else None
+    with open(os.path.join(generation, CANDIDATES_FILE), 'r', encoding='utf-8') as f:
+        candidates = json.load(f)
+
+    indexed = len(labels) if index is None else index.ntotal
+    if not (len(candidates) == embeddings.shape[0] == len(labels) == indexed):
+        raise ValueError(f"Snapshot at {generation} is inconsistent: {len(candidates)} candidates, "
+                         f"{embeddings.shape[0]} embeddings, {len(labels)} labels, {indexed} indexed vectors")
+
+    logger.info(f"Snapshot loaded from {generation} ({len(candidates)} candidates, mmap={mmap})")
+    return Snapshot(manifest=manifest, index=index, embeddings=embeddings, candidates=candidates, labels=labels,
+                    codec=codec)
@@ -0,0 +1,97 @@
+import importlib.util
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+
+def lazy_import(name: str):
+    """Module object that is only actually imported on first attribute access.
+
+    faiss and torch take seconds to import; deferring them lets the web server
+    bind its port while the search system warms up in the background.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class StartupProgress:
+    """Thread-safe phase/progress tracker of a background build (warm-up or reload), for status probes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done_event = threading.Event()
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.phase = 'starting'
+        self.ready = False
+        self.error: Optional[str] = None
+        self._phase_started_at = self.started_at
+        self._completed = 0
+        self._total: Optional[int] = None
+
+    def begin(self, phase: str, total: Optional[int] = None):
+        """Enter a new phase, optionally with the number of work items it has"""
+        with self._lock:
+            self.phase = phase
+            self._phase_started_at = time.monotonic()
+            self._completed = 0
+            self._total = total
+
+    def update(self, completed: int, total: Optional[int] = None):
+        with self._lock:
+            self._completed = completed
+            if total is not None:
+                self._total = total
+
+    def finish(self):
+        with self._lock:
+            self.phase = 'ready'
+            self.ready = True
+            self.finished_at = time.monotonic()
+            self._completed = 0
+            self._total = None
+        self._done_event.set()
+
+    def fail(self, error: str):
+        with self._lock:
+            self.phase = 'failed'
+            self.error = error
+            self.finished_at = time.monotonic()
+        self._done_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up has finished or failed; True when ready"""
+        self._done_event.wait(timeout)
+        return self.ready
+
+    def status(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            status = {
+                'phase': self.phase,
+                'ready': self.ready,
+                'elapsed_seconds': round((self.finished_at or now) - self.started_at, 3),
+                'percent': 100.0 if self.ready else None,
+                'eta_seconds': 0.0 if self.ready else None,
+            }
+            if self._total:
+                # Progress and remaining time of the current phase, extrapolated from its rate so far
+                status['percent'] = round(100 * self._completed / self._total, 1)
+                status['completed'] = self._completed
+                status['total'] = self._total
+                if self._completed:
+                    rate = self._completed / max(now - self._phase_started_at, 1e-9)
+                    status['eta_seconds'] = round((self._total - self._completed) / rate, 1)
+            if self.error is not None:
+                status['error'] = self.error
+            return status
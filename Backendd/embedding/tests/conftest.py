@@ -0,0 +1,73 @@
+import os
+import re
+import sys
+import types
+import zlib
+
+import numpy as np
+import pytest
+
+# The service modules import each other as top-level modules, as when run from Backendd/embedding
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_DIMENSION = 64
+
+
+def _words(text: str):
+    return re.findall(r'[a-z0-9+#]+', text.lower())
+
+
+class FakeSentenceTransformer:
+    """Bag of hashed words: texts sharing words get similar vectors, the same text always the same one"""
+
+    def __init__(self, model_name: str, device: str = 'cpu'):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return FAKE_DIMENSION
+
+    def encode(self, texts, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), FAKE_DIMENSION), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in _words(text):
+                seed = zlib.crc32(word.encode())
+                vectors[row] += np.random.default_rng(seed).standard_normal(FAKE_DIMENSION).astype('float32')
+        if normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors
+
+
+class FakeCrossEncoder:
+    """Share of the query's words found in the document"""
+
+    def __init__(self, model_name: str, device: str = 'cpu'):
+        self.model_name = model_name
+
+    def predict(self, pairs, **kwargs) -> np.ndarray:
+        scores = []
+        for query, document in pairs:
+            query_words, document_words = set(_words(query)), set(_words(document))
+            scores.append(len(query_words & document_words) / max(1, len(query_words)))
+        return np.asarray(scores, dtype='float32')
+
+
+@pytest.fixture
+def make_engine(monkeypatch):
+    """Build CandidateEmbeddings over deterministic stand-in models, closing their batchers afterwards"""
+    models = types.ModuleType('sentence_transformers')
+    models.SentenceTransformer = FakeSentenceTransformer
+    models.CrossEncoder = FakeCrossEncoder
+    monkeypatch.setitem(sys.modules, 'sentence_transformers', models)
+    from candidate_embeddings import CandidateEmbeddings
+
+    engines = []
+
+    def make(**kwargs) -> CandidateEmbeddings:
+        engine = CandidateEmbeddings(batch_wait_ms=0, **kwargs)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.query_encoder.close()
+        engine.rerank_batcher.close()
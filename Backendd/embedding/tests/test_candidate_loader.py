@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import candidate_loader
+from candidate_loader import iter_candidates
+
+
+@pytest.fixture(params=[7, 64, 1 << 20])
+def chunk_size(request, monkeypatch):
+    """Small chunks split values across reads"""
+    monkeypatch.setattr(candidate_loader, 'CHUNK_SIZE', request.param)
+    return request.param
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / 'candidates.json'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_reads_a_json_array(tmp_path, chunk_size):
+    candidates = [{'id': str(i), 'name': f'Candidate "{i}" [x]', 'skills': ['a', '{b}']} for i in range(20)]
+    path = write(tmp_path, '\n ' + json.dumps(candidates, indent=2) + '\n')
+    assert list(iter_candidates(path)) == candidates
+
+
+def test_reads_json_lines(tmp_path, chunk_size):
+    candidates = [{'id': str(i), 'title': 'Engineer'} for i in range(10)]
+    path = write(tmp_path, '\n'.join(json.dumps(c) for c in candidates) + '\n\n')
+    assert list(iter_candidates(path)) == candidates
+
+
+def test_reads_an_empty_array(tmp_path, chunk_size):
+    assert list(iter_candidates(write(tmp_path, ' [ ] '))) == []
+
+
+def test_rejects_a_malformed_element_with_its_position(tmp_path, chunk_size):
+    path = write(tmp_path, '[{"id": "1"}, {"id": 2,}, ' + ', '.join(['{"id": "x"}'] * 1000) + ']')
+    records = iter_candidates(path)
+    assert next(records) == {'id': '1'}
+    with pytest.raises(ValueError, match=r'candidate #1 at character 2[0-9]'):
+        next(records)
+
+
+def test_requires_commas_between_elements(tmp_path, chunk_size):
+    with pytest.raises(ValueError):
+        list(iter_candidates(write(tmp_path, '[{"id": "1"} {"id": "2"}]')))
+
+
+def test_rejects_elements_that_are_not_objects(tmp_path, chunk_size):
+    with pytest.raises(ValueError, match='not a JSON object'):
+        list(iter_candidates(write(tmp_path, '[{"id": "1"}, 42]')))
+
+
+def test_rejects_a_truncated_array(tmp_path, chunk_size):
+    with pytest.raises(ValueError, match='Truncated'):
+        list(iter_candidates(write(tmp_path, '[{"id": "1"}, {"id": "2"')))
+    with pytest.raises(ValueError, match='Truncated'):
+        list(iter_candidates(write(tmp_path, '[{"id": "1"}')))
+
+
+def test_rejects_a_malformed_line(tmp_path, chunk_size):
+    path = write(tmp_path, '{"id": "1"}\n{"id": \n')
+    records = iter_candidates(path)
+    assert next(records) == {'id': '1'}
+    with pytest.raises(ValueError):
+        next(records)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from compression import VectorCodec
+
+
+@pytest.fixture
+def embeddings():
+    vectors = np.random.default_rng(0).standard_normal((500, 32)).astype('float32')
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('storage, tolerance', [('float32', 0), ('float16', 1e-3), ('int8', 2e-2)])
+def test_codes_round_trip(embeddings, storage, tolerance):
+    codec = VectorCodec.train(storage, embeddings)
+    codes = codec.encode(embeddings)
+    assert codes.dtype == codec.dtype
+    assert codes.shape == (len(embeddings), codec.dimension)
+    assert codec.bytes_per_vector == codes.itemsize * codec.dimension
+    np.testing.assert_allclose(codec.decode(codes), embeddings, atol=tolerance)
+
+
+def test_pca_preserves_inner_products(embeddings):
+    codec = VectorCodec.train('float32', embeddings, pca_dim=32)
+    queries = embeddings[:10]
+    projected = codec.decode(codec.encode(embeddings)) @ codec.project(queries).T
+    np.testing.assert_allclose(projected, embeddings @ queries.T, atol=1e-4)
+
+
+@pytest.mark.parametrize('storage, pca_dim', [('float32', None), ('float16', 16), ('int8', 8)])
+def test_save_and_load_give_the_same_codes(tmp_path, embeddings, storage, pca_dim):
+    codec = VectorCodec.train(storage, embeddings, pca_dim)
+    path = str(tmp_path / 'codec.npz')
+    codec.save(path)
+    loaded = VectorCodec.load(path)
+    assert (loaded.storage, loaded.dimension) == (codec.storage, codec.dimension)
+    np.testing.assert_array_equal(loaded.encode(embeddings), codec.encode(embeddings))
+    np.testing.assert_array_equal(loaded.decode(codec.encode(embeddings)), codec.decode(codec.encode(embeddings)))
+
+
+@pytest.mark.parametrize('storage', ['float32', 'int8'])
+def test_flat_pools_keep_one_copy(tmp_path, make_engine, storage):
+    from ann_index import IndexConfig
+    from benchmarks.synthetic_candidates import write_jsonl
+    from compression import MatrixIndex
+
+    path = write_jsonl(str(tmp_path / 'candidates.jsonl'), 200)
+    engine = make_engine(index_config=IndexConfig(storage=storage))
+    engine.stream_candidates(str(path))
+    assert isinstance(engine.index, MatrixIndex)
+    assert engine.index.ntotal == len(engine.embeddings) == 200
+    assert engine.embeddings.dtype == np.dtype(storage)
+    results = engine.search("Senior Machine Learning Engineer with Python and PyTorch", k=5)
+    assert len(results) == 5
@@ -0,0 +1,120 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from feature_store import CandidateFeatures
+from filters import FilterIndex, SearchFilters
+
+SKILLS = ['python', 'sql', 'react', 'aws', 'docker']
+WORK_PREFERENCES = ['remote', 'hybrid', 'onsite', '']
+SECTORS = ['ai', 'fintech', 'healthcare', '']
+
+
+def test_from_dict_parses_and_normalises():
+    filters = SearchFilters.from_dict({'min_experience': 2, 'max_experience': 8, 'work_preference': ' Remote ',
+                                       'sector': ['AI', 'Fintech'], 'skills_any': ['Python', 'SQL'],
+                                       'skills_all': 'AWS', 'available_by': '2025-06-30T12:00:00'})
+    assert filters == SearchFilters(min_experience=2, max_experience=8, work_preference=['remote'],
+                                    sector=['ai', 'fintech'], skills_any=['python', 'sql'], skills_all=['aws'],
+                                    available_by=date(2025, 6, 30))
+    assert SearchFilters.from_dict(filters.to_dict()) == filters
+
+
+@pytest.mark.parametrize('data', [None, {}])
+def test_from_dict_without_filters(data):
+    assert SearchFilters.from_dict(data) is None
+
+
+@pytest.mark.parametrize('data, message', [
+    (['min_experience'], 'must be an object'),
+    ({'min_years': 3}, 'Unknown filters: min_years'),
+    ({'min_experience': -1}, 'non-negative integer'),
+    ({'max_experience': True}, 'non-negative integer'),
+    ({'min_experience': '3'}, 'non-negative integer'),
+    ({'sector': ['ai', '']}, 'non-empty strings'),
+    ({'skills_any': [3]}, 'non-empty strings'),
+    ({'available_by': 'next week'}, 'ISO date'),
+])
+def test_from_dict_rejects_invalid_filters(data, message):
+    with pytest.raises(ValueError, match=message):
+        SearchFilters.from_dict(data)
+
+
+def random_features(rng) -> CandidateFeatures:
+    available = None if rng.random() < 0.1 else date(2025, 1, 1).toordinal() + int(rng.integers(0, 365))
+    return CandidateFeatures(text='', skills=frozenset(rng.choice(SKILLS, size=rng.integers(0, 4), replace=False)),
+                             title='', sector=str(rng.choice(SECTORS)),
+                             work_preference=str(rng.choice(WORK_PREFERENCES)),
+                             years_of_experience=int(rng.integers(0, 15)), available_from=available)
+
+
+def passes(features: CandidateFeatures, filters: SearchFilters) -> bool:
+    """Plain Python reading of each filter, the reference the masks must agree with"""
+    if filters.min_experience is not None and features.years_of_experience < filters.min_experience:
+        return False
+    if filters.max_experience is not None and features.years_of_experience > filters.max_experience:
+        return False
+    if filters.work_preference and features.work_preference not in filters.work_preference:
+        return False
+    if filters.sector and features.sector not in filters.sector:
+        return False
+    if filters.available_by is not None and (
+            features.available_from is None or features.available_from > filters.available_by.toordinal()):
+        return False
+    if not all(skill in features.skills for skill in filters.skills_all):
+        return False
+    return not filters.skills_any or any(skill in features.skills for skill in filters.skills_any)
+
+
+FILTER_CASES = [
+    {'min_experience': 5},
+    {'max_experience': 3},
+    {'min_experience': 2, 'max_experience': 6, 'work_preference': ['remote', 'hybrid']},
+    {'sector': 'healthcare', 'skills_any': ['python', 'sql']},
+    {'skills_all': ['python', 'aws']},
+    {'available_by': '2025-06-30', 'work_preference': 'onsite'},
+    {'sector': 'unknown sector'},
+    {'skills_any': ['cobol']},
+]
+
+
+@pytest.mark.parametrize('data', FILTER_CASES)
+def test_masks_match_each_candidate_checked_alone(data):
+    rng = np.random.default_rng(0)
+    index = FilterIndex()
+    features = {label: random_features(rng) for label in range(500)}
+    for label, candidate_features in features.items():
+        index.add(label, candidate_features)
+    # Removed labels never match, and replacements get new labels past the old ones
+    for label in range(0, 500, 7):
+        index.remove(label)
+        del features[label]
+    for label in range(500, 520):
+        features[label] = random_features(rng)
+        index.add(label, features[label])
+
+    filters = SearchFilters.from_dict(data)
+    mask = index.mask(filters)
+    assert len(mask) == 520
+    expected = sorted(label for label, candidate_features in features.items() if passes(candidate_features, filters))
+    assert np.flatnonzero(mask).tolist() == expected
+
+
+@pytest.mark.parametrize('index_type, exact_limit', [('flat', 4096), ('hnsw', 4096), ('hnsw', 0)])
+def test_filtered_searches_only_return_matches(tmp_path, make_engine, monkeypatch, index_type, exact_limit):
+    import candidate_embeddings
+    from ann_index import IndexConfig
+    from benchmarks.synthetic_candidates import write_jsonl
+
+    # A limit of 0 sends every filtered search through the ANN index with a label selector
+    monkeypatch.setattr(candidate_embeddings, 'EXACT_SEARCH_MAX_MATCHES', exact_limit)
+    engine = make_engine(index_config=IndexConfig(index_type=index_type))
+    engine.stream_candidates(str(write_jsonl(str(tmp_path / 'candidates.jsonl'), 300)))
+    data = {'min_experience': 3, 'work_preference': ['Remote', 'Hybrid'], 'skills_any': ['Python', 'SQL']}
+    results = engine.search("Senior data engineer with Python", k=10, filters=SearchFilters.from_dict(data))
+    assert results
+    for result in results:
+        assert result['yearsOfExperience'] >= 3
+        assert result['workPreference'].lower() in ('remote', 'hybrid')
+        assert {'python', 'sql'} & {skill.lower() for skill in result['skills']}
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+sentence_transformers = pytest.importorskip('sentence_transformers')
+
+from onnx_backend import OnnxCrossEncoder, OnnxSentenceEncoder  # noqa: E402
+
+MODEL = 'all-MiniLM-L6-v2'
+RERANKER = 'cross-encoder/ms-marco-MiniLM-L-12-v2'
+QUERY = "Senior Python engineer with RAG and LangChain experience"
+TEXTS = [
+    "Senior AI Engineer with 6 years building RAG pipelines in Python and LangChain",
+    "Frontend developer focused on React, TypeScript and design systems",
+    "Data analyst in healthcare, SQL, Tableau and statistics",
+    "Machine learning engineer, PyTorch, Hugging Face transformers, MLOps on AWS",
+    "DevOps engineer running Kubernetes and Terraform on GCP",
+]
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('onnx'))
+
+
+def test_embeddings_match_pytorch(model_dir):
+    expected = sentence_transformers.SentenceTransformer(MODEL, device='cpu').encode(
+        TEXTS, normalize_embeddings=True)
+    encoder = OnnxSentenceEncoder(MODEL, model_dir=model_dir)
+    # A second start reads the export and settings back instead of loading PyTorch
+    for onnx in (encoder, OnnxSentenceEncoder(MODEL, model_dir=model_dir)):
+        embeddings = onnx.encode(TEXTS, normalize_embeddings=True)
+        assert embeddings.shape == expected.shape
+        assert onnx.get_sentence_embedding_dimension() == expected.shape[1]
+        assert np.sum(embeddings * expected, axis=1).min() >= 0.98
+    assert encoder.encode(TEXTS[0]).shape == (expected.shape[1],)
+
+
+def test_rerank_scores_match_pytorch(model_dir):
+    pairs = [[QUERY, text] for text in TEXTS]
+    expected = np.asarray(sentence_transformers.CrossEncoder(RERANKER, device='cpu').predict(pairs))
+    for onnx in (OnnxCrossEncoder(RERANKER, model_dir=model_dir), OnnxCrossEncoder(RERANKER, model_dir=model_dir)):
+        scores = onnx.predict(pairs)
+        assert scores.shape == expected.shape
+        np.testing.assert_allclose(scores, expected, atol=0.05 * max(1.0, float(np.ptp(expected))))
+        assert list(np.argsort(-scores)[:2]) == list(np.argsort(-expected)[:2])
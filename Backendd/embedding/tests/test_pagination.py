@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from caching import LRUCache
+from candidate_embeddings import CandidateEmbeddings, InvalidCursor, SearchConfig
+from filters import SearchFilters
+
+RANKED = 25
+
+
+def engine(secret: bytes = b'secret', calls: list = None) -> CandidateEmbeddings:
+    """A CandidateEmbeddings with its search stubbed by a fixed ranking, recording every search it runs"""
+    search = CandidateEmbeddings.__new__(CandidateEmbeddings)
+    search.config = SearchConfig()
+    search.result_cache = LRUCache(10)
+    search._cursor_secret = secret
+    calls = [] if calls is None else calls
+
+    def search_with_stats(query, k, rerank, nprobe, ef_search, filters, max_rerank_pairs, max_latency_ms, timer):
+        calls.append({'query': query, 'k': k, 'filters': filters, 'max_rerank_pairs': max_rerank_pairs,
+                      'max_latency_ms': max_latency_ms})
+        return [{'id': str(i)} for i in range(RANKED)], {'retrieved': 50, 'reranked': 7, 'budget_limited': False}
+
+    search._search_with_stats = search_with_stats
+    search._format_results = lambda query, results, explain: {
+        'status': 'success', 'query': query, 'candidates': [result['id'] for result in results]}
+    return search
+
+
+def walk(search: CandidateEmbeddings, page: dict, page_size: int) -> list:
+    pages = [page]
+    while pages[-1]['page']['next_cursor']:
+        pages.append(search.search_page_json(cursor=pages[-1]['page']['next_cursor'], page_size=page_size))
+    return pages
+
+
+def test_pages_slice_one_ranking():
+    calls = []
+    search = engine(calls=calls)
+    pages = walk(search, search.search_page_json('python developer', page_size=10), 10)
+    assert [page['candidates'] for page in pages] == [
+        [str(i) for i in range(0, 10)], [str(i) for i in range(10, 20)], [str(i) for i in range(20, 25)]]
+    assert [page['page']['offset'] for page in pages] == [0, 10, 20]
+    assert all(page['query'] == 'python developer' for page in pages)
+    assert len(calls) == 1 and calls[0]['k'] == search.config.page_depth
+
+
+def test_another_process_replays_the_search_from_the_cursor():
+    calls = []
+    first = engine()
+    page = first.search_page_json('python developer', page_size=10,
+                                  filters=SearchFilters.from_dict({'min_experience': 3, 'available_by': '2025-06-30'}),
+                                  max_latency_ms=50)
+    other = engine(calls=calls)
+    second = other.search_page_json(cursor=page['page']['next_cursor'], page_size=10)
+    assert second['candidates'] == [str(i) for i in range(10, 20)]
+    assert second['query'] == 'python developer'
+    # Same filters and cross-encoded pair count as the first page, with no latency budget to cut it short
+    assert calls[0]['filters'] == SearchFilters(min_experience=3, available_by=date(2025, 6, 30))
+    assert calls[0]['max_rerank_pairs'] == 7
+    assert calls[0]['max_latency_ms'] == float('inf')
+
+
+@pytest.mark.parametrize('tamper', [lambda cursor: cursor[:-4] + 'AAA=', lambda cursor: 'x' + cursor,
+                                    lambda cursor: ''])
+def test_tampered_cursors_are_rejected(tamper):
+    search = engine()
+    cursor = search.search_page_json('python developer', page_size=10)['page']['next_cursor']
+    with pytest.raises(InvalidCursor):
+        search.search_page_json(cursor=tamper(cursor), page_size=10)
+
+
+def test_cursors_from_another_secret_are_rejected():
+    cursor = engine(b'one').search_page_json('python developer', page_size=10)['page']['next_cursor']
+    with pytest.raises(InvalidCursor):
+        engine(b'two').search_page_json(cursor=cursor, page_size=10)
+
+
+def test_last_page_has_no_cursor():
+    page = engine().search_page_json('python developer', page_size=RANKED)
+    assert page['page']['next_cursor'] is None
+    assert page['page']['ranked_results'] == RANKED
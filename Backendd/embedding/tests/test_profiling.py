@@ -0,0 +1,36 @@
+import cProfile
+
+import pytest
+
+import candidate_embeddings
+from profiling import CallProfiler, ProfilerBusy
+
+
+def test_only_one_request_is_profiled_at_a_time():
+    with CallProfiler():
+        with pytest.raises(ProfilerBusy):
+            with CallProfiler():
+                pass
+    with CallProfiler():
+        pass
+
+
+def test_a_failed_start_releases_the_profiler(monkeypatch):
+    def enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, 'enable', enable)
+    with pytest.raises(ValueError):
+        with CallProfiler():
+            pass
+    monkeypatch.undo()
+    with CallProfiler():
+        pass
+
+
+@pytest.mark.parametrize('header, status', [(None, 401), ('Bearer wrong', 403)])
+def test_process_profile_needs_the_admin_token(monkeypatch, header, status):
+    monkeypatch.setattr(candidate_embeddings, 'ADMIN_TOKEN', 'token')
+    headers = {'Authorization': header} if header else {}
+    response = candidate_embeddings.app.test_client().post('/admin/profile?seconds=0.1', headers=headers)
+    assert response.status_code == status
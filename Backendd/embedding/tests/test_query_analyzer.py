@@ -0,0 +1,20 @@
+import random
+
+from query_analyzer import COMMON_SKILLS, KeywordMatcher
+
+
+def test_keyword_matcher_finds_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+    assert matcher.find('ushers') == {'he', 'she', 'hers'}
+    assert matcher.find('') == set()
+
+
+def test_keyword_matcher_agrees_with_substring_matching():
+    rng = random.Random(0)
+    keywords = COMMON_SKILLS + ['aa', 'aab', 'ab', 'b', 'bab']
+    matcher = KeywordMatcher(keywords)
+    alphabet = 'ab ' + ''.join(sorted(set(''.join(COMMON_SKILLS))))
+    texts = [' '.join(rng.sample(COMMON_SKILLS, 3)) for _ in range(50)]
+    texts += [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(500)]
+    for text in texts:
+        assert matcher.find(text) == {keyword for keyword in keywords if keyword in text}, text
@@ -0,0 +1,94 @@
+import numpy as np
+
+from scoring import cascade_depth
+
+
+def test_cascade_depth_is_zero_without_results_wanted():
+    assert cascade_depth(np.array([0.9, 0.8]), 0, 0.1, 100) == 0
+    assert cascade_depth(np.array([], dtype='float32'), 0, 0.1, 100) == 0
+
+
+def test_cascade_depth_takes_the_whole_pool_when_it_is_small():
+    assert cascade_depth(np.array([0.9, 0.5]), 5, 0.1, 100) == 2
+    assert cascade_depth(np.array([0.9, 0.5]), 5, 0.1, 1) == 1
+
+
+def test_cascade_depth_stops_at_k_when_the_top_is_settled():
+    scores = np.array([0.9, 0.8, 0.3, 0.2])
+    assert cascade_depth(scores, 2, 0.1, 100) == 2
+
+
+def test_cascade_depth_reranks_the_contested_band():
+    scores = np.array([0.9, 0.8, 0.75, 0.72, 0.2])
+    assert cascade_depth(scores, 2, 0.1, 100) == 4
+    assert cascade_depth(scores, 2, 0.1, 3) == 3
+
+
+QUERIES = [
+    "Looking for senior AI engineer with 5+ years experience in LangChain",
+    "Need a remote Python expert with 3 years of experience in machine learning",
+    "lead javascript react developer in tech, hybrid",
+    "junior healthcare data analyst with sql",
+    "principal engineer, 10 yrs, python, aws, docker and kubernetes, finance sector",
+    "anyone",
+]
+SKILLS = ['python', 'py', 'javascript', 'js', 'nodejs', 'react', 'sql', 'aws', 'docker', 'kubernetes',
+          'langchain', 'machine learning', 'pytorch', 'excel']
+TITLES = ['Senior AI Engineer', 'Lead Frontend Developer', 'Junior Data Analyst', 'Principal Engineer',
+          'Staff Engineer', 'Data Scientist', 'Entry Level Developer']
+SECTORS = ['Tech', 'Healthcare', 'Finance', 'Education', '']
+WORK_PREFERENCES = ['Remote', 'Hybrid', 'Onsite', '']
+
+
+def reference_score(engine, similarity: float, rerank: float, features, requirements):
+    """The per-candidate scorer ScoringEngine replaced, kept as the oracle it must agree with"""
+    base_score = (similarity + 1) / 2 * engine.config.similarity_weight + \
+        (rerank + 1) / 2 * engine.config.rerank_weight
+    breakdown = {'base_score': round(base_score, 3), 'experience_bonus': 0, 'skill_bonus': 0,
+                 'work_pref_bonus': 0, 'seniority_bonus': 0, 'sector_bonus': 0}
+    if requirements['years_exp'] and features.years_of_experience >= requirements['years_exp']:
+        breakdown['experience_bonus'] = round(
+            min(0.2, (features.years_of_experience - requirements['years_exp']) * 0.05 + 0.1), 3)
+    if requirements['skills']:
+        matched = 0
+        for skill in requirements['skills']:
+            if skill in features.skills:
+                matched += 1
+            elif any(synonym in features.skills for synonym in engine.skill_synonyms.get(skill, [])):
+                matched += 0.8
+        breakdown['skill_bonus'] = round(min(0.3, matched * 0.1), 3)
+    if requirements['work_preference'] and features.work_preference == requirements['work_preference']:
+        breakdown['work_pref_bonus'] = 0.15
+    if requirements['seniority'] and requirements['seniority'] in features.title:
+        breakdown['seniority_bonus'] = 0.1
+    if requirements['sector'] and features.sector == requirements['sector']:
+        breakdown['sector_bonus'] = 0.2
+    breakdown['total_bonus'] = round(sum(value for name, value in breakdown.items() if name != 'base_score'), 3)
+    return max(1, min(10, int(round((base_score + breakdown['total_bonus']) * 10)))), breakdown
+
+
+def test_pool_scores_match_the_per_candidate_scorer(make_engine):
+    from feature_store import FeatureStore
+
+    engine = make_engine()
+    rng = np.random.default_rng(0)
+    candidates = [{
+        'id': str(i),
+        'title': str(rng.choice(TITLES)),
+        'skills': list(rng.choice(SKILLS, size=rng.integers(0, 5), replace=False)),
+        'sector': str(rng.choice(SECTORS)),
+        'workPreference': str(rng.choice(WORK_PREFERENCES)),
+        'yearsOfExperience': int(rng.integers(0, 15)),
+    } for i in range(300)]
+    features = [engine._extract_features(candidate, text='') for candidate in candidates]
+    store = FeatureStore(engine.query_analyzer.seniority, features)
+    columns = store.columns(np.arange(len(candidates)))
+    similarity = rng.uniform(-1, 1, len(candidates))
+    rerank = rng.uniform(-1, 1, len(candidates))
+    for query in QUERIES:
+        requirements = engine.extract_query_requirements(query)
+        pool = engine.scoring.score(store, columns, similarity, rerank, requirements)
+        for i, candidate in enumerate(candidates):
+            expected = reference_score(engine, similarity[i], rerank[i], features[i], requirements)
+            assert (int(pool.final[i]), pool.breakdown(i)) == expected, (query, candidate)
+            assert engine.calculate_enhanced_score(similarity[i], rerank[i], query, candidate) == expected
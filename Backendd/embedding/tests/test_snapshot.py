@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from ann_index import IndexConfig
+from benchmarks.synthetic_candidates import write_jsonl
+
+QUERY = "Senior Machine Learning Engineer with Python and PyTorch"
+
+
+def ranking(engine, k=10):
+    return [(result['id'], round(result['match_score'], 6)) for result in engine.search(QUERY, k=k, ef_search=256)]
+
+
+@pytest.mark.parametrize('index_config', [IndexConfig(), IndexConfig(storage='int8'), IndexConfig(index_type='hnsw')],
+                         ids=['flat', 'flat-int8', 'hnsw'])
+def test_snapshot_round_trip_then_update(tmp_path, make_engine, index_config):
+    path = write_jsonl(str(tmp_path / 'candidates.jsonl'), 100)
+    with open(path) as f:
+        candidates = [json.loads(line) for line in f]
+    engine = make_engine(index_config=index_config)
+    engine.stream_candidates(str(path))
+    # Pending HNSW tombstones are folded into the index before it is written
+    engine.remove_candidates([candidates[5]['id']])
+    snapshot_path = str(tmp_path / 'snapshot')
+    engine.save_snapshot(snapshot_path)
+
+    loaded = make_engine(index_config=index_config)
+    manifest = loaded.load_snapshot(snapshot_path)
+    assert manifest['model_name'] == engine.model_name
+    assert loaded.memory_mapped
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert loaded.index.ntotal == len(loaded.candidates) == 99
+    assert loaded._row_labels == engine._row_labels
+    np.testing.assert_array_equal(loaded.embeddings, engine.embeddings)
+    assert ranking(loaded) == ranking(engine)
+
+    # The first update copies the mapped generation; the snapshot on disk is left as written
+    stats = loaded.upsert_candidates([dict(candidates[5], title='Principal ML Engineer'),
+                                      dict(candidates[6], title='Head of Machine Learning')])
+    assert stats == {'upserted': 2, 'replaced': 1, 'total_candidates': 100}
+    assert not loaded.memory_mapped
+    assert not isinstance(loaded.embeddings, np.memmap)
+    loaded.remove_candidates([candidates[7]['id']])
+    assert len(loaded.candidates) == len(loaded.embeddings) == loaded.index.ntotal - len(loaded._tombstones) == 99
+    results = {result['id']: result for result in loaded.search(QUERY, k=100, ef_search=256)}
+    assert candidates[7]['id'] not in results
+    assert results[candidates[5]['id']]['title'] == 'Principal ML Engineer'
+
+    reloaded = make_engine(index_config=index_config)
+    reloaded.load_snapshot(snapshot_path)
+    assert len(reloaded.candidates) == 99
+    assert ranking(reloaded) == ranking(engine)
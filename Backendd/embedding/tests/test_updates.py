@@ -0,0 +1,116 @@
+import json
+
+import numpy as np
+import pytest
+
+import candidate_embeddings
+from ann_index import IndexConfig
+from benchmarks.synthetic_candidates import write_jsonl
+
+QUERY = "Senior Machine Learning Engineer with Python and PyTorch"
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = write_jsonl(str(tmp_path / 'candidates.jsonl'), 100)
+    with open(path) as f:
+        return path, [json.loads(line) for line in f]
+
+
+def normalized(engine, candidate):
+    candidate = dict(candidate)
+    engine._normalize_candidate(candidate)
+    return candidate
+
+
+def encode(engine, candidate):
+    return engine._embed_features([engine._extract_features(dict(candidate))], 32)[0]
+
+
+def assert_consistent(engine, candidates_by_id):
+    """Rows, labels, ids, embeddings and filter masks all describe the same candidates"""
+    rows = len(engine.candidates)
+    assert len(engine.embeddings) == len(engine.features) == len(engine._row_labels) == rows
+    assert sorted(engine._id_to_labels) == sorted(candidates_by_id)
+    for row, label in enumerate(engine._row_labels):
+        candidate = engine.candidates.to_dict(row)
+        assert engine._label_to_row[label] == row
+        assert engine._id_to_labels[str(candidate['id'])] == [label]
+        assert candidate == candidates_by_id[str(candidate['id'])]
+        np.testing.assert_allclose(engine.embeddings[row], encode(engine, candidate), atol=1e-6)
+    mask = engine._filter_index.mask(candidate_embeddings.SearchFilters(min_experience=0))
+    assert sorted(np.flatnonzero(mask).tolist()) == sorted(engine._row_labels)
+
+
+def searched_ids(engine):
+    # A wide HNSW candidate list so the whole pool comes back
+    results = engine.search(QUERY, k=len(engine.candidates), rerank=False, ef_search=256)
+    return {str(result['id']) for result in results}
+
+
+def test_removal_moves_the_last_row_into_the_hole(make_engine, pool):
+    path, candidates = pool
+    engine = make_engine()
+    engine.stream_candidates(str(path))
+    removed = [str(candidates[3]['id']), str(candidates[50]['id'])]
+
+    assert engine.remove_candidates(removed + ['no such id']) == {'removed': 2, 'total_candidates': 98}
+    assert [engine.candidates[3]['id'], engine.candidates[50]['id']] == [candidates[99]['id'], candidates[98]['id']]
+    # Removing the last row leaves the others where they are
+    removed.append(str(candidates[97]['id']))
+    engine.remove_candidates(removed[-1:])
+    expected = candidates[:3] + candidates[99:] + candidates[4:50] + candidates[98:99] + candidates[51:97]
+    assert [engine.candidates[row]['id'] for row in range(97)] == [c['id'] for c in expected]
+    assert engine.index.ntotal == 97
+    by_id = {str(c['id']): normalized(engine, c) for c in candidates if str(c['id']) not in removed}
+    assert_consistent(engine, by_id)
+    assert searched_ids(engine) == set(by_id)
+
+
+def test_upsert_replaces_by_id_and_appends_new_ids(make_engine, pool):
+    path, candidates = pool
+    engine = make_engine()
+    engine.stream_candidates(str(path))
+    changed = dict(candidates[10], title='Staff Data Engineer', skills=['Scala', 'Spark'])
+    added = dict(candidates[0], id='new-candidate')
+    # The last record wins when one id appears twice in a batch
+    stats = engine.upsert_candidates([dict(changed, title='Overwritten'), changed, added])
+    assert stats == {'upserted': 2, 'replaced': 1, 'total_candidates': 101}
+    assert engine.index.ntotal == 101
+
+    by_id = {str(c['id']): normalized(engine, c) for c in candidates + [changed, added]}
+    # Replaced rows leave a hole filled by the last row; the new version is appended
+    assert engine.candidates[10]['id'] == candidates[99]['id']
+    assert engine.candidates.to_dict(99) == by_id[str(changed['id'])]
+    assert_consistent(engine, by_id)
+    assert searched_ids(engine) == set(by_id)
+
+
+def test_hnsw_removals_are_tombstoned_until_the_rebuild(make_engine, pool, monkeypatch):
+    path, candidates = pool
+    engine = make_engine(index_config=IndexConfig(index_type='hnsw'))
+    engine.stream_candidates(str(path))
+    ids = [str(candidate['id']) for candidate in candidates]
+    rebuilds = []
+    rebuild = engine._rebuild_index
+    monkeypatch.setattr(engine, '_rebuild_index', lambda: rebuilds.append(1) or rebuild())
+
+    # Up to TOMBSTONE_REBUILD_RATIO of the index, removed vectors stay in the graph, hidden from searches
+    engine.remove_candidates(ids[:10])
+    assert not rebuilds
+    assert engine.index.ntotal == 100
+    assert len(engine._tombstones) == 10
+    assert searched_ids(engine) == set(ids[10:])
+
+    # Replacing a row tombstones its old vector too, which tips the index over the ratio
+    engine.upsert_candidates([dict(candidates[20], title='Principal Engineer')])
+    assert rebuilds == [1]
+    assert engine.index.ntotal == len(engine.candidates) == 90
+    assert not engine._tombstones and engine._tombstone_selector is None
+    # The rebuilt graph keeps each row's label
+    _, labels = engine.index.search(np.ascontiguousarray(engine.embeddings[:5]), 1)
+    assert labels[:, 0].tolist() == engine._row_labels[:5]
+    by_id = {str(c['id']): normalized(engine, c) for c in candidates[10:]}
+    by_id[ids[20]] = normalized(engine, dict(candidates[20], title='Principal Engineer'))
+    assert_consistent(engine, by_id)
+    assert searched_ids(engine) == set(by_id)